@@ -1,8 +1,9 @@
 from dotenv import load_dotenv
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
+from src.config.logging_setup import configure_logging
 from src.config.settings import Config
 from src.routes import whatsapp_bp, google_bp, user_bp
-import logging
+from src.services.google_sheets.token_broker import token_broker
 import os
 
 load_dotenv()
@@ -12,18 +13,57 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    logging.basicConfig(level=app.config["LOG_LEVEL"], format=app.config["LOG_FORMAT"])
+    configure_logging(Config)
 
     app.register_blueprint(whatsapp_bp)
     app.register_blueprint(google_bp)
     app.register_blueprint(user_bp)
 
+    if app.config["ASYNC_WRITES"]:
+        from src.services.outbox_worker import OutboxWorker
+
+        app.extensions["outbox_worker"] = OutboxWorker(
+            app,
+            threads=app.config["OUTBOX_WORKERS"],
+            poll_interval=app.config["OUTBOX_POLL_INTERVAL"],
+        )
+
+    start_background_services(app)
+
     @app.route("/healthz", methods=["GET"])
     def healthz():
-        return jsonify({"status": "ok"}), 200
+        from src.config.database import db_circuit_breaker
+
+        return jsonify({"status": "ok", "database": db_circuit_breaker.snapshot()}), 200
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        from src.services.metrics import render_metrics
+
+        payload, content_type = render_metrics()
+        return Response(payload, content_type=content_type)
 
     return app
 
+
+def start_background_services(app: Flask) -> None:
+    """Start the token refresher and outbox threads; a no-op for threads already running."""
+    token_broker.start()
+    if "outbox_worker" in app.extensions:
+        app.extensions["outbox_worker"].start()
+
+
+def stop_background_services(app: Flask) -> None:
+    """
+    Stop the background threads and wait for them to exit.
+
+    Called in the gunicorn master before it forks workers from a preloaded
+    app: a thread running at fork time could leave a lock held in the child.
+    """
+    token_broker.stop()
+    if "outbox_worker" in app.extensions:
+        app.extensions["outbox_worker"].stop()
+
 app = create_app()
 if __name__ == "__main__":
     app.run()
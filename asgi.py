@@ -0,0 +1,8 @@
+from dotenv import load_dotenv
+from src.aio.app import create_asgi_app
+
+load_dotenv()
+
+# uvicorn asgi:app --workers 2
+# gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+app = create_asgi_app()
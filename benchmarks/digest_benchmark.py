@@ -0,0 +1,119 @@
+"""
+Benchmark the vectorized monthly digest engine on synthetic data.
+
+Generates two months of expenses for ``--users`` users, times
+``compute_monthly_digests`` plus digest iteration, and compares against a
+per-row Python loop over dicts (the shape ``get_all_expenses`` returns) on a
+sample of users, checking that both produce the same totals.
+
+Usage:
+    python benchmarks/digest_benchmark.py --users 100000 --expenses-per-month 20
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.reporting import ExpenseColumns, compute_monthly_digests  # noqa: E402
+
+MONTH = date(2026, 9, 1)
+CATEGORIES = np.array(
+    ["mercado", "lifestyle", "transporte", "saude", "casa", "lazer", "educacao", "pets"] * 8,
+    dtype=object,
+)
+
+
+def synthetic_columns(users: int, per_month: int, seed: int) -> ExpenseColumns:
+    rng = np.random.default_rng(seed)
+    n = users * per_month * 2
+    user_ids = rng.integers(1, users + 1, size=n)
+    categories = CATEGORIES[rng.integers(0, len(CATEGORIES), size=n)]
+    amounts = rng.integers(100, 50_000, size=n)
+    first_day = np.datetime64(date(2026, 8, 1), "D")
+    days = first_day + rng.integers(0, 61, size=n)
+    return ExpenseColumns.from_arrays(user_ids, categories, amounts, days)
+
+
+def loop_digests(columns: ExpenseColumns, user_idx_sample: set, top_n: int = 3):
+    """Per-row Python aggregation over dicts, computing the same digest fields."""
+    start = np.datetime64(MONTH, "D").astype(int)
+    end = np.datetime64(date(2026, 10, 1), "D").astype(int)
+    previous_start = np.datetime64(date(2026, 8, 1), "D").astype(int)
+    rows = [
+        {"user": int(u), "category": columns.categories[c], "price": int(a), "day": int(d)}
+        for u, c, a, d in zip(columns.user_idx, columns.category_code, columns.amount_cents, columns.day)
+        if int(u) in user_idx_sample
+    ]
+
+    started_at = time.perf_counter()
+    totals = defaultdict(int)
+    previous = defaultdict(int)
+    by_category = defaultdict(lambda: defaultdict(int))
+    for row in rows:
+        if start <= row["day"] < end:
+            totals[row["user"]] += row["price"]
+            by_category[row["user"]][row["category"]] += row["price"]
+        elif previous_start <= row["day"] < start:
+            previous[row["user"]] += row["price"]
+    top = {
+        user: sorted(categories.items(), key=lambda item: -item[1])[:top_n]
+        for user, categories in by_category.items()
+    }
+    return totals, top, time.perf_counter() - started_at, len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--expenses-per-month", type=int, default=20)
+    parser.add_argument("--baseline-users", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    columns = synthetic_columns(args.users, args.expenses_per_month, args.seed)
+    print(f"generated {len(columns):,} expenses for {len(columns.user_ids):,} users "
+          f"in {time.perf_counter() - started_at:.2f}s")
+
+    started_at = time.perf_counter()
+    report = compute_monthly_digests(columns, MONTH)
+    compute_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    digests = sum(1 for _ in report)
+    iterate_seconds = time.perf_counter() - started_at
+
+    print(f"vectorized aggregation: {compute_seconds:.3f}s "
+          f"({len(columns) / compute_seconds / 1e6:.1f}M expenses/s)")
+    print(f"digest materialization: {iterate_seconds:.3f}s for {digests:,} users")
+
+    sample = set(range(min(args.baseline_users, len(columns.user_ids))))
+    totals, top, loop_seconds, loop_rows = loop_digests(columns, sample)
+    vectorized_rate = len(columns) / compute_seconds
+    loop_rate = loop_rows / loop_seconds
+    print(f"python dict loop ({len(sample):,} users, {loop_rows:,} expenses): {loop_seconds:.3f}s "
+          f"({loop_rate / 1e6:.2f}M expenses/s, ~{len(columns) / loop_rate:.1f}s extrapolated)")
+    print(f"speedup per expense: {vectorized_rate / loop_rate:.1f}x")
+
+    digests = {digest.user_id: digest for digest in report}
+    mismatches = [
+        idx for idx in sample
+        if totals.get(idx, 0) != report.total_cents[idx]
+        or [total for _, total in top.get(idx, [])]
+        != [total for _, total in digests[int(columns.user_ids[idx])].top_categories]
+    ]
+    if mismatches:
+        print(f"FAIL: {len(mismatches)} users differ between the loop and the vectorized engine")
+        return 1
+    print("totals and top categories match the per-row loop on the sample")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+"""
+End-to-end benchmark of the /whatsapp webhook against a local Google stand-in.
+
+Creates a throwaway SQLite database with ``--users`` active users, starts
+benchmarks/fake_google.py with the requested latency and error rate, serves
+the app and fires synthetic Twilio form payloads at ``/whatsapp`` from
+``--concurrency`` closed-loop clients. Reports throughput, p50/p95/p99
+latency, how replies break down (saved, Sheets error, ...) and the calls the
+fake Google server received.
+
+By default the app runs in-process from ``create_app()`` on a threaded
+Werkzeug server. ``--server-cmd`` runs any other server instead, with the
+same environment and ``{port}`` substituted, to compare worker models.
+``--env`` overrides settings for the run, e.g. caching or batching knobs.
+For a ``--server-cmd`` server, the RSS and PSS of its process tree after
+the run are reported too.
+``--replay`` drives the app with a production capture instead of synthetic
+messages (see replay_traffic.py).
+
+Usage:
+    python benchmarks/e2e_benchmark.py --requests 500 --concurrency 16 --sheets-latency 0.15
+    python benchmarks/e2e_benchmark.py --server-cmd "gunicorn -c gunicorn.conf.py app:app"
+    python benchmarks/e2e_benchmark.py --server-cmd "uvicorn asgi:app --port {port} --workers 2"
+    python benchmarks/e2e_benchmark.py --env SHEETS_BATCH_WINDOW_MS=50 --users 5
+    python benchmarks/e2e_benchmark.py --replay traffic.jsonl --speed 10
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_google import add_server_arguments, server_from_args  # noqa: E402
+
+PRODUCTS = ["café", "almoço", "uber", "mercado", "farmácia", "cinema", "padaria", "gasolina"]
+CATEGORIES = ["lifestyle", "transporte", "mercado", "saude", "casa", "lazer"]
+
+# Reply classification by the (Portuguese) TwiML text
+OUTCOMES = (
+    ("saved", "Gravado"),
+    ("summary", "Resumo"),
+    ("summary", "Nenhum gasto"),
+    ("sheets_error", "Google Sheets"),
+    ("invalid", "Formato inválido"),
+    ("unauthorized", "Acesso não autorizado"),
+    ("queued", "<Response></Response>"),
+)
+
+
+def phone_number(index: int) -> str:
+    return f"+5511900{index:06d}"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_users(phone_numbers: Iterable[str]) -> None:
+    """Create the schema and an active user with Sheets configured for every phone number not yet registered."""
+    from src.config.database import SessionLocal, init_db
+    from src.models.user import User
+
+    init_db()
+    db = SessionLocal()
+    try:
+        registered = {number for (number,) in db.query(User.phone_number)}
+        phone_numbers = [number for number in phone_numbers if number not in registered]
+        db.add_all(
+            User(
+                name=f"Bench {index}",
+                password="bench",
+                phone_number=number,
+                google_sheets_id=f"bench-sheet-{index}",
+                google_token=f"bench-refresh-{index}",
+                is_active=True,
+            )
+            for index, number in enumerate(phone_numbers)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def synthetic_message(rng: random.Random, lines: int, summary_ratio: float) -> str:
+    if summary_ratio and rng.random() < summary_ratio:
+        return "resumo"
+    return "\n".join(
+        f"{rng.randint(1, 300)},{rng.randint(0, 99):02d} {rng.choice(PRODUCTS)} {rng.choice(CATEGORIES)}"
+        for _ in range(lines)
+    )
+
+
+def classify(status: int, body: str) -> str:
+    if status != 200:
+        return f"http_{status}"
+    for outcome, marker in OUTCOMES:
+        if marker in body:
+            return outcome
+    return "other"
+
+
+class InProcessServer:
+    """The app from ``create_app()`` on a threaded Werkzeug server."""
+
+    def __init__(self, port: int):
+        from werkzeug.serving import make_server
+
+        from app import create_app
+
+        # Access logs would dominate the output and cost time on every request
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self._server = make_server("127.0.0.1", port, create_app(), threaded=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-app", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+
+
+class SubprocessServer:
+    """Any server command (gunicorn, uvicorn, ...) run with the benchmark environment."""
+
+    def __init__(self, command: str, port: int, env: Dict[str, str], log_path: str):
+        self.command = shlex.split(command.format(port=port))
+        self.env = {**os.environ, **env, "PORT": str(port)}
+        self.log_path = log_path
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        with open(self.log_path, "wb") as log:
+            self._process = subprocess.Popen(self.command, cwd=ROOT, env=self.env, stdout=log, stderr=log)
+
+    def memory(self) -> Optional[Dict[str, float]]:
+        """
+        Resident memory of the server and its worker processes, from /proc (Linux only).
+
+        RSS counts pages shared copy-on-write once per process; PSS splits
+        them between the processes sharing them, so its sum is the real
+        footprint and shows what preloading saves.
+        """
+        if self._process is None or not os.path.exists("/proc/self/smaps_rollup"):
+            return None
+        pids = process_tree(self._process.pid)
+        totals = {"rss": 0, "pss": 0}
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+                    for line in f:
+                        key, _, value = line.partition(":")
+                        if key.lower() in totals:
+                            totals[key.lower()] += int(value.split()[0])
+            except OSError:
+                continue
+        return {
+            "processes": len(pids),
+            "rss_mb": round(totals["rss"] / 1024, 1),
+            "pss_mb": round(totals["pss"] / 1024, 1),
+        }
+
+    def stop(self) -> None:
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def process_tree(root_pid: int) -> List[int]:
+    """The process and all of its descendants, found through /proc/*/stat."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as f:
+                # The command name may contain spaces, so split after its closing parenthesis
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    pids, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+    return pids
+
+
+def wait_until_ready(base_url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/healthz", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"App at {base_url} did not become ready within {timeout:.0f}s")
+
+
+def run_load(
+    base_url: str,
+    total: int,
+    concurrency: int,
+    users: int,
+    lines: int,
+    summary_ratio: float,
+    seed: int,
+) -> Tuple[List[float], Counter, float]:
+    """
+    Send ``total`` webhooks from ``concurrency`` closed-loop clients.
+
+    Returns:
+        Tuple of (latencies in seconds, outcome counts, wall time in seconds)
+    """
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+    remaining = iter(range(total))
+
+    def client(client_index: int) -> None:
+        rng = random.Random(seed + client_index)
+        session = requests.Session()
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            form = {
+                "Body": synthetic_message(rng, lines, summary_ratio),
+                "From": f"whatsapp:{phone_number(rng.randrange(users))}",
+                "MessageSid": f"SM{uuid.uuid4().hex}",
+            }
+            started_at = time.perf_counter()
+            try:
+                response = session.post(f"{base_url}/whatsapp", data=form, timeout=60)
+                outcome = classify(response.status_code, response.text)
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+            elapsed = time.perf_counter() - started_at
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+        session.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, outcomes, time.perf_counter() - started_at
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, min(len(sorted_values), round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def report(
+    latencies: List[float],
+    outcomes: Counter,
+    wall: float,
+    google_stats: Optional[Dict[str, Any]],
+    as_json: bool,
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    ordered = sorted(latencies)
+    result = {
+        "requests": len(ordered),
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(ordered) / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            name: round(percentile(ordered, pct) * 1000, 1)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "outcomes": dict(outcomes.most_common()),
+        "google": google_stats,
+        **(extra or {}),
+    }
+    if as_json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return
+
+    latency = result["latency_ms"]
+    print(f"requests={result['requests']} seconds={result['seconds']} throughput={result['throughput_rps']} req/s")
+    print(f"latency: p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms max={latency['max']}ms")
+    print("outcomes: " + " ".join(f"{name}={count}" for name, count in result["outcomes"].items()))
+    for name, value in (extra or {}).items():
+        if not isinstance(value, dict):
+            print(f"{name}: {value}")
+    if google_stats is None:
+        return
+    print(
+        "google calls: "
+        + " ".join(f"{name}={count}" for name, count in sorted(google_stats["calls"].items()))
+        + f" rows_appended={google_stats['rows_appended']}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent first and left out of the results")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--lines", type=int, default=1, help="Expenses per message")
+    parser.add_argument("--summary-ratio", type=float, default=0.0, help="Share of messages that are 'resumo'")
+    parser.add_argument("--replay", default=None, metavar="CAPTURE", help="Replay a traffic capture instead of synthetic load")
+    parser.add_argument("--speed", default="1", help="Replay speed: 1, 10, 10x ... or max")
+    parser.add_argument("--server-cmd", default=None, help="Server command instead of the in-process app; {port} is substituted")
+    parser.add_argument("--database-uri", default=None, help="Database to use instead of a temporary SQLite file")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra settings for the app")
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    google = server_from_args(args).start()
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory(prefix="whatssheet-bench-") as tmp:
+        env = {
+            **google.app_env(),
+            "SQLALCHEMY_DATABASE_URI": args.database_uri or f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "USER_CACHE_VERSION_FILE": os.path.join(tmp, "user_cache_version"),
+            "GOOGLE_TOKEN_REFRESH_INTERVAL": "0",
+            # Sheets quotas off, so runs measure the app rather than the limiter; set them with --env
+            "SHEETS_PROJECT_READS_PER_MINUTE": "0",
+            "SHEETS_PROJECT_WRITES_PER_MINUTE": "0",
+            "SHEETS_USER_READS_PER_MINUTE": "0",
+            "SHEETS_USER_WRITES_PER_MINUTE": "0",
+            "SHEETS_RATE_LIMIT_FILE": os.path.join(tmp, "sheets_quota.json"),
+            # Production settings (WARNING logs, no debug) with placeholders for the required values
+            "FLASK_ENV": "production",
+            "FLASK_SECRET_KEY": "bench",
+            "GOOGLE_CREDENTIALS_PATH": "unused",
+            "GOOGLE_SPREADSHEET_ID": "unused",
+            "GOOGLE_REDIRECT_URI": "http://127.0.0.1/oauth2callback",
+        }
+        env.update(item.split("=", 1) for item in args.env)
+        # Settings are read at import time, so the environment must be set before src is imported
+        os.environ.update(env)
+        if args.replay:
+            from replay_traffic import iter_users, load_capture, parse_speed, replay
+
+            messages = load_capture(args.replay)
+            seed_users(iter_users(messages))
+        else:
+            seed_users(phone_number(index) for index in range(args.users))
+
+        if args.server_cmd:
+            server = SubprocessServer(args.server_cmd, port, env, os.path.join(tmp, "server.log"))
+        else:
+            server = InProcessServer(port)
+        server.start()
+        try:
+            wait_until_ready(base_url, args.startup_timeout)
+            extra = None
+            if args.replay:
+                baseline = google.stats()
+                latencies, outcomes, wall, max_lag = replay(base_url, messages, parse_speed(args.speed), args.concurrency)
+                extra = {"max_schedule_lag_ms": round(max_lag * 1000, 1)}
+            else:
+                if args.warmup:
+                    run_load(base_url, args.warmup, min(args.concurrency, args.warmup), args.users, args.lines, 0.0, args.seed)
+                baseline = google.stats()
+                latencies, outcomes, wall = run_load(
+                    base_url, args.requests, args.concurrency, args.users, args.lines, args.summary_ratio, args.seed + 1000
+                )
+            stats = google.stats()
+            if isinstance(server, SubprocessServer):
+                memory = server.memory()
+                if memory:
+                    extra = {**(extra or {}), **{f"server_{name}": value for name, value in memory.items()}}
+        except RuntimeError:
+            if isinstance(server, SubprocessServer):
+                with open(server.log_path, encoding="utf-8", errors="replace") as log:
+                    sys.stderr.write(log.read()[-4000:])
+            raise
+        finally:
+            server.stop()
+            google.stop()
+
+    calls = Counter(stats["calls"])
+    calls.subtract(baseline["calls"])
+    google_stats = {
+        "calls": {name: count for name, count in calls.items() if count},
+        "rows_appended": stats["rows_appended"] - baseline["rows_appended"],
+    }
+    report(latencies, outcomes, wall, google_stats, args.json, extra)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Local stand-in for the Google OAuth token endpoint and the Sheets v4 API.
+
+Implements the calls the app makes: token refresh and authorization code
+exchange, spreadsheets.values.get, spreadsheets.values.append and
+spreadsheets.batchUpdate. Every response can be delayed and a share of
+Sheets calls can fail, to measure the app under slow or flaky upstreams.
+Point the app at it with GOOGLE_TOKEN_URI=http://HOST:PORT/token and
+GOOGLE_SHEETS_API_URL=http://HOST:PORT.
+
+Usage:
+    python benchmarks/fake_google.py --port 8931 --sheets-latency 0.15 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote
+
+VALUES_PATH = re.compile(r"^/v4/spreadsheets/([^/]+)/values/([^/?:]+)(:append)?$")
+BATCH_UPDATE_PATH = re.compile(r"^/v4/spreadsheets/([^/]+):batchUpdate$")
+
+
+class FakeGoogleServer:
+    """
+    Threaded HTTP server faking Google's token and Sheets endpoints.
+
+    Args:
+        port: Port to listen on; 0 picks a free one
+        sheets_latency: Seconds added to every Sheets call
+        token_latency: Seconds added to every token call
+        jitter: Up to this many seconds added at random to every call
+        error_rate: Share of Sheets calls answered with ``error_status``
+        error_status: HTTP status of injected errors (e.g. 503 or 429)
+        token_ttl: ``expires_in`` of issued access tokens, in seconds
+        seed: Seed for the latency and error draws
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        sheets_latency: float = 0.0,
+        token_latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        token_ttl: int = 3600,
+        seed: Optional[int] = None,
+    ):
+        self.sheets_latency = sheets_latency
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_ttl = token_ttl
+        self.calls: Counter = Counter()
+        self.rows_appended = 0
+        self._headers: Dict[str, bool] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def app_env(self) -> Dict[str, str]:
+        """Environment variables pointing the app at this server."""
+        return {
+            "GOOGLE_TOKEN_URI": f"{self.url}/token",
+            "GOOGLE_SHEETS_API_URL": self.url,
+            "GOOGLE_CLIENT_ID": "bench-client",
+            "GOOGLE_CLIENT_SECRET": "bench-secret",
+        }
+
+    def start(self) -> "FakeGoogleServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-google", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": dict(self.calls), "rows_appended": self.rows_appended}
+
+    def _delay(self, base: float) -> None:
+        with self._lock:
+            delay = base + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _inject_error(self, method: str) -> bool:
+        with self._lock:
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.calls[f"{method}:{self.error_status}"] += 1
+            return failed
+
+    def _count(self, method: str, rows: int = 0) -> None:
+        with self._lock:
+            self.calls[method] += 1
+            self.rows_appended += rows
+
+    def token(self, form: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        self._delay(self.token_latency)
+        grant_type = form.get("grant_type")
+        self._count(f"oauth.{grant_type}")
+        payload = {
+            "access_token": f"bench-access-{time.monotonic_ns()}",
+            "expires_in": self.token_ttl,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/spreadsheets",
+        }
+        if grant_type == "authorization_code":
+            payload["refresh_token"] = f"bench-refresh-{form.get('code', '')}"
+        elif grant_type != "refresh_token":
+            return 400, {"error": "unsupported_grant_type"}
+        return 200, payload
+
+    def sheets(self, method: str, spreadsheet_id: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        self._delay(self.sheets_latency)
+        if self._inject_error(method):
+            return self.error_status, {"error": {"code": self.error_status, "message": "Injected error"}}
+
+        if method == "values.get":
+            self._count(method)
+            with self._lock:
+                has_header = self._headers.get(spreadsheet_id, False)
+            return 200, {"values": [["Data", "Descrição", "Categoria", "Valor"]] if has_header else []}
+        if method == "batchUpdate":
+            self._count(method)
+            with self._lock:
+                self._headers[spreadsheet_id] = True
+            return 200, {"spreadsheetId": spreadsheet_id, "replies": [{} for _ in body.get("requests", [])]}
+
+        rows = len(body.get("values", []))
+        self._count(method, rows)
+        return 200, {"spreadsheetId": spreadsheet_id, "updates": {"updatedRows": rows}}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _reply(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self, http_method: str) -> None:
+                raw = self._read_body()
+                path = self.path.split("?", 1)[0]
+                if http_method == "POST" and path == "/token":
+                    form = {key: values[0] for key, values in parse_qs(raw.decode("utf-8")).items()}
+                    self._reply(*server.token(form))
+                    return
+
+                body = json.loads(raw) if raw else {}
+                match = VALUES_PATH.match(path)
+                if match and http_method == "GET" and not match.group(3):
+                    self._reply(*server.sheets("values.get", unquote(match.group(1)), body))
+                elif match and http_method == "POST" and match.group(3):
+                    self._reply(*server.sheets("values.append", unquote(match.group(1)), body))
+                elif http_method == "POST" and BATCH_UPDATE_PATH.match(path):
+                    spreadsheet_id = unquote(BATCH_UPDATE_PATH.match(path).group(1))
+                    self._reply(*server.sheets("batchUpdate", spreadsheet_id, body))
+                else:
+                    self._reply(404, {"error": {"code": 404, "message": f"Not found: {path}"}})
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+        return Handler
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sheets-latency", type=float, default=0.15, help="Seconds added to every Sheets call")
+    parser.add_argument("--token-latency", type=float, default=0.1, help="Seconds added to every token call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of Sheets calls that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--token-ttl", type=int, default=3600, help="Lifetime of issued access tokens, in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def server_from_args(args: argparse.Namespace, port: int = 0) -> FakeGoogleServer:
+    return FakeGoogleServer(
+        port=port,
+        sheets_latency=args.sheets_latency,
+        token_latency=args.token_latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        token_ttl=args.token_ttl,
+        seed=args.seed,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8931)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, port=args.port)
+    for key, value in server.app_env().items():
+        print(f"{key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Benchmark the single-pass expense parser against the previous regex parser.
+
+Three parts:
+
+* throughput: ``process_message`` over the corpus in
+  ``benchmarks/corpus/parser_fuzz.txt`` for both implementations;
+* adversarial: time per message on inputs that make the old
+  ``(.+?)\\s+(\\w+)`` pattern backtrack, at growing lengths (the length bound is
+  lifted for the new parser so its scan is actually exercised);
+* fuzz: random messages checked for parity with the regex parser on the
+  grammar both accept (ASCII digits, at most two decimals, no thousands
+  separators). Any mismatch is printed and makes the script exit non-zero.
+
+Usage:
+    python benchmarks/parser_benchmark.py --iterations 20000 --fuzz 50000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.price_processor.processor import PriceProcessorService  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus", "parser_fuzz.txt")
+
+LEGACY_PATTERN = re.compile(
+    r"^\s*(\d+(?:,\d+)?)\s+(.+?)\s+(\w+)(?:\s+\(dividir\))?\s*$", re.IGNORECASE
+)
+
+
+def legacy_process_message(message: str) -> tuple[bool, str, dict]:
+    """The regex implementation this parser replaced, kept verbatim for comparison."""
+    message = message.strip()
+    m = LEGACY_PATTERN.match(message)
+    if not m:
+        return False, "Formato inválido.", {}
+    price, product, category = m.groups()
+    price = price.replace(",", ".")
+    if message.lower().endswith("(dividir)"):
+        price = str(float(price) / 2)
+    current_date = datetime.now().strftime("%d/%m/%Y")
+    data = {"price": price, "product": product, "category": category, "date": current_date}
+    reply = (
+        f"Gravado ✔️\n"
+        f"Data: {current_date}\n"
+        f"Preço: {price}\n"
+        f"Produto: {product}\n"
+        f"Categoria: {category}"
+    )
+    return True, reply, data
+
+
+def legacy_parse(message: str):
+    """(unsplit cents, product, category, is_split) from the legacy regex, or None."""
+    stripped = message.strip()
+    m = LEGACY_PATTERN.match(stripped)
+    if not m:
+        return None
+    price, product, category = m.groups()
+    cents = int(Decimal(price.replace(",", ".")) * 100)
+    return cents, product, category, stripped.lower().endswith("(dividir)")
+
+
+class UnboundedParser(PriceProcessorService):
+    MAX_MESSAGE_LENGTH = 10**9
+
+
+def load_corpus() -> list[str]:
+    with open(CORPUS_PATH, encoding="utf-8") as fh:
+        lines = [line.rstrip("\n") for line in fh]
+    return [line for line in lines if line.strip() and not line.startswith("#")]
+
+
+def time_per_call(fn, messages: list[str], iterations: int) -> float:
+    started_at = time.perf_counter()
+    done = 0
+    while done < iterations:
+        for message in messages:
+            fn(message)
+        done += len(messages)
+    return (time.perf_counter() - started_at) / done
+
+
+def run_throughput(iterations: int) -> None:
+    corpus = load_corpus()
+    valid = [message for message in corpus if PriceProcessorService.parse(message)]
+    invalid = [message for message in corpus if not PriceProcessorService.parse(message)]
+    print(f"corpus: {len(valid)} valid / {len(invalid)} invalid messages, {iterations} calls each")
+    for label, messages in (("all", corpus), ("valid", valid), ("invalid", invalid)):
+        legacy = time_per_call(legacy_process_message, messages, iterations)
+        current = time_per_call(PriceProcessorService.process_message, messages, iterations)
+        print(
+            f"  {label:8s} regex {legacy * 1e6:6.2f} us/msg  "
+            f"tokenizer {current * 1e6:6.2f} us/msg  ({legacy / current:.1f}x)"
+        )
+
+
+def run_adversarial() -> None:
+    print("adversarial: '1 ' + 'a ' * k + '!'")
+    for k in (50, 200, 800, 3200):
+        message = "1 " + "a " * k + "!"
+        calls = max(1, 2000 // k)
+        legacy = time_per_call(LEGACY_PATTERN.match, [message], calls)
+        current = time_per_call(UnboundedParser.parse, [message], calls)
+        print(
+            f"  len={len(message):6d}  regex {legacy * 1e6:10.1f} us  "
+            f"tokenizer {current * 1e6:8.1f} us"
+        )
+    bounded = "1 " + "a " * 3200 + "!"
+    rejected = time_per_call(PriceProcessorService.parse, [bounded], 10000)
+    print(f"  len={len(bounded):6d}  rejected by length bound in {rejected * 1e6:.2f} us")
+
+
+def random_message(rng: random.Random) -> str:
+    words = ["café", "pão", "uber", "mercado", "lifestyle", "(dividir)", "(DIVIDIR)", "casa", "a_b", "x-y", "!", "(", "9"]
+    spaces = [" ", "  ", "\t"]
+    price = str(rng.randint(0, 99999))
+    roll = rng.random()
+    if roll < 0.4:
+        price += "," + str(rng.randint(0, 99)).zfill(rng.choice([1, 2]))[-2:]
+    elif roll < 0.45:
+        price += ","
+    elif roll < 0.5:
+        price = rng.choice(["", "x", ",5"]) + price
+    parts = [price] + [rng.choice(words) for _ in range(rng.randint(0, 5))]
+    message = "".join(part + rng.choice(spaces) for part in parts)
+    if rng.random() < 0.5:
+        message = message.rstrip()
+    if rng.random() < 0.2:
+        message = rng.choice(spaces) + message
+    return message
+
+
+def run_fuzz(count: int, seed: int) -> int:
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(count):
+        message = random_message(rng)
+        expected = legacy_parse(message)
+        parsed = PriceProcessorService.parse(message)
+        if expected is None:
+            ok = parsed is None
+        else:
+            cents, product, category, is_split = expected
+            if is_split:
+                cents = (cents + 1) // 2
+            ok = parsed is not None and (
+                parsed.amount_cents, parsed.product, parsed.category, parsed.is_split
+            ) == (cents, product, category, is_split)
+        if not ok:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"  mismatch: {message!r}: regex={expected} tokenizer={parsed}")
+    print(f"fuzz: {count} random messages, {mismatches} mismatches")
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=15)
+    args = parser.parse_args()
+
+    run_throughput(args.iterations)
+    run_adversarial()
+    return 1 if run_fuzz(args.fuzz, args.seed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
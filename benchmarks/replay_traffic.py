@@ -0,0 +1,195 @@
+"""
+Replay a captured webhook stream against a running app.
+
+Reads a capture written by the app with TRAFFIC_CAPTURE_PATH set and sends
+every payload to ``/whatsapp`` again, keeping the original gaps between
+messages divided by ``--speed`` (1 = real time, 10 = ten times faster), or
+back to back from ``--concurrency`` clients with ``--speed max``. Requests are
+sent on schedule whether or not earlier ones have been answered, so bursts
+stay bursts; the report shows how far sends fell behind schedule.
+
+Each hashed sender becomes a stable synthetic phone number and each hashed
+MessageSid a fresh SID per run, so per-user skew and Twilio retries survive
+the replay. ``--seed-users`` creates those users in the database named by
+SQLALCHEMY_DATABASE_URI; to replay fully offline, point the app at
+benchmarks/fake_google.py or use ``e2e_benchmark.py --replay``.
+
+Usage:
+    python benchmarks/replay_traffic.py traffic.jsonl --url http://127.0.0.1:5000 --speed 10
+    python benchmarks/replay_traffic.py traffic.jsonl --url http://127.0.0.1:5000 --speed max --concurrency 32
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from e2e_benchmark import classify, report, seed_users  # noqa: E402
+
+
+class CapturedMessage(NamedTuple):
+    timestamp: float
+    user_hash: str
+    sid_hash: str
+    body: str
+
+
+def load_capture(path: str, limit: Optional[int] = None) -> List[CapturedMessage]:
+    """Read a capture file in arrival order, skipping lines that can't be parsed."""
+    messages = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and len(messages) >= limit:
+                break
+            try:
+                record = json.loads(line)
+                messages.append(CapturedMessage(float(record["t"]), record["u"], record.get("s", ""), record["b"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+    messages.sort(key=lambda message: message.timestamp)
+    return messages
+
+
+def synthetic_phone(user_hash: str) -> str:
+    """Stable, obviously fake phone number for a hashed sender."""
+    return "+99" + str(int(user_hash, 16) % 10**11).zfill(11)
+
+
+def replay(
+    base_url: str,
+    messages: List[CapturedMessage],
+    speed: Optional[float],
+    concurrency: int,
+) -> Tuple[List[float], Counter, float, float]:
+    """
+    Send captured messages to ``/whatsapp``.
+
+    Args:
+        base_url: URL of the app
+        messages: Captured messages in arrival order
+        speed: Time compression factor; None sends as fast as possible
+        concurrency: Maximum requests in flight
+
+    Returns:
+        Tuple of (latencies in seconds, outcome counts, wall time in
+        seconds, largest delay behind schedule in seconds)
+    """
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    max_lag = 0.0
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(concurrency)
+    sessions = threading.local()
+    sids: Dict[str, str] = {}
+
+    def send(form: Dict[str, str], scheduled_at: float) -> None:
+        nonlocal max_lag
+        session = getattr(sessions, "session", None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        started_at = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/whatsapp", data=form, timeout=60)
+            outcome = classify(response.status_code, response.text)
+        except requests.RequestException as e:
+            outcome = type(e).__name__
+        finally:
+            slots.release()
+        elapsed = time.perf_counter() - started_at
+        with lock:
+            latencies.append(elapsed)
+            outcomes[outcome] += 1
+            max_lag = max(max_lag, started_at - scheduled_at)
+
+    first_timestamp = messages[0].timestamp if messages else 0.0
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for message in messages:
+            scheduled_at = started_at
+            if speed is not None:
+                scheduled_at += (message.timestamp - first_timestamp) / speed
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if message.sid_hash:
+                # Retries of one captured SID share a fresh SID, so they are still deduplicated
+                sid = sids.setdefault(message.sid_hash, f"SM{uuid.uuid4().hex}")
+            else:
+                sid = f"SM{uuid.uuid4().hex}"
+            form = {
+                "Body": message.body,
+                "From": f"whatsapp:{synthetic_phone(message.user_hash)}",
+                "MessageSid": sid,
+            }
+            slots.acquire()
+            pool.submit(send, form, scheduled_at)
+    wall = time.perf_counter() - started_at
+    return latencies, outcomes, wall, max_lag if speed is not None else 0.0
+
+
+def parse_speed(value: str) -> Optional[float]:
+    if value == "max":
+        return None
+    speed = float(value.rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def capture_summary(messages: List[CapturedMessage]) -> Dict[str, float]:
+    users = Counter(message.user_hash for message in messages)
+    span = messages[-1].timestamp - messages[0].timestamp if messages else 0.0
+    return {
+        "messages": len(messages),
+        "users": len(users),
+        "busiest_user_share": round(users.most_common(1)[0][1] / len(messages), 3) if messages else 0.0,
+        "span_seconds": round(span, 1),
+    }
+
+
+def iter_users(messages: List[CapturedMessage]) -> Iterator[str]:
+    return (synthetic_phone(user_hash) for user_hash in sorted({message.user_hash for message in messages}))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("capture", help="Capture file written with TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1, 10, 10x ... or max")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N messages")
+    parser.add_argument("--seed-users", action="store_true", help="Create the replayed users in SQLALCHEMY_DATABASE_URI first")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    messages = load_capture(args.capture, args.limit)
+    if not messages:
+        print(f"No messages in {args.capture}")
+        return 1
+    summary = capture_summary(messages)
+    if not args.json:
+        print(
+            f"capture: messages={summary['messages']} users={summary['users']} "
+            f"busiest_user_share={summary['busiest_user_share']} span={summary['span_seconds']}s"
+        )
+    if args.seed_users:
+        seed_users(iter_users(messages))
+
+    latencies, outcomes, wall, max_lag = replay(args.url.rstrip("/"), messages, args.speed, args.concurrency)
+    report(latencies, outcomes, wall, None, args.json, extra={"capture": summary, "max_schedule_lag_ms": round(max_lag * 1000, 1)})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Measure cold start time of the app.
+
+Each run starts a fresh interpreter, imports ``app`` (which calls
+``create_app()``) and serves one ``/healthz`` request through the test client.
+Exits non-zero when the median exceeds ``--max-seconds`` so it can guard
+against startup regressions.
+
+Usage:
+    python benchmarks/startup_time.py --runs 10 --max-seconds 1.5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = """
+import time
+started_at = time.perf_counter()
+import app
+imported_at = time.perf_counter()
+app.app.test_client().get("/healthz")
+print(imported_at - started_at, time.perf_counter() - started_at)
+"""
+
+
+def run_once(env) -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "FLASK_ENV": "development",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            "GOOGLE_TOKEN_REFRESH_INTERVAL": "0",
+        }
+        imports, first_requests = zip(*(run_once(env) for _ in range(args.runs)))
+
+    import_median = statistics.median(imports)
+    total_median = statistics.median(first_requests)
+    print(f"runs={args.runs}")
+    print(f"import create_app: median={import_median:.3f}s min={min(imports):.3f}s max={max(imports):.3f}s")
+    print(f"first /healthz:    median={total_median:.3f}s min={min(first_requests):.3f}s max={max(first_requests):.3f}s")
+
+    if args.max_seconds is not None and total_median > args.max_seconds:
+        print(f"FAIL: median startup {total_median:.3f}s exceeds {args.max_seconds:.3f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
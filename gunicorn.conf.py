@@ -0,0 +1,100 @@
+import gc
+import glob
+import os
+import sys
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+
+# gthread: GUNICORN_THREADS request threads per worker. gevent: up to
+# GUNICORN_WORKER_CONNECTIONS concurrent requests per worker on greenlets.
+# sync: one request at a time per worker.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "100"))
+
+# Import the app once in the master and fork workers from it, so imported
+# modules are shared copy-on-write instead of loaded by every worker.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+# Worker heartbeats go to tmpfs, so a slow container disk can't get workers killed
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+if worker_class == "gevent":
+    # Patch before the app is imported in the master; the gevent worker's own
+    # patching after fork is too late for locks and sockets created by preload.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+
+# Workers write their metrics to files in this directory and /metrics merges
+# them, so a scrape sees every worker. Must be set before the app is imported.
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="whatssheet-metrics-")
+
+
+def on_starting(server):
+    """Drop metric files left behind by a previous run."""
+    for kind in ("counter", "gauge", "histogram", "summary"):
+        for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], f"{kind}_*.db")):
+            os.remove(path)
+
+
+def _flask_app():
+    """The Flask app the server loaded: app:app itself, or the fallback of asgi:app."""
+    return getattr(sys.modules.get("app"), "app", None)
+
+
+def when_ready(server):
+    """Runs in the master before the first worker is forked."""
+    if not server.cfg.preload_app:
+        return
+
+    app = _flask_app()
+    if app is not None:
+        from app import stop_background_services
+        from src.warmup import preload
+
+        # Threads don't survive fork and could leave a lock held in the workers;
+        # each worker starts its own in post_worker_init.
+        stop_background_services(app)
+        preload(app)
+    # Keep the garbage collector from touching (and so copying) every
+    # object inherited from the master.
+    gc.collect()
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    """Runs in each worker right after fork, once the app has been loaded."""
+    app = _flask_app()
+    if app is None:
+        return
+
+    from app import start_background_services
+
+    # Database pools, the logging queue and per-process files are reset by
+    # os.register_at_fork hooks; threads are started here.
+    start_background_services(app)
+
+    if os.environ.get("WARMUP_ON_FORK", "false").lower() == "true":
+        from src.warmup import warm_up
+
+        warm_up(app)
+
+
+def child_exit(server, worker):
+    """Stop reporting live values (gauges) of a worker that has exited."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
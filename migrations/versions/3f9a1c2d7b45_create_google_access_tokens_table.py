@@ -0,0 +1,35 @@
+"""create google access tokens table
+
+Revision ID: 3f9a1c2d7b45
+Revises: c66bd1e63d10
+Create Date: 2026-10-18 09:12:41.503112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2d7b45'
+down_revision: Union[str, None] = 'c66bd1e63d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'google_access_tokens',
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('access_token', sa.String(length=2048), nullable=False),
+        sa.Column('refresh_token_hash', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.DateTime, nullable=False, index=True),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('google_access_tokens')
@@ -0,0 +1,43 @@
+"""create expenses table
+
+Revision ID: 5e7d0b3c9f12
+Revises: d41c7e9b2a06
+Create Date: 2026-10-18 13:40:52.114027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7d0b3c9f12'
+down_revision: Union[str, None] = 'd41c7e9b2a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'expenses',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('date', sa.Date, nullable=False),
+        sa.Column('product', sa.String(length=255), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('amount_cents', sa.Integer, nullable=False),
+        sa.Column('is_split', sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('synced_at', sa.DateTime, nullable=True),
+    )
+    op.create_index('ix_expenses_user_id_date', 'expenses', ['user_id', 'date'])
+    op.create_index('ix_expenses_user_id_category', 'expenses', ['user_id', 'category'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_user_id_category', table_name='expenses')
+    op.drop_index('ix_expenses_user_id_date', table_name='expenses')
+    op.drop_table('expenses')
@@ -0,0 +1,33 @@
+"""create spreadsheet states table
+
+Revision ID: 8b2e4f6a1d93
+Revises: 3f9a1c2d7b45
+Create Date: 2026-10-18 10:02:17.228640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4f6a1d93'
+down_revision: Union[str, None] = '3f9a1c2d7b45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'spreadsheet_states',
+        sa.Column('spreadsheet_id', sa.String(length=100), primary_key=True),
+        sa.Column('initialized_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('spreadsheet_states')
@@ -0,0 +1,49 @@
+"""create expense totals table
+
+Revision ID: a7c3e1f58d20
+Revises: 5e7d0b3c9f12
+Create Date: 2026-10-18 14:31:09.662318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e1f58d20'
+down_revision: Union[str, None] = '5e7d0b3c9f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'expense_totals',
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('month', sa.Date, primary_key=True),
+        sa.Column('category', sa.String(length=100), primary_key=True),
+        sa.Column('total_cents', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('expense_count', sa.Integer, nullable=False, server_default='0'),
+    )
+    # Backfill from the ledger so existing history shows up in summaries
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        month = "CAST(date_trunc('month', date) AS DATE)"
+    elif dialect == "sqlite":
+        month = "date(date, 'start of month')"
+    else:
+        return
+    op.execute(f"""
+        INSERT INTO expense_totals (user_id, month, category, total_cents, expense_count)
+        SELECT user_id, {month}, category, SUM(amount_cents), COUNT(*)
+        FROM expenses
+        GROUP BY user_id, {month}, category;
+    """) # type: ignore
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expense_totals')
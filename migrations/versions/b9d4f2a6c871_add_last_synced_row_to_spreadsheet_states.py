@@ -0,0 +1,31 @@
+"""add last synced row to spreadsheet states
+
+Revision ID: b9d4f2a6c871
+Revises: a7c3e1f58d20
+Create Date: 2026-10-18 15:18:44.090215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4f2a6c871'
+down_revision: Union[str, None] = 'a7c3e1f58d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'spreadsheet_states',
+        sa.Column('last_synced_row', sa.Integer, nullable=False, server_default='1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('spreadsheet_states', 'last_synced_row')
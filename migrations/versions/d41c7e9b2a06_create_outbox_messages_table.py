@@ -0,0 +1,46 @@
+"""create outbox messages table
+
+Revision ID: d41c7e9b2a06
+Revises: 8b2e4f6a1d93
+Create Date: 2026-10-18 11:24:05.781933
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c7e9b2a06'
+down_revision: Union[str, None] = '8b2e4f6a1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('reply_to', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.Text, nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('available_at', sa.DateTime, nullable=False),
+        sa.Column('last_error', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('updated_at', sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        'ix_outbox_messages_status_available_at',
+        'outbox_messages',
+        ['status', 'available_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_messages_status_available_at', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,41 @@
+"""create processed messages table
+
+Revision ID: e3a8c5d1f472
+Revises: b9d4f2a6c871
+Create Date: 2026-10-18 16:02:37.514208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a8c5d1f472'
+down_revision: Union[str, None] = 'b9d4f2a6c871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'processed_messages',
+        sa.Column('message_sid', sa.String(length=64), primary_key=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('response', sa.Text, nullable=True),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        'ix_processed_messages_expires_at',
+        'processed_messages',
+        ['expires_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_processed_messages_expires_at', table_name='processed_messages')
+    op.drop_table('processed_messages')
@@ -0,0 +1,31 @@
+"""add last used at to google access tokens
+
+Revision ID: f6c1a9d3e580
+Revises: e3a8c5d1f472
+Create Date: 2026-10-18 19:02:17.448391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c1a9d3e580'
+down_revision: Union[str, None] = 'e3a8c5d1f472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'google_access_tokens',
+        sa.Column('last_used_at', sa.DateTime, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('google_access_tokens', 'last_used_at')
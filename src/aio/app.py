@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from src.aio.controllers import AsyncGoogleController, AsyncResponse, AsyncWhatsAppController
+from src.aio.database import async_db
+from src.aio.google_client import AsyncGoogleClient
+from src.aio.sheets import AsyncSheetsService
+from src.config.logging_setup import configure_logging
+from src.config.settings import Config
+from src.services.traffic_capture import traffic_capture
+
+Handler = Callable[[Dict[str, str], bytes], Awaitable[AsyncResponse]]
+
+
+class AsgiApp:
+    """
+    Minimal ASGI application serving ``/whatsapp`` and ``/oauth2callback`` on asyncio.
+
+    Every other path is handed to ``fallback`` (the Flask app wrapped for
+    ASGI) when one is given, so a single server can run both. The Google
+    client and services are created at lifespan startup, inside the
+    worker's event loop, and closed at shutdown.
+    """
+
+    MAX_BODY_SIZE = 64 * 1024
+
+    def __init__(self, fallback: Optional[Callable] = None):
+        self.logger = logging.getLogger(__name__)
+        self.fallback = fallback
+        self.client: Optional[AsyncGoogleClient] = None
+        self.whatsapp_controller: Optional[AsyncWhatsAppController] = None
+        self.google_controller: Optional[AsyncGoogleController] = None
+        self._startup_lock = asyncio.Lock()
+        self.routes: Dict[Tuple[str, str], Handler] = {
+            ("POST", "/whatsapp"): self._whatsapp,
+            ("GET", "/oauth2callback"): self._oauth2callback,
+        }
+
+    async def startup(self) -> None:
+        async with self._startup_lock:
+            if self.whatsapp_controller is None:
+                self._build()
+
+    def _build(self) -> None:
+        self.client = AsyncGoogleClient(
+            max_connections=Config.ASYNC_HTTP_MAX_CONNECTIONS,
+            timeout=Config.ASYNC_HTTP_TIMEOUT,
+        )
+        sheets_service = AsyncSheetsService(self.client, Config.GOOGLE_TOKEN_REFRESH_MARGIN)
+        self.whatsapp_controller = AsyncWhatsAppController(sheets_service)
+        self.google_controller = AsyncGoogleController(self.client, sheets_service)
+
+    async def shutdown(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        await async_db.dispose()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        handler = None
+        if scope["type"] == "http":
+            handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            if self.fallback is not None:
+                await self.fallback(scope, receive, send)
+            elif scope["type"] == "http":
+                await self._send(send, 404, "", "text/plain")
+            return
+
+        if self.whatsapp_controller is None:
+            # Servers that don't run the lifespan protocol
+            await self.startup()
+
+        body = await self._read_body(receive)
+        if body is None:
+            await self._send(send, 413, "", "text/plain")
+            return
+
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        try:
+            status, content, content_type = await handler(query, body)
+        except Exception as e:
+            self.logger.error("Error processing %s: %s", scope["path"], e)
+            status, content, content_type = 500, "", "text/plain"
+        await self._send(send, status, content, content_type)
+
+    async def _whatsapp(self, query: Dict[str, str], body: bytes) -> AsyncResponse:
+        form = dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+        self.logger.info("Received WhatsApp webhook request")
+        traffic_capture.record(form)
+        return await self.whatsapp_controller.handle_webhook(form)
+
+    async def _oauth2callback(self, query: Dict[str, str], body: bytes) -> AsyncResponse:
+        self.logger.info("Received Google OAuth2 callback")
+        return await self.google_controller.handle_oauth2callback(query)
+
+    async def _read_body(self, receive: Callable) -> Optional[bytes]:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.MAX_BODY_SIZE:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _send(send: Callable, status: int, content: str, content_type: str) -> None:
+        body = content.encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", f"{content_type}; charset=utf-8".encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_asgi_app(with_flask_fallback: bool = True) -> AsgiApp:
+    """
+    Build the ASGI application.
+
+    Args:
+        with_flask_fallback: Serve every other route (``/healthz``, user
+            signup, ...) from the Flask app through uvicorn's WSGI adapter
+    """
+    configure_logging(Config)
+    fallback = None
+    if with_flask_fallback:
+        from uvicorn.middleware.wsgi import WSGIMiddleware
+
+        from app import app as flask_app
+
+        fallback = WSGIMiddleware(flask_app)
+    return AsgiApp(fallback=fallback)
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Tuple
+
+from src.aio.expense_service import AsyncExpenseService
+from src.aio.google_client import AsyncGoogleClient, GoogleApiError
+from src.aio.idempotency import async_idempotency_service
+from src.aio.sheets import AsyncSheetsService
+from src.aio.user_service import AsyncUserService
+from src.config.settings import Config
+from src.services.metrics import WEBHOOK_REQUEST_SECONDS, time_stage
+from src.services.summary_service import SummaryService
+from src.views.whatsapp_view import WhatsAppView
+
+# (status, body, content type)
+AsyncResponse = Tuple[int, str, str]
+
+
+class AsyncWhatsAppController:
+    """Async counterpart of ``WhatsAppController`` for the ASGI serving mode."""
+
+    def __init__(self, sheets_service: AsyncSheetsService):
+        self.logger = logging.getLogger(__name__)
+        self.view = WhatsAppView()
+        self.user_service = AsyncUserService()
+        self.expense_service = AsyncExpenseService(sheets_service)
+        self.summary_service = SummaryService()
+
+    async def handle_webhook(self, form: Dict[str, str]) -> AsyncResponse:
+        """
+        Handle an incoming WhatsApp webhook.
+
+        Retries of a MessageSid are answered with the first delivery's reply,
+        as in the sync controller.
+
+        Args:
+            form: The decoded form fields posted by Twilio
+        """
+        with WEBHOOK_REQUEST_SECONDS.time():
+            return await self._handle_delivery(form)
+
+    async def _handle_delivery(self, form: Dict[str, str]) -> AsyncResponse:
+        message_sid = form.get("MessageSid", "").strip()
+        if not message_sid or not async_idempotency_service.enabled:
+            return await self._handle_message(form)
+
+        is_new, previous_reply = await async_idempotency_service.aclaim(message_sid)
+        if not is_new:
+            self.logger.info("Duplicate webhook delivery for MessageSid %s", message_sid)
+            if previous_reply is None:
+                twiml, mimetype = self.view.format_empty_twiml_response()
+            else:
+                twiml, mimetype = previous_reply, "application/xml"
+            return 200, twiml, mimetype
+
+        try:
+            response = await self._handle_message(form)
+        except BaseException:
+            await async_idempotency_service.arelease(message_sid)
+            raise
+        await async_idempotency_service.acomplete(message_sid, response[1])
+        return response
+
+    async def _handle_message(self, form: Dict[str, str]) -> AsyncResponse:
+        incoming = form.get("Body", "").strip()
+        cellphone_number = form.get("From", "").strip().split(":")[-1]
+
+        self.logger.info("Received webhook request from %s", cellphone_number)
+        self.logger.debug("Message content: %s", incoming)
+
+        with time_stage("user_lookup"):
+            is_valid, error_message, user = await self.user_service.validate_user(cellphone_number)
+        if not is_valid:
+            self.logger.warning("Invalid user attempt from %s: %s", cellphone_number, error_message)
+            return self._twiml(error_message)
+
+        summary_request = self.summary_service.parse_command(incoming)
+        if summary_request:
+            try:
+                # Summaries are rare; they reuse the sync totals query off the event loop
+                with time_stage("summary"):
+                    label, totals = await asyncio.to_thread(
+                        self.summary_service.get_totals, user.id, summary_request
+                    )
+                message = self.view.format_summary(label, totals, summary_request.category)
+            except Exception as e:
+                self.logger.error("Failed to build summary for user %s: %s", user, e)
+                message = self.view.format_summary_error()
+            return self._twiml(message)
+
+        is_success, message, expenses = await self.expense_service.process(incoming, user)
+        if is_success:
+            self.logger.info("Processed %s expenses for user %s", len(expenses), user)
+        else:
+            self.logger.warning("Failed to process expense for user %s: %s", user, message)
+        return self._twiml(message)
+
+    def _twiml(self, message: str) -> AsyncResponse:
+        with time_stage("twiml"):
+            twiml, mimetype = self.view.format_twiml_response(message)
+        return 200, twiml, mimetype
+
+
+class AsyncGoogleController:
+    """Async counterpart of ``GoogleController``: OAuth2 callback over the pooled client."""
+
+    def __init__(self, client: AsyncGoogleClient, sheets_service: AsyncSheetsService):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.sheets_service = sheets_service
+        self.user_service = AsyncUserService()
+
+    async def handle_oauth2callback(self, args: Dict[str, str]) -> AsyncResponse:
+        """
+        Exchange the authorization code and store the user's refresh token.
+
+        Args:
+            args: The decoded query string parameters
+        """
+        code = args.get("code")
+        if not code:
+            self.logger.error("No authorization code received in callback")
+            return 400, "", "text/plain"
+
+        state = args.get("state")
+        if not state or ":" not in state:
+            self.logger.error("Invalid state parameter received")
+            return 400, "", "text/plain"
+        try:
+            user_id = int(state.split(":")[1])
+        except ValueError:
+            self.logger.error("Invalid state parameter received")
+            return 400, "", "text/plain"
+
+        try:
+            token_data = await self.client.exchange_code(code, Config.GOOGLE_REDIRECT_URI)
+        except GoogleApiError as e:
+            self.logger.error("Token request failed: %s", e)
+            return e.status_code, "", "text/plain"
+
+        if "refresh_token" not in token_data:
+            self.logger.error("No refresh token received in response")
+            return 400, "", "text/plain"
+
+        is_success, message, _ = await self.user_service.update_google_token(
+            user_id, token_data["refresh_token"]
+        )
+        if not is_success:
+            self.logger.error("Failed to update Google token for user_id %s: %s", user_id, message)
+            return 500, "", "text/plain"
+
+        self.sheets_service.invalidate(user_id)
+        self.logger.info("Successfully updated Google token for user_id: %s", user_id)
+        return 200, json.dumps(token_data), "application/json"
@@ -0,0 +1,60 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.config.database import _engine_options
+from src.config.settings import Config
+
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_uri(uri: str) -> str:
+    """Swap the sync driver of a database URI for its asyncio counterpart."""
+    scheme, separator, rest = uri.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+class AsyncDatabase:
+    """
+    Lazily created asyncio engine over the same database as ``src.config.database``.
+
+    The engine is only built on first use, i.e. inside the serving process's
+    event loop and after any fork.
+    """
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+
+    def _build(self) -> None:
+        self._engine = create_async_engine(self.uri, **_engine_options(self.uri))
+        self._sessionmaker = async_sessionmaker(self._engine, expire_on_commit=False)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._build()
+        return self._engine
+
+    def session(self) -> AsyncSession:
+        if self._sessionmaker is None:
+            self._build()
+        return self._sessionmaker()
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessionmaker = None
+
+
+async_db = AsyncDatabase(
+    Config.SQLALCHEMY_ASYNC_DATABASE_URI
+    or async_database_uri(Config.SQLALCHEMY_DATABASE_URI)
+)
@@ -0,0 +1,201 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+
+from src.aio.database import async_db
+from src.aio.sheets import AsyncSheetsService
+from src.models.expense import Expense, ExpenseRecord, ExpenseTotal
+from src.services.category_index import category_index
+from src.services.expense_ledger_service import ExpenseLedgerService, month_start
+from src.services.expense_service import ExpenseService
+from src.services.google_sheets.rate_limiter import SheetsRateLimited
+from src.services.metrics import time_stage
+from src.services.price_processor import PriceProcessorService
+from src.views.whatsapp_view import WhatsAppView
+
+
+class AsyncExpenseService:
+    """
+    Parses expense messages and saves them to the ledger and Google Sheets without blocking.
+
+    Parsing, category normalization and reply formatting are the same code
+    the sync ``ExpenseService`` uses; the ledger and Sheets writes go through
+    the asyncio database driver and ``AsyncSheetsService``.
+    """
+
+    def __init__(self, sheets_service: AsyncSheetsService):
+        self.logger = logging.getLogger(__name__)
+        self.sheets_service = sheets_service
+
+    @staticmethod
+    def parse(message: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Parse a message with one expense per line.
+
+        Returns:
+            Tuple of (processed data of every valid line, lines that could not be parsed)
+        """
+        lines = ExpenseService.split_lines(message)
+        items, failed_lines = [], lines[ExpenseService.MAX_LINES_PER_MESSAGE:]
+        for line in lines[:ExpenseService.MAX_LINES_PER_MESSAGE]:
+            is_valid, _, data = PriceProcessorService.process_message(line)
+            if is_valid:
+                items.append(data)
+            else:
+                failed_lines.append(line)
+        return items, failed_lines
+
+    async def process(self, message: str, user) -> Tuple[bool, str, List[Expense]]:
+        """
+        Process a single or multi-line expense message.
+
+        Args:
+            message: The expense message, one expense per line
+            user: The user who sent the message
+
+        Returns:
+            Tuple containing:
+            - bool: Whether the expenses were saved
+            - str: Reply message
+            - list: The saved expenses
+        """
+        with time_stage("parse"):
+            items, failed_lines = self.parse(message)
+        if not items:
+            self.logger.warning("Invalid expense format received: %s", message)
+            return False, WhatsAppView.format_invalid_format(), []
+
+        with time_stage("ledger"):
+            items = await self.record(items, user)
+        expenses = [Expense.from_processor_data(item) for item in items]
+
+        try:
+            saved = await self.sheets_service.append_expenses(user, items)
+        except SheetsRateLimited as e:
+            self.logger.warning("Google Sheets quota exhausted for user %s: %s", user, e)
+            await self.discard([item["ledger_id"] for item in items])
+            return False, WhatsAppView.format_sheets_busy_error(), []
+        except Exception as e:
+            self.logger.error("Error with Google Sheets service for user %s: %s", user, e)
+            await self.discard([item["ledger_id"] for item in items])
+            return False, WhatsAppView.format_sheets_connection_error(), []
+        if not saved:
+            self.logger.error("Failed to save %s expenses to Google Sheets for user %s", len(items), user)
+            # The user is asked to send them again
+            await self.discard([item["ledger_id"] for item in items])
+            return False, WhatsAppView.format_sheets_save_error(), []
+
+        self.logger.info("Successfully saved %s expenses to Google Sheets for user %s", len(items), user)
+        for item in items:
+            category_index.register(user.id, item["category"])
+        await self.mark_synced([item["ledger_id"] for item in items])
+        if len(items) + len(failed_lines) > 1:
+            return True, WhatsAppView.format_multi_success(expenses, failed_lines), expenses
+        return True, WhatsAppView.format_success(expenses[0]), expenses
+
+    async def record(self, items: List[Dict[str, Any]], user) -> List[Dict[str, Any]]:
+        """
+        Record parsed expenses in the ledger and bump their monthly totals in one transaction.
+
+        Returns:
+            Copies of ``items`` with the canonical category and ``ledger_id``,
+            which is None when the ledger could not be written
+        """
+        # resolve never waits for the database; a missing index is loaded in a background thread
+        items = [{**item, "category": category_index.resolve(user.id, item["category"])} for item in items]
+        try:
+            async with async_db.session() as db:
+                records = []
+                for item in items:
+                    expense = Expense.from_processor_data(item)
+                    record = ExpenseRecord(
+                        user_id=user.id,
+                        date=expense.date_value,
+                        product=expense.product,
+                        category=expense.category,
+                        amount_cents=expense.amount_cents,
+                        is_split=expense.is_split,
+                    )
+                    db.add(record)
+                    records.append(record)
+                    await self._increment_total(db, user.id, record.date, record.category, record.amount_cents)
+                await db.commit()
+                ledger_ids: List[Optional[int]] = [record.id for record in records]
+        except Exception as e:
+            # The ledger must not block the write to Google Sheets
+            self.logger.error("Failed to record expenses in ledger for user %s: %s", user, e)
+            ledger_ids = [None] * len(items)
+        return [{**item, "ledger_id": ledger_id} for item, ledger_id in zip(items, ledger_ids)]
+
+    @staticmethod
+    async def _increment_total(db, user_id: int, day, category: str, amount_cents: int) -> None:
+        statement = ExpenseLedgerService.total_upsert_statement(
+            async_db.engine.dialect.name, user_id, day, category, amount_cents
+        )
+        if statement is not None:
+            await db.execute(statement)
+            return
+
+        month = month_start(day)
+        result = await db.execute(
+            select(ExpenseTotal)
+            .filter_by(user_id=user_id, month=month, category=category)
+            .with_for_update()
+        )
+        total = result.scalars().first()
+        if total is None:
+            db.add(
+                ExpenseTotal(
+                    user_id=user_id,
+                    month=month,
+                    category=category,
+                    total_cents=amount_cents,
+                    expense_count=1,
+                )
+            )
+        else:
+            total.total_cents += amount_cents
+            total.expense_count += 1
+
+    async def mark_synced(self, ledger_ids: List[Optional[int]]) -> None:
+        ledger_ids = [ledger_id for ledger_id in ledger_ids if ledger_id is not None]
+        if not ledger_ids:
+            return
+        try:
+            async with async_db.session() as db:
+                await db.execute(
+                    update(ExpenseRecord)
+                    .where(ExpenseRecord.id.in_(ledger_ids))
+                    .values(synced_at=datetime.utcnow())
+                )
+                await db.commit()
+        except Exception as e:
+            self.logger.warning("Failed to mark ledger rows %s as synced: %s", ledger_ids, e)
+
+    async def discard(self, ledger_ids: List[Optional[int]]) -> None:
+        """Take unsynced ledger rows back out of the ledger and totals (see ``ExpenseLedgerService.discard``)."""
+        ledger_ids = [ledger_id for ledger_id in ledger_ids if ledger_id is not None]
+        if not ledger_ids:
+            return
+        try:
+            async with async_db.session() as db:
+                result = await db.execute(
+                    select(ExpenseRecord)
+                    .where(ExpenseRecord.id.in_(ledger_ids), ExpenseRecord.synced_at.is_(None))
+                    .with_for_update()
+                )
+                records = result.scalars().all()
+                for record in records:
+                    await db.execute(
+                        ExpenseLedgerService.total_decrement_statement(
+                            record.user_id, record.date, record.category, record.amount_cents
+                        )
+                    )
+                    await db.delete(record)
+                for user_id in {record.user_id for record in records}:
+                    await db.execute(ExpenseLedgerService.empty_totals_statement(user_id))
+                await db.commit()
+        except Exception as e:
+            self.logger.error("Failed to discard ledger rows %s: %s", ledger_ids, e)
@@ -0,0 +1,130 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from src.config.settings import Config
+from src.services.metrics import track_google_call
+
+
+class GoogleApiError(Exception):
+    """Non-2xx response from a Google endpoint."""
+
+    def __init__(self, status_code: int, message: str, headers: Optional[httpx.Headers] = None):
+        super().__init__(f"Google API returned {status_code}: {message}")
+        self.status_code = status_code
+        self.headers = headers
+
+
+class AsyncGoogleClient:
+    """
+    Pooled asyncio HTTP client for the Google OAuth token endpoint and the Sheets v4 REST API.
+
+    One client (and therefore one connection pool) is shared by every
+    request handled by the process; it must be closed with ``aclose``.
+    """
+
+    def __init__(self, max_connections: int, timeout: float):
+        self.logger = logging.getLogger(__name__)
+        self.token_uri = Config.GOOGLE_TOKEN_URI
+        self.sheets_url = Config.GOOGLE_SHEETS_API_URL.rstrip("/")
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(timeout),
+        )
+
+    async def _request(self, api_method: str, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        with track_google_call(api_method):
+            response = await self._http.request(method, url, **kwargs)
+            if response.status_code >= 400:
+                raise GoogleApiError(response.status_code, response.text[:500], response.headers)
+            return response.json() if response.content else {}
+
+    @staticmethod
+    def _auth(access_token: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {access_token}"}
+
+    async def exchange_code(self, code: str, redirect_uri: str) -> Dict[str, Any]:
+        """Exchange an OAuth authorization code for tokens."""
+        return await self._request(
+            "oauth.token",
+            "POST",
+            self.token_uri,
+            data={
+                "code": code,
+                "client_id": Config.GOOGLE_CLIENT_ID,
+                "client_secret": Config.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": redirect_uri,
+                "grant_type": "authorization_code",
+            },
+        )
+
+    async def refresh_access_token(self, refresh_token: str) -> Tuple[str, datetime]:
+        """
+        Exchange a refresh token for an access token.
+
+        Returns:
+            Tuple of (access token, expiry as naive UTC datetime)
+        """
+        data = await self._request(
+            "oauth.token",
+            "POST",
+            self.token_uri,
+            data={
+                "refresh_token": refresh_token,
+                "client_id": Config.GOOGLE_CLIENT_ID,
+                "client_secret": Config.GOOGLE_CLIENT_SECRET,
+                "grant_type": "refresh_token",
+            },
+        )
+        expires_at = datetime.utcnow() + timedelta(seconds=int(data.get("expires_in", 3600)))
+        return data["access_token"], expires_at
+
+    def _values_url(self, spreadsheet_id: str, range_: str, suffix: str = "") -> str:
+        return (
+            f"{self.sheets_url}/v4/spreadsheets/{quote(spreadsheet_id, safe='')}"
+            f"/values/{quote(range_, safe='')}{suffix}"
+        )
+
+    async def get_values(self, access_token: str, spreadsheet_id: str, range_: str) -> List[List[Any]]:
+        """Read a range of cells (spreadsheets.values.get)."""
+        data = await self._request(
+            "values.get",
+            "GET",
+            self._values_url(spreadsheet_id, range_),
+            headers=self._auth(access_token),
+        )
+        return data.get("values", [])
+
+    async def append_values(
+        self, access_token: str, spreadsheet_id: str, range_: str, rows: List[List[Any]]
+    ) -> Dict[str, Any]:
+        """Append rows after the table in ``range_`` (spreadsheets.values.append)."""
+        return await self._request(
+            "values.append",
+            "POST",
+            self._values_url(spreadsheet_id, range_, ":append"),
+            params={"valueInputOption": "USER_ENTERED", "insertDataOption": "INSERT_ROWS"},
+            headers=self._auth(access_token),
+            json={"values": rows, "majorDimension": "ROWS"},
+        )
+
+    async def batch_update(
+        self, access_token: str, spreadsheet_id: str, requests: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Apply formatting/structure requests (spreadsheets.batchUpdate)."""
+        return await self._request(
+            "batchUpdate",
+            "POST",
+            f"{self.sheets_url}/v4/spreadsheets/{quote(spreadsheet_id, safe='')}:batchUpdate",
+            headers=self._auth(access_token),
+            json={"requests": requests},
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from src.aio.database import async_db
+from src.config.settings import Config
+from src.models.processed_message import ProcessedMessage
+from src.services.idempotency_service import _MISSING, IdempotencyService
+
+
+class AsyncIdempotencyService(IdempotencyService):
+    """``IdempotencyService`` with its database round trips on the asyncio driver."""
+
+    async def aclaim(self, message_sid: str) -> Tuple[bool, Optional[str]]:
+        """Async counterpart of ``claim``."""
+        recalled = self._recall(message_sid)
+        if recalled is not _MISSING:
+            return False, recalled
+
+        try:
+            is_new, response = await self._aclaim_row(message_sid)
+        except Exception as e:
+            self.logger.error("Failed to check MessageSid %s, processing without deduplication: %s", message_sid, e)
+            is_new, response = True, None
+
+        if is_new:
+            self._remember(message_sid, None, self.lease)
+        elif response is not None:
+            self._remember(message_sid, response, self.ttl)
+        return is_new, response
+
+    async def _aclaim_row(self, message_sid: str) -> Tuple[bool, Optional[str]]:
+        now = datetime.utcnow()
+        async with async_db.session() as db:
+            row = await db.get(ProcessedMessage, message_sid)
+            if row is None:
+                db.add(
+                    ProcessedMessage(
+                        message_sid=message_sid,
+                        status=ProcessedMessage.STATUS_PROCESSING,
+                        expires_at=now + self.lease,
+                    )
+                )
+                try:
+                    await db.commit()
+                    return True, None
+                except IntegrityError:
+                    await db.rollback()
+                    row = await db.get(ProcessedMessage, message_sid)
+                    if row is None:
+                        return False, None
+
+            if row.expires_at <= now:
+                result = await db.execute(
+                    update(ProcessedMessage)
+                    .where(
+                        ProcessedMessage.message_sid == message_sid,
+                        ProcessedMessage.expires_at == row.expires_at,
+                    )
+                    .values(
+                        status=ProcessedMessage.STATUS_PROCESSING,
+                        response=None,
+                        expires_at=now + self.lease,
+                    )
+                )
+                await db.commit()
+                return result.rowcount == 1, None
+
+            if row.status == ProcessedMessage.STATUS_DONE:
+                return False, row.response
+            return False, None
+
+    async def acomplete(self, message_sid: str, response: str) -> None:
+        """Async counterpart of ``complete``."""
+        self._remember(message_sid, response, self.ttl)
+        try:
+            async with async_db.session() as db:
+                await db.execute(
+                    update(ProcessedMessage)
+                    .where(ProcessedMessage.message_sid == message_sid)
+                    .values(
+                        status=ProcessedMessage.STATUS_DONE,
+                        response=response,
+                        expires_at=datetime.utcnow() + self.ttl,
+                    )
+                )
+                await db.commit()
+            await self._apurge_expired()
+        except Exception as e:
+            self.logger.error("Failed to store reply for MessageSid %s: %s", message_sid, e)
+
+    async def arelease(self, message_sid: str) -> None:
+        """Async counterpart of ``release``."""
+        with self._lock:
+            self._recent.pop(message_sid, None)
+        try:
+            async with async_db.session() as db:
+                await db.execute(
+                    delete(ProcessedMessage).where(
+                        ProcessedMessage.message_sid == message_sid,
+                        ProcessedMessage.status == ProcessedMessage.STATUS_PROCESSING,
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            self.logger.error("Failed to release MessageSid %s: %s", message_sid, e)
+
+    async def _apurge_expired(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.PURGE_INTERVAL
+        async with async_db.session() as db:
+            await db.execute(delete(ProcessedMessage).where(ProcessedMessage.expires_at < datetime.utcnow()))
+            await db.commit()
+
+
+async_idempotency_service = AsyncIdempotencyService(
+    max_size=Config.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=Config.IDEMPOTENCY_TTL,
+    lease_seconds=Config.IDEMPOTENCY_LEASE,
+)
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from src.aio.database import async_db
+from src.aio.google_client import AsyncGoogleClient, GoogleApiError
+from src.models.access_token import GoogleAccessToken
+from src.models.spreadsheet_state import SpreadsheetState
+from src.services.google_sheets.rate_limiter import READ, WRITE, retry_after_seconds, sheets_rate_limiter
+from src.services.google_sheets.sheets_service import GoogleSheetsService
+from src.services.google_sheets.token_broker import TokenBroker
+from src.services.metrics import SHEETS_QUOTA_WAIT_SECONDS, time_stage
+from src.services.spreadsheet_state_service import SpreadsheetStateService
+
+
+class AsyncSheetsService:
+    """
+    Appends expenses to users' spreadsheets from the event loop.
+
+    Mirrors ``GoogleSheetsService`` and ``TokenBroker`` on top of
+    ``AsyncGoogleClient``: access tokens are shared with the sync workers
+    through the ``google_access_tokens`` table (same refresh token hash), and
+    spreadsheet setup is tracked in ``spreadsheet_states``. Concurrent
+    requests for the same user wait on one token refresh instead of each
+    calling the token endpoint.
+    """
+
+    def __init__(self, client: AsyncGoogleClient, refresh_margin: int):
+        self.client = client
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.logger = logging.getLogger(__name__)
+        self._tokens: Dict[int, Tuple[str, datetime, str]] = {}
+        self._refresh_locks: Dict[int, asyncio.Lock] = {}
+        self._initialized: Set[str] = set()
+
+    @staticmethod
+    def _hash(refresh_token: str) -> str:
+        # Same hash as TokenBroker, so tokens stored by either side are reused
+        return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+    def _is_fresh(self, expires_at: datetime) -> bool:
+        return expires_at - self.refresh_margin > datetime.utcnow()
+
+    def _cached_token(self, user_id: int, token_hash: str):
+        cached = self._tokens.get(user_id)
+        if cached and cached[2] == token_hash and self._is_fresh(cached[1]):
+            return cached[0]
+        return None
+
+    async def access_token(self, user, force_refresh: bool = False) -> str:
+        """
+        Return a still-valid access token for a user.
+
+        Args:
+            user: The user whose refresh token should be used
+            force_refresh: Skip the cached and stored tokens, e.g. after a 401
+
+        Returns:
+            str: The access token
+        """
+        token_hash = self._hash(user.google_token)
+        stale = self._tokens.get(user.id) if force_refresh else None
+        token = None if force_refresh else self._cached_token(user.id, token_hash)
+        if token:
+            return token
+
+        lock = self._refresh_locks.setdefault(user.id, asyncio.Lock())
+        async with lock:
+            token = self._cached_token(user.id, token_hash)
+            if token and (stale is None or token != stale[0]):
+                # Fresh, or already replaced by a concurrent forced refresh
+                return token
+
+            if not force_refresh:
+                try:
+                    async with async_db.session() as db:
+                        row = await db.get(GoogleAccessToken, user.id)
+                except Exception as e:
+                    self.logger.warning("Failed to load stored access token for user_id %s: %s", user.id, e)
+                    row = None
+                if row and row.refresh_token_hash == token_hash and self._is_fresh(row.expires_at):
+                    self._tokens[user.id] = (row.access_token, row.expires_at, token_hash)
+                    return row.access_token
+
+            token, expires_at = await self.client.refresh_access_token(user.google_token)
+            self.logger.debug("Refreshed Google access token for user_id: %s", user.id)
+            self._tokens[user.id] = (token, expires_at, token_hash)
+            try:
+                async with async_db.session() as db:
+                    values = TokenBroker.store_values(token, expires_at, token_hash, used=True)
+                    statement = TokenBroker.upsert_statement(async_db.engine.dialect.name, user.id, values)
+                    if statement is not None:
+                        await db.execute(statement)
+                    else:
+                        await db.merge(GoogleAccessToken(user_id=user.id, **values))
+                    await db.commit()
+            except Exception as e:
+                self.logger.warning("Failed to store access token for user_id %s: %s", user.id, e)
+            return token
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget the cached access token of a user, e.g. after their refresh token changed."""
+        self._tokens.pop(user_id, None)
+
+    async def _call(self, kind: str, user_id: int, call, *args) -> Any:
+        """
+        Make one Sheets call within the shared quota, as ``GoogleSheetsService._execute`` does.
+
+        The token buckets are shared with the sync workers; waiting for a token
+        sleeps on the event loop. A 429 pauses the bucket for its
+        ``Retry-After`` and the call is retried.
+
+        Args:
+            kind: READ or WRITE
+            user_id: Owner of the spreadsheet, for the per-user bucket
+            call: AsyncGoogleClient method to call with ``args``
+
+        Raises:
+            SheetsRateLimited: If no quota is available within the priority's wait budget
+            GoogleApiError: If Google answers with an error other than a retried 429
+        """
+        priority = sheets_rate_limiter.priority()
+        for attempt in itertools.count():
+            # The buckets are guarded by a file lock, so take them off the loop
+            wait = await asyncio.to_thread(sheets_rate_limiter.reserve, kind, user_id, priority)
+            SHEETS_QUOTA_WAIT_SECONDS.labels(priority=priority).observe(wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await call(*args)
+            except GoogleApiError as error:
+                if error.status_code != 429 or attempt >= sheets_rate_limiter.max_retries:
+                    raise
+                await asyncio.to_thread(
+                    sheets_rate_limiter.throttled,
+                    kind,
+                    user_id,
+                    retry_after_seconds(error.headers, default=2 ** attempt),
+                    "per user" in str(error).lower(),
+                )
+
+    async def ensure_initialized(self, access_token: str, spreadsheet_id: str, user_id: int) -> None:
+        """Write the header and date format once per spreadsheet, as GoogleSheetsService does."""
+        if spreadsheet_id in self._initialized:
+            return
+
+        try:
+            async with async_db.session() as db:
+                state = await db.get(SpreadsheetState, spreadsheet_id)
+                initialized = bool(state and state.initialized_at)
+        except Exception as e:
+            self.logger.warning("Could not read spreadsheet state, checking header instead: %s", e)
+            initialized = False
+
+        if not initialized:
+            with time_stage("header_exists"):
+                header = await self._call(
+                    READ, user_id, self.client.get_values,
+                    access_token, spreadsheet_id, GoogleSheetsService.HEADER_RANGE,
+                )
+            if not header:
+                await self._call(
+                    WRITE,
+                    user_id,
+                    self.client.batch_update,
+                    access_token,
+                    spreadsheet_id,
+                    [GoogleSheetsService._header_request(), GoogleSheetsService._date_format_request()],
+                )
+                self.logger.info("Initialized spreadsheet %s", spreadsheet_id)
+            try:
+                async with async_db.session() as db:
+                    values = {"initialized_at": datetime.utcnow()}
+                    statement = SpreadsheetStateService.upsert_statement(
+                        async_db.engine.dialect.name, spreadsheet_id, values
+                    )
+                    if statement is not None:
+                        await db.execute(statement)
+                    else:
+                        state = await db.get(SpreadsheetState, spreadsheet_id)
+                        if state is None:
+                            state = SpreadsheetState(spreadsheet_id=spreadsheet_id)
+                            db.add(state)
+                        state.initialized_at = values["initialized_at"]
+                    await db.commit()
+            except IntegrityError:
+                # Recorded by a concurrent request in the meantime
+                pass
+            except Exception as e:
+                self.logger.warning("Failed to record initialization of spreadsheet %s: %s", spreadsheet_id, e)
+
+        self._initialized.add(spreadsheet_id)
+
+    async def append_expenses(self, user, items: List[Dict[str, Any]]) -> bool:
+        """
+        Append expenses to the user's spreadsheet in a single Sheets call.
+
+        A 401 (revoked or expired access token) drops the cached token and is
+        retried once with a fresh one. Calls wait for Sheets quota like the
+        sync workers do (see ``_call``).
+
+        Args:
+            user: The user who sent the expenses
+            items: Processed expense data from PriceProcessorService
+
+        Returns:
+            bool: True if successful, False otherwise
+
+        Raises:
+            SheetsRateLimited: If no Sheets quota is available in time
+        """
+        rows = [GoogleSheetsService._expense_row(data) for data in items]
+        for attempt in range(2):
+            try:
+                with time_stage("credentials"):
+                    access_token = await self.access_token(user, force_refresh=attempt > 0)
+                await self.ensure_initialized(access_token, user.google_sheets_id, user.id)
+                with time_stage("append"):
+                    await self._call(
+                        WRITE, user.id, self.client.append_values,
+                        access_token, user.google_sheets_id, GoogleSheetsService.RANGE, rows,
+                    )
+                self.logger.info("Successfully appended %s rows to spreadsheet %s", len(rows), user.google_sheets_id)
+                return True
+            except GoogleApiError as error:
+                if error.status_code == 401 and attempt == 0:
+                    continue
+                self.logger.error("Error appending rows: %s", error)
+                return False
+        return False
@@ -0,0 +1,104 @@
+import logging
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError, TimeoutError
+
+from src.aio.database import async_db
+from src.config.database import db_circuit_breaker
+from src.models.access_token import GoogleAccessToken
+from src.models.user import User
+from src.services.user_cache import UserSnapshot, ValidationResult, normalize_phone_number, user_cache
+from src.services.user_service import UserService
+
+CONNECTION_ERRORS = (OperationalError, DisconnectionError, TimeoutError, InterfaceError, OSError)
+
+
+class AsyncUserService:
+    """
+    User lookups for the async serving mode.
+
+    Uses the same user cache, circuit breaker and checks as ``UserService``;
+    only the database round trips go through the asyncio driver. Connection
+    errors are not retried in-request: the breaker's background probe takes
+    care of recovery.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._user_service = UserService()
+
+    async def validate_user(self, phone_number: str) -> ValidationResult:
+        """
+        Validate if a user exists, is active, and has valid Google Sheets credentials.
+
+        Args:
+            phone_number: User's phone number
+
+        Returns:
+            Tuple containing:
+            - bool: Whether the user is valid
+            - str: Error message if invalid, empty string if valid
+            - UserSnapshot: Detached user snapshot if valid, None if invalid
+        """
+        phone_number = normalize_phone_number(phone_number)
+
+        cached = user_cache.get(phone_number)
+        if cached is not None:
+            return cached
+
+        if not db_circuit_breaker.allow_request():
+            return False, "Erro de conexão com o banco de dados. Tente novamente.", None
+
+        try:
+            async with async_db.session() as db:
+                result = await db.execute(select(User).where(User.phone_number == phone_number))
+                user = result.scalars().first()
+        except CONNECTION_ERRORS as e:
+            db_circuit_breaker.record_failure()
+            self.logger.warning("Database connection error in validate_user: %s", e)
+            return False, "Erro de conexão com o banco de dados. Tente novamente.", None
+        except Exception as e:
+            self.logger.error("Unexpected error in validate_user: %s", e)
+            return False, "Erro ao validar usuário.", None
+        db_circuit_breaker.record_success()
+
+        is_valid, message, user = self._user_service._check_user(user, phone_number)
+        result = (is_valid, message, UserSnapshot.from_user(user) if user else None)
+        user_cache.set(phone_number, result)
+        return result
+
+    async def update_google_token(
+        self, user_id: int, google_token: str
+    ) -> Tuple[bool, str, Optional[UserSnapshot]]:
+        """
+        Store a new Google refresh token for a user.
+
+        Args:
+            user_id: ID of the user
+            google_token: The new refresh token
+
+        Returns:
+            Tuple containing:
+            - bool: Whether the token was stored
+            - str: Success/error message
+            - UserSnapshot: The updated user, None on failure
+        """
+        try:
+            async with async_db.session() as db:
+                user = await db.get(User, user_id)
+                if not user:
+                    return False, "Usuário não encontrado.", None
+                user.google_token = google_token
+                await db.execute(delete(GoogleAccessToken).where(GoogleAccessToken.user_id == user_id))
+                await db.commit()
+                snapshot = UserSnapshot.from_user(user)
+        except CONNECTION_ERRORS as e:
+            self.logger.warning("Database connection error in update_google_token: %s", e)
+            return False, "Erro de conexão com o banco de dados. Tente novamente.", None
+        except Exception as e:
+            self.logger.error("Unexpected error in update_google_token: %s", e)
+            return False, "Erro ao atualizar token do Google Sheets.", None
+
+        user_cache.invalidate(snapshot.phone_number)
+        return True, "Token do Google Sheets atualizado com sucesso.", snapshot
@@ -1,9 +1,68 @@
-from sqlalchemy import create_engine
+import os
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from src.config.settings import Config
+from src.services.circuit_breaker import CircuitBreaker
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+    }
+    # SQLite uses its own single-connection pools, which don't take sizing options
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def _create_engine(url: str) -> Engine:
+    return create_engine(url, **_engine_options(url))
 
-engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+
+engine = _create_engine(Config.SQLALCHEMY_DATABASE_URI)
+read_engine = (
+    _create_engine(Config.SQLALCHEMY_READ_REPLICA_URI)
+    if Config.SQLALCHEMY_READ_REPLICA_URI
+    else engine
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+def reset_pools() -> None:
+    """
+    Drop pooled connections inherited from a parent process.
+
+    ``close=False`` leaves the parent's sockets alone, so a forked gunicorn
+    worker never shares a connection with the master or its siblings.
+    """
+    engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=reset_pools)
+
+
+def ping_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+db_circuit_breaker = CircuitBreaker(
+    "database",
+    probe=ping_database,
+    failure_threshold=Config.DB_BREAKER_FAILURE_THRESHOLD,
+    probe_interval=Config.DB_BREAKER_PROBE_INTERVAL,
+    retry_ratio=Config.DB_RETRY_BUDGET_RATIO,
+)
 
 
 def get_db():
@@ -16,5 +75,10 @@ def get_db():
 
 def init_db():
     from src.models.user import Base
+    import src.models.access_token  # noqa: F401
+    import src.models.spreadsheet_state  # noqa: F401
+    import src.models.outbox  # noqa: F401
+    import src.models.expense  # noqa: F401
+    import src.models.processed_message  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,255 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from src.config.settings import Config
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Arguments that can be formatted later on another thread without changing meaning
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None), bytes)
+
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line.
+
+    Besides time, level, logger, process and message, fields passed with
+    ``extra={...}`` are written as top-level keys, so
+    ``logger.info("Saved %s rows", n, extra={"user_id": 42})`` can be
+    filtered on ``user_id`` without parsing the message.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the INFO and DEBUG records of selected loggers.
+
+    Warnings and errors always pass. A rate applies to a logger and its
+    children and the most specific one wins, so ``{"src.services": 0.1,
+    "src.services.user_service": 1.0}`` keeps a tenth of the success-path
+    messages of every service except the user service. Kept records carry
+    a ``sample_rate`` field so counts can be scaled back up.
+
+    Args:
+        rates: Share of records to keep (0 to 1) by logger name; ``*`` sets
+            the default for loggers not listed
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = self.rates.get("*", 1.0)
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to a bounded queue without ever waiting on it.
+
+    Unlike the stock ``QueueHandler``, the message is not formatted here:
+    ``msg % args`` and JSON encoding run on the listener thread. Arguments
+    that aren't plain values are turned into strings first, so objects
+    changed after the call are logged as they were. When the queue is full
+    the record is dropped and the count is reported with the next record
+    that fits.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.args, Mapping):
+            record.args = {key: _freeze(value) for key, value in record.args.items()}
+        elif record.args:
+            record.args = tuple(_freeze(arg) for arg in record.args)
+        if record.exc_info:
+            # Tracebacks hold frames that must not outlive the request
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            warning = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0, "Log queue full, dropped %s records", (dropped,), None
+            )
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                self.dropped += dropped
+
+
+def _freeze(value):
+    return value if isinstance(value, _IMMUTABLE_TYPES) else str(value)
+
+
+def parse_sampling_rates(value: Optional[str]) -> Dict[str, float]:
+    """
+    Parse LOG_SAMPLING, e.g. ``"app=0.1,src.services.expense_service=0.05"``.
+
+    Raises:
+        ValueError: If an entry isn't ``logger=rate`` with a rate between 0 and 1
+    """
+    rates = {}
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, separator, rate = entry.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid LOG_SAMPLING entry: {entry!r}")
+        rates[name.strip()] = float(rate)
+        if not 0.0 <= rates[name.strip()] <= 1.0:
+            raise ValueError(f"LOG_SAMPLING rate must be between 0 and 1: {entry!r}")
+    return rates
+
+
+def _build_handlers(config) -> List[logging.Handler]:
+    formatter = JsonFormatter() if config.LOG_JSON else logging.Formatter(config.LOG_FORMAT)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    handlers: List[logging.Handler] = [stream_handler]
+
+    if config.LOG_CLOUDWATCH_GROUP:
+        try:
+            import watchtower
+
+            options = {"log_group_name": config.LOG_CLOUDWATCH_GROUP}
+            if config.LOG_CLOUDWATCH_STREAM:
+                options["log_stream_name"] = config.LOG_CLOUDWATCH_STREAM
+            cloudwatch_handler = watchtower.CloudWatchLogHandler(**options)
+            cloudwatch_handler.setFormatter(JsonFormatter())
+            handlers.append(cloudwatch_handler)
+        except Exception as e:
+            stream_handler.handle(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": "CloudWatch logging disabled: %s",
+                        "args": (e,),
+                    }
+                )
+            )
+    return handlers
+
+
+def configure_logging(config=Config) -> None:
+    """
+    Send all logging through a queue drained by a background thread.
+
+    Request threads only filter the record and put it on a bounded queue;
+    formatting and writing to stderr (and CloudWatch when
+    LOG_CLOUDWATCH_GROUP is set) happen on the listener thread. Safe to
+    call more than once, and like ``logging.basicConfig`` it leaves an
+    already configured root logger alone. Forked children (gunicorn
+    workers started from a preloaded app) get a fresh queue and listener.
+
+    Args:
+        config: Settings object providing the LOG_* values
+    """
+    global _queue_handler, _listener
+    with _lock:
+        root = logging.getLogger()
+        if _listener is not None or root.handlers:
+            return
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(config.LOG_QUEUE_SIZE))
+        rates = parse_sampling_rates(config.LOG_SAMPLING)
+        if rates:
+            queue_handler.addFilter(SamplingFilter(rates))
+        listener = QueueListener(queue_handler.queue, *_build_handlers(config), respect_handler_level=True)
+
+        root.setLevel(config.LOG_LEVEL)
+        root.addHandler(queue_handler)
+        listener.start()
+        _queue_handler, _listener = queue_handler, listener
+
+    atexit.register(stop_logging)
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _restart_after_fork() -> None:
+    # The listener thread doesn't survive fork and the queue's lock may have
+    # been held at that moment, so the child starts over with a new pair.
+    global _lock, _listener
+    _lock = threading.Lock()
+    if _listener is None or _queue_handler is None:
+        return
+    _queue_handler.queue = queue.Queue(_queue_handler.queue.maxsize)
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
@@ -1,5 +1,5 @@
-import logging
 import os
+import tempfile
 from typing import Dict, Any
 
 
@@ -12,8 +12,13 @@ class BaseConfig:
     SECRET_KEY = os.environ.get("FLASK_SECRET_KEY")
 
     # Logging
-    LOG_LEVEL = logging.INFO
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_JSON = os.environ.get("LOG_JSON", "true").lower() == "true"
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    LOG_SAMPLING = os.environ.get("LOG_SAMPLING", "")
+    LOG_CLOUDWATCH_GROUP = os.environ.get("LOG_CLOUDWATCH_GROUP")
+    LOG_CLOUDWATCH_STREAM = os.environ.get("LOG_CLOUDWATCH_STREAM")
 
     # Google Sheets
     GOOGLE_CREDENTIALS_PATH = os.environ.get("GOOGLE_CREDENTIALS_PATH")
@@ -21,10 +26,95 @@ class BaseConfig:
     GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET = os.environ.get("GOOGLE_CLIENT_SECRET")
     GOOGLE_REDIRECT_URI = os.environ.get("GOOGLE_REDIRECT_URI")
+    GOOGLE_TOKEN_URI = os.environ.get(
+        "GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token"
+    )
+    GOOGLE_TOKEN_REFRESH_MARGIN = int(os.environ.get("GOOGLE_TOKEN_REFRESH_MARGIN", "300"))
+    GOOGLE_TOKEN_REFRESH_INTERVAL = int(os.environ.get("GOOGLE_TOKEN_REFRESH_INTERVAL", "60"))
+    GOOGLE_TOKEN_REFRESH_IDLE = int(os.environ.get("GOOGLE_TOKEN_REFRESH_IDLE", "86400"))
+    GOOGLE_SHEETS_DISCOVERY_PATH = os.environ.get("GOOGLE_SHEETS_DISCOVERY_PATH")
+    GOOGLE_SHEETS_API_URL = os.environ.get("GOOGLE_SHEETS_API_URL", "https://sheets.googleapis.com")
+    GOOGLE_HTTP_POOL_SIZE = int(os.environ.get("GOOGLE_HTTP_POOL_SIZE", "20"))
+    GOOGLE_HTTP_CONNECT_TIMEOUT = float(os.environ.get("GOOGLE_HTTP_CONNECT_TIMEOUT", "3"))
+    GOOGLE_HTTP_TIMEOUT = float(os.environ.get("GOOGLE_HTTP_TIMEOUT", "10"))
+    SHEETS_CLIENT_CACHE_SIZE = int(os.environ.get("SHEETS_CLIENT_CACHE_SIZE", "256"))
+    SHEETS_CLIENT_CACHE_TTL = int(os.environ.get("SHEETS_CLIENT_CACHE_TTL", "900"))
+    SHEETS_BATCH_WINDOW_MS = int(os.environ.get("SHEETS_BATCH_WINDOW_MS", "0"))
+    SHEETS_BATCH_MAX_ROWS = int(os.environ.get("SHEETS_BATCH_MAX_ROWS", "50"))
+
+    # Sheets API quotas, enforced per host by a shared token bucket
+    SHEETS_RATE_LIMIT_FILE = os.environ.get(
+        "SHEETS_RATE_LIMIT_FILE",
+        os.path.join(tempfile.gettempdir(), "whatssheet-sheets-quota.json"),
+    )
+    SHEETS_PROJECT_READS_PER_MINUTE = int(os.environ.get("SHEETS_PROJECT_READS_PER_MINUTE", "250"))
+    SHEETS_PROJECT_WRITES_PER_MINUTE = int(os.environ.get("SHEETS_PROJECT_WRITES_PER_MINUTE", "250"))
+    SHEETS_USER_READS_PER_MINUTE = int(os.environ.get("SHEETS_USER_READS_PER_MINUTE", "50"))
+    SHEETS_USER_WRITES_PER_MINUTE = int(os.environ.get("SHEETS_USER_WRITES_PER_MINUTE", "50"))
+    SHEETS_RATE_LIMIT_BURST_SECONDS = float(os.environ.get("SHEETS_RATE_LIMIT_BURST_SECONDS", "10"))
+    SHEETS_RATE_LIMIT_RESERVE = float(os.environ.get("SHEETS_RATE_LIMIT_RESERVE", "0.2"))
+    SHEETS_RATE_LIMIT_MAX_WAIT = float(os.environ.get("SHEETS_RATE_LIMIT_MAX_WAIT", "5"))
+    SHEETS_RATE_LIMIT_BACKGROUND_MAX_WAIT = float(os.environ.get("SHEETS_RATE_LIMIT_BACKGROUND_MAX_WAIT", "60"))
+    SHEETS_RATE_LIMIT_MAX_RETRIES = int(os.environ.get("SHEETS_RATE_LIMIT_MAX_RETRIES", "3"))
+
+    # Twilio
+    TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
+    TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
+    TWILIO_WHATSAPP_NUMBER = os.environ.get("TWILIO_WHATSAPP_NUMBER")
+
+    DIGEST_SEND_CONCURRENCY = int(os.environ.get("DIGEST_SEND_CONCURRENCY", "8"))
+
+    # Background writes
+    ASYNC_WRITES = os.environ.get("ASYNC_WRITES", "false").lower() == "true"
+    OUTBOX_WORKERS = int(os.environ.get("OUTBOX_WORKERS", "4"))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get("OUTBOX_POLL_INTERVAL", "1.0"))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_VISIBILITY_TIMEOUT = int(os.environ.get("OUTBOX_VISIBILITY_TIMEOUT", "300"))
+
+    # User lookup cache
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "300"))
+    USER_CACHE_NEGATIVE_TTL = int(os.environ.get("USER_CACHE_NEGATIVE_TTL", "60"))
+    USER_CACHE_VERSION_FILE = os.environ.get(
+        "USER_CACHE_VERSION_FILE",
+        os.path.join(tempfile.gettempdir(), "whatssheet-user-cache.version"),
+    )
+
+    # Webhook deduplication by Twilio MessageSid
+    IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "10000"))
+    IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+    IDEMPOTENCY_LEASE = int(os.environ.get("IDEMPOTENCY_LEASE", "60"))
+
+    # Category normalization
+    CATEGORY_INDEX_MAX_USERS = int(os.environ.get("CATEGORY_INDEX_MAX_USERS", "10000"))
+    CATEGORY_INDEX_TTL = int(os.environ.get("CATEGORY_INDEX_TTL", "3600"))
+
+    # Startup
+    WARMUP_USERS = int(os.environ.get("WARMUP_USERS", "0"))
+
+    # Traffic capture for offline replay (benchmarks/replay_traffic.py)
+    TRAFFIC_CAPTURE_PATH = os.environ.get("TRAFFIC_CAPTURE_PATH")
+    TRAFFIC_CAPTURE_SALT = os.environ.get("TRAFFIC_CAPTURE_SALT")
+    TRAFFIC_CAPTURE_MAX_BYTES = int(os.environ.get("TRAFFIC_CAPTURE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+    # Async (ASGI) serving mode
+    SQLALCHEMY_ASYNC_DATABASE_URI = os.environ.get("SQLALCHEMY_ASYNC_DATABASE_URI")
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.environ.get("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+    ASYNC_HTTP_TIMEOUT = float(os.environ.get("ASYNC_HTTP_TIMEOUT", "10"))
 
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI")
+    SQLALCHEMY_READ_REPLICA_URI = os.environ.get("SQLALCHEMY_READ_REPLICA_URI")
+    READ_REPLICA_MAX_LAG = float(os.environ.get("READ_REPLICA_MAX_LAG", "30"))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("DB_BREAKER_FAILURE_THRESHOLD", "5"))
+    DB_BREAKER_PROBE_INTERVAL = float(os.environ.get("DB_BREAKER_PROBE_INTERVAL", "2.0"))
+    DB_RETRY_BUDGET_RATIO = float(os.environ.get("DB_RETRY_BUDGET_RATIO", "0.2"))
+    DB_RETRY_MAX_DELAY = float(os.environ.get("DB_RETRY_MAX_DELAY", "0.5"))
 
     @classmethod
     def validate_config(cls) -> None:
@@ -38,6 +128,14 @@ class BaseConfig:
             "GOOGLE_CLIENT_SECRET": cls.GOOGLE_CLIENT_SECRET,
             "GOOGLE_REDIRECT_URI": cls.GOOGLE_REDIRECT_URI,
         }
+        if cls.ASYNC_WRITES:
+            required_vars.update(
+                {
+                    "TWILIO_ACCOUNT_SID": cls.TWILIO_ACCOUNT_SID,
+                    "TWILIO_AUTH_TOKEN": cls.TWILIO_AUTH_TOKEN,
+                    "TWILIO_WHATSAPP_NUMBER": cls.TWILIO_WHATSAPP_NUMBER,
+                }
+            )
 
         missing_vars = [var for var, value in required_vars.items() if not value]
         if missing_vars:
@@ -50,6 +148,7 @@ class DevelopmentConfig(BaseConfig):
     """Development configuration."""
 
     DEBUG = True
+    LOG_JSON = os.environ.get("LOG_JSON", "false").lower() == "true"
     SECRET_KEY = os.environ.get("FLASK_SECRET_KEY", "dev-key-for-testing")
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "SQLALCHEMY_DATABASE_URI", "sqlite:///whatssheet.db"
@@ -77,7 +176,7 @@ class TestingConfig(BaseConfig):
 class ProductionConfig(BaseConfig):
     """Production configuration."""
 
-    LOG_LEVEL = logging.WARNING
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "WARNING").upper()
 
     @classmethod
     def validate_config(cls) -> None:
@@ -1,6 +1,10 @@
 from flask import request, Response, current_app
 from src.services.user_service import UserService
 from src.services.expense_service import ExpenseService
+from src.services.idempotency_service import idempotency_service
+from src.services.metrics import WEBHOOK_REQUEST_SECONDS, time_stage
+from src.services.outbox_service import OutboxService
+from src.services.summary_service import SummaryService
 from src.views.whatsapp_view import WhatsAppView
 
 class WhatsAppController:
@@ -8,32 +12,132 @@ class WhatsAppController:
         self.view = WhatsAppView()
         self.user_service = UserService()
         self.expense_service = ExpenseService()
+        self.outbox_service = OutboxService()
+        self.summary_service = SummaryService()
 
     def handle_webhook(self) -> Response:
-        """Handle incoming WhatsApp webhook requests."""
+        """
+        Handle incoming WhatsApp webhook requests.
+
+        Twilio retries a slow webhook with the same MessageSid; a retry is
+        answered with the reply of the first delivery and never reaches the
+        expense or Sheets services.
+        """
+        with WEBHOOK_REQUEST_SECONDS.time():
+            return self._handle_delivery()
+
+    def _handle_delivery(self) -> Response:
+        message_sid = request.values.get("MessageSid", "").strip()
+        if not message_sid or not idempotency_service.enabled:
+            return self._handle_message()
+
+        is_new, previous_reply = idempotency_service.claim(message_sid)
+        if not is_new:
+            current_app.logger.info("Duplicate webhook delivery for MessageSid %s", message_sid)
+            if previous_reply is None:
+                twiml, mimetype = self.view.format_empty_twiml_response()
+            else:
+                twiml, mimetype = previous_reply, "application/xml"
+            return Response(twiml, mimetype=mimetype)
+
+        try:
+            response = self._handle_message()
+        except Exception:
+            idempotency_service.release(message_sid)
+            raise
+        idempotency_service.complete(message_sid, response.get_data(as_text=True))
+        return response
+
+    def _handle_message(self) -> Response:
         incoming = request.values.get("Body", "").strip()
-        cellphone_number = request.values.get("From", "").strip().split(":")[-1]
+        reply_to = request.values.get("From", "").strip()
+        cellphone_number = reply_to.split(":")[-1]
 
-        current_app.logger.info(f"Received webhook request from {cellphone_number}")
-        current_app.logger.debug(f"Message content: {incoming}")
+        current_app.logger.info("Received webhook request from %s", cellphone_number)
+        current_app.logger.debug("Message content: %s", incoming)
 
-        is_valid, error_message, user = self.user_service.validate_user(cellphone_number)
+        with time_stage("user_lookup"):
+            is_valid, error_message, user = self.user_service.validate_user(cellphone_number)
         if not is_valid:
-            current_app.logger.warning(f"Invalid user attempt from {cellphone_number}: {error_message}")
-            twiml, mimetype = self.view.format_twiml_response(error_message)
-            return Response(twiml, mimetype=mimetype)
+            current_app.logger.warning("Invalid user attempt from %s: %s", cellphone_number, error_message)
+            return self._twiml(error_message)
+
+        current_app.logger.debug("User validated successfully: %s", user)
+
+        summary_request = self.summary_service.parse_command(incoming)
+        if summary_request:
+            return self._handle_summary(summary_request, user)
+
+        if current_app.config["ASYNC_WRITES"]:
+            try:
+                return self._enqueue_expense(incoming, user, reply_to)
+            except Exception as e:
+                current_app.logger.error("Failed to queue expense for user %s, saving inline: %s", user, e)
 
-        current_app.logger.debug(f"User validated successfully: {user}")
+        if self.expense_service.is_multi_expense(incoming):
+            is_success, message, expenses = self.expense_service.process_expenses(incoming, user)
+            if is_success:
+                current_app.logger.info("Processed %s expenses from a multi-line message for user %s", len(expenses), user)
+            else:
+                current_app.logger.warning("Failed to process multi-line message for user %s: %s", user, message)
+            return self._twiml(message)
 
         is_success, message, expense = self.expense_service.process_expense(
             incoming, user
         )
         if is_success:
-            current_app.logger.info(f"Expense processed successfully for user {user}: {expense}")
+            current_app.logger.info("Expense processed successfully for user %s: %s", user, expense)
             message = self.view.format_success(expense)
         else:
-            current_app.logger.warning(f"Failed to process expense for user {user}: {message}")
+            current_app.logger.warning("Failed to process expense for user %s: %s", user, message)
 
-        twiml, mimetype = self.view.format_twiml_response(message)
-        current_app.logger.debug(f"Sending response: {message}")
+        current_app.logger.debug("Sending response: %s", message)
+        return self._twiml(message)
+
+    def _enqueue_expense(self, incoming: str, user, reply_to: str) -> Response:
+        """Parse the expense(s) and queue them; the confirmation is sent by the outbox worker."""
+        if self.expense_service.is_multi_expense(incoming):
+            items, failed_lines = self.expense_service.parse_expenses(incoming)
+            if not items:
+                return self._twiml(self.view.format_invalid_format())
+            data = {
+                "expenses": [self.expense_service.record_expense(item, user) for item in items],
+                "failed_lines": failed_lines,
+            }
+        else:
+            is_valid, error_message, data = self.expense_service.parse_expense(incoming)
+            if not is_valid:
+                return self._twiml(error_message)
+            data = self.expense_service.record_expense(data, user)
+
+        try:
+            job_id = self.outbox_service.enqueue(user.id, reply_to, data)
+        except Exception:
+            # The expense is saved inline instead, which records it again
+            self.expense_service.discard_expenses(data.get("expenses", [data]))
+            raise
+        current_app.logger.info("Expense queued for user %s as outbox message %s", user, job_id)
+
+        outbox_worker = current_app.extensions.get("outbox_worker")
+        if outbox_worker:
+            outbox_worker.notify()
+
+        twiml, mimetype = self.view.format_empty_twiml_response()
         return Response(twiml, mimetype=mimetype)
+
+    def _handle_summary(self, summary_request, user) -> Response:
+        """Reply to a ``resumo`` command from the running totals."""
+        try:
+            with time_stage("summary"):
+                label, totals = self.summary_service.get_totals(user.id, summary_request)
+            message = self.view.format_summary(label, totals, summary_request.category)
+        except Exception as e:
+            current_app.logger.error("Failed to build summary for user %s: %s", user, e)
+            message = self.view.format_summary_error()
+
+        return self._twiml(message)
+
+    def _twiml(self, message: str) -> Response:
+        with time_stage("twiml"):
+            twiml, mimetype = self.view.format_twiml_response(message)
+            return Response(twiml, mimetype=mimetype)
@@ -0,0 +1,84 @@
+"""
+Send every active user a month-end spending digest.
+
+Usage:
+    python -m src.jobs.monthly_digest --month 2026-09 --dry-run
+"""
+import argparse
+import logging
+import time
+from datetime import date, datetime
+from typing import Dict, Iterator, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.config.database import ReadSessionLocal  # noqa: E402
+from src.config.logging_setup import configure_logging  # noqa: E402
+from src.config.settings import Config  # noqa: E402
+from src.models.user import User  # noqa: E402
+from src.services.reporting import (  # noqa: E402
+    ConcurrentSender,
+    DigestReport,
+    add_months,
+    compute_monthly_digests,
+    load_expense_columns,
+)
+from src.services.twilio_service import TwilioMessenger  # noqa: E402
+from src.views.whatsapp_view import WhatsAppView  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def _active_phone_numbers() -> Dict[int, str]:
+    with ReadSessionLocal() as db:
+        return dict(db.query(User.id, User.phone_number).filter(User.is_active.is_(True)).all())
+
+
+def render_messages(report: DigestReport, phone_numbers: Dict[int, str]) -> Iterator[Tuple[str, str]]:
+    """Yield (recipient, body) for every active user with spending in the report."""
+    for digest in report:
+        phone_number = phone_numbers.get(digest.user_id)
+        if phone_number:
+            yield f"whatsapp:{phone_number}", WhatsAppView.format_monthly_digest(digest)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Send month-end spending digests.")
+    parser.add_argument(
+        "--month",
+        type=lambda value: datetime.strptime(value, "%Y-%m").date(),
+        default=add_months(date.today().replace(day=1), -1),
+        help="Month to report as YYYY-MM (defaults to the previous month)",
+    )
+    parser.add_argument("--concurrency", type=int, default=Config.DIGEST_SEND_CONCURRENCY)
+    parser.add_argument("--dry-run", action="store_true", help="Print digests instead of sending them")
+    args = parser.parse_args()
+
+    configure_logging()
+    month = args.month.replace(day=1)
+
+    started_at = time.perf_counter()
+    columns = load_expense_columns(add_months(month, -1), add_months(month, 1))
+    report = compute_monthly_digests(columns, month)
+    logger.info(
+        "Aggregated %s expenses for %s users in %.2fs",
+        len(columns),
+        len(columns.user_ids),
+        time.perf_counter() - started_at,
+    )
+
+    messages = render_messages(report, _active_phone_numbers())
+    if args.dry_run:
+        for to, body in messages:
+            print(f"--- {to}\n{body}")
+        return 0
+
+    sent, failed = ConcurrentSender(TwilioMessenger(), args.concurrency).send_all(messages)
+    logger.info("Monthly digest for %s: %s sent, %s failed", month.strftime("%m/%Y"), sent, failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+
+from src.models.user import Base
+
+
+class GoogleAccessToken(Base):
+    __tablename__ = "google_access_tokens"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    access_token = Column(String(2048), nullable=False)
+    refresh_token_hash = Column(String(64), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_used_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<GoogleAccessToken(user_id={self.user_id}, expires_at='{self.expires_at}')>"
@@ -1,5 +1,10 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Boolean, ForeignKey, Index
+
+from src.models.user import Base
 
 
 @dataclass
@@ -20,3 +25,50 @@ class Expense:
             date=data["date"],
             is_split=data.get("is_split", False),
         )
+
+    @property
+    def amount_cents(self) -> int:
+        return int((Decimal(str(self.price)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+    @property
+    def date_value(self) -> date:
+        return datetime.strptime(self.date, "%d/%m/%Y").date()
+
+
+class ExpenseRecord(Base):
+    """Ledger row for a recorded expense; the Google Sheet is a downstream replica."""
+
+    __tablename__ = "expenses"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    product = Column(String(255), nullable=False)
+    category = Column(String(100), nullable=False)
+    amount_cents = Column(Integer, nullable=False)
+    is_split = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    synced_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_expenses_user_id_date", "user_id", "date"),
+        Index("ix_expenses_user_id_category", "user_id", "category"),
+    )
+
+    def __repr__(self):
+        return f"<ExpenseRecord(id={self.id}, user_id={self.user_id}, amount_cents={self.amount_cents})>"
+
+
+class ExpenseTotal(Base):
+    """Running total of a user's expenses per month and category, updated on every record."""
+
+    __tablename__ = "expense_totals"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)
+    total_cents = Column(BigInteger, nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ExpenseTotal(user_id={self.user_id}, month='{self.month}', category='{self.category}')>"
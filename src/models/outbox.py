@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+
+from src.models.user import Base
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    STATUS_PENDING = "pending"
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    reply_to = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String(16), nullable=False, default=STATUS_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index("ix_outbox_messages_status_available_at", "status", "available_at"),)
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, status='{self.status}')>"
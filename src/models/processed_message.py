@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Text, Index
+
+from src.models.user import Base
+
+
+class ProcessedMessage(Base):
+    """Twilio webhook already handled (or being handled), keyed by MessageSid."""
+
+    __tablename__ = "processed_messages"
+
+    STATUS_PROCESSING = "processing"
+    STATUS_DONE = "done"
+
+    message_sid = Column(String(64), primary_key=True)
+    status = Column(String(16), nullable=False, default=STATUS_PROCESSING)
+    response = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_processed_messages_expires_at", "expires_at"),)
+
+    def __repr__(self):
+        return f"<ProcessedMessage(message_sid='{self.message_sid}', status='{self.status}')>"
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from src.models.user import Base
+
+
+class SpreadsheetState(Base):
+    __tablename__ = "spreadsheet_states"
+
+    spreadsheet_id = Column(String(100), primary_key=True)
+    initialized_at = Column(DateTime, nullable=True)
+    # Row 1 holds the header, so reading starts after it
+    last_synced_row = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SpreadsheetState(spreadsheet_id='{self.spreadsheet_id}')>"
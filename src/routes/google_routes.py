@@ -1,9 +1,9 @@
 from flask import Blueprint, current_app, Response
-from src.controllers.google_controller import GoogleController
+from src.routes.lazy import LazyController
 
 google_bp = Blueprint("google", __name__)
 
-google_controller = GoogleController()
+google_controller = LazyController("src.controllers.google_controller.GoogleController")
 
 
 @google_bp.route("/oauth2callback", methods=["GET"])
@@ -15,5 +15,5 @@ def oauth2callback():
         current_app.logger.info("Successfully processed Google OAuth2 callback")
         return response
     except (ValueError, KeyError) as e:
-        current_app.logger.error(f"Error processing Google OAuth2 callback: {str(e)}")
+        current_app.logger.error("Error processing Google OAuth2 callback: %s", e)
         return Response(status=500)
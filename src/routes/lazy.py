@@ -0,0 +1,29 @@
+import importlib
+import threading
+
+
+class LazyController:
+    """
+    Module-level controller that is only built on first use.
+
+    Controllers pull in the Google client libraries, SQLAlchemy sessions and
+    Twilio when instantiated; deferring that keeps app import (and therefore
+    cold start) cheap. Attribute access is forwarded to the real controller.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    module_name, class_name = self._path.rsplit(".", 1)
+                    controller_class = getattr(importlib.import_module(module_name), class_name)
+                    self._instance = controller_class()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -1,8 +1,8 @@
 from flask import Blueprint, request
-from src.controllers.user_controller import UserController
+from src.routes.lazy import LazyController
 
 user_bp = Blueprint("user", __name__)
-user_controller = UserController()
+user_controller = LazyController("src.controllers.user_controller.UserController")
 
 @user_bp.route("/signup", methods=["POST"])
 def signup():
@@ -1,9 +1,10 @@
-from flask import Blueprint, current_app
-from src.controllers.whatsapp_controller import WhatsAppController
+from flask import Blueprint, current_app, request
+from src.routes.lazy import LazyController
+from src.services.traffic_capture import traffic_capture
 
 whatsapp_bp = Blueprint("whatsapp", __name__)
 
-whatsapp_controller = WhatsAppController()
+whatsapp_controller = LazyController("src.controllers.whatsapp_controller.WhatsAppController")
 
 
 @whatsapp_bp.route("/whatsapp", methods=["POST"])
@@ -11,9 +12,10 @@ def whatsapp_webhook():
     """Handle WhatsApp webhook endpoint."""
     try:
         current_app.logger.info("Received WhatsApp webhook request")
+        traffic_capture.record(request.form)
         response = whatsapp_controller.handle_webhook()
         current_app.logger.info("Successfully processed WhatsApp webhook")
         return response
     except Exception as e:
-        current_app.logger.error(f"Error processing WhatsApp webhook: {str(e)}")
+        current_app.logger.error("Error processing WhatsApp webhook: %s", e)
         raise
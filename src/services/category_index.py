@@ -0,0 +1,349 @@
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from src.config.database import ReadSessionLocal
+from src.config.settings import Config
+from src.models.expense import ExpenseTotal
+
+logger = logging.getLogger(__name__)
+
+
+def fold_category(category: str) -> str:
+    """Case- and accent-insensitive form of a category (``Saúde`` -> ``saude``)."""
+    decomposed = unicodedata.normalize("NFKD", category.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def deletions(word: str, depth: int) -> Set[str]:
+    """Every string obtained by deleting up to ``depth`` characters from ``word``, itself included."""
+    results = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        results |= frontier
+    return results
+
+
+class CategoryIndex:
+    """
+    One user's categories, mapping every spelling to a canonical category.
+
+    Spellings that fold to the same text (``Lifestyle``, ``lifestyle``) are
+    matched with one dictionary lookup. Otherwise the closest canonical
+    category within ``max_distance`` edits is used (``lifestye`` ->
+    ``lifestyle``), ties going to the most used one. A category with no close
+    match becomes canonical as typed.
+
+    Fuzzy candidates come from a deletion-neighbourhood index: two strings
+    within ``k`` edits share a string reachable by at most ``k`` deletions
+    from each, so each canonical category is indexed under its deletions and
+    a query only looks up its own deletions, then verifies the few
+    candidates with the exact edit distance.
+    """
+
+    MAX_EDITS = 2
+    MAX_FUZZY_LENGTH = 30
+
+    def __init__(self):
+        self._canonical: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self._variants: Dict[str, Set[str]] = {}
+        self._neighbours: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    @classmethod
+    def max_distance(cls, folded: str) -> int:
+        """Edits tolerated against a canonical category; short words only match exactly."""
+        if len(folded) <= 4 or len(folded) > cls.MAX_FUZZY_LENGTH:
+            return 0
+        if len(folded) <= 8:
+            return 1
+        return cls.MAX_EDITS
+
+    def match(self, category: str) -> Optional[str]:
+        """
+        Return the canonical category for a spelling without registering it.
+
+        Args:
+            category: Category as typed by the user
+
+        Returns:
+            The canonical category, or None if nothing is close enough
+        """
+        folded = fold_category(category)
+        canonical = self._canonical.get(folded)
+        if canonical is not None:
+            return canonical
+        if len(folded) > self.MAX_FUZZY_LENGTH + self.MAX_EDITS:
+            return None
+
+        candidates: Set[str] = set()
+        for variant in deletions(folded, self.MAX_EDITS):
+            keys = self._neighbours.get(variant)
+            if keys:
+                candidates |= keys
+
+        best = None
+        for key in candidates:
+            limit = self.max_distance(key)
+            if abs(len(key) - len(folded)) > limit:
+                continue
+            distance = edit_distance(folded, key)
+            if distance <= limit:
+                name = self._canonical[key]
+                rank = (distance, -self._counts[name], name)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
+
+    def add(self, category: str, count: int = 1) -> str:
+        """
+        Register a spelling and return its canonical category.
+
+        Args:
+            category: Category as typed by the user
+            count: Number of expenses recorded with this spelling
+
+        Returns:
+            The canonical category the spelling was snapped to
+        """
+        folded = fold_category(category)
+        canonical = self.match(category)
+        if canonical is None:
+            canonical = category
+            self._counts[canonical] = 0
+            self._variants[canonical] = set()
+            for variant in deletions(folded, self.max_distance(folded)):
+                self._neighbours.setdefault(variant, set()).add(folded)
+        self._canonical.setdefault(folded, canonical)
+        self._counts[canonical] += count
+        self._variants[canonical].add(category)
+        return canonical
+
+    def variants(self, category: str) -> Set[str]:
+        """Every known spelling of the category's canonical form, including itself."""
+        canonical = self.match(category)
+        if canonical is None:
+            return {category}
+        return set(self._variants[canonical])
+
+
+class CategoryIndexRegistry:
+    """
+    Process-wide LRU of per-user category indexes.
+
+    An index is built from the user's past categories (the ``expense_totals``
+    table, one row per month and category) and kept in memory for
+    ``ttl_seconds``; snapping a category is then a few dictionary lookups
+    with no DB or Sheets call. The webhook path never waits for a load: a
+    missing or expired index is (re)loaded in the background while the
+    message uses the stale index, or the category as typed. A failed load is
+    not retried for ``RETRY_AFTER_FAILURE`` seconds.
+    Categories saved by this process are added to the cached index as they
+    are seen, so the TTL only bounds how long other workers' new categories
+    take to show up.
+    """
+
+    RETRY_AFTER_FAILURE = 30.0
+
+    def __init__(self, max_users: int, ttl_seconds: float):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._indexes: "OrderedDict[int, Tuple[CategoryIndex, float]]" = OrderedDict()
+        self._failed_at: Dict[int, float] = {}
+        self._loading: Set[int] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(user_id: int) -> CategoryIndex:
+        with ReadSessionLocal() as db:
+            rows = (
+                db.query(ExpenseTotal.category, func.sum(ExpenseTotal.expense_count))
+                .filter(ExpenseTotal.user_id == user_id)
+                .group_by(ExpenseTotal.category)
+                .all()
+            )
+
+        index = CategoryIndex()
+        # Most used spellings first, so they become the canonical forms
+        for category, count in sorted(rows, key=lambda row: (-int(row[1] or 0), row[0])):
+            index.add(category, int(count or 0))
+        return index
+
+    def _cached(self, user_id: int) -> Tuple[Optional[CategoryIndex], bool]:
+        """The cached index, possibly expired, and whether it is fresh. Call with the lock held."""
+        entry = self._indexes.get(user_id)
+        if entry is None:
+            return None, False
+        self._indexes.move_to_end(user_id)
+        return entry[0], time.monotonic() - entry[1] <= self.ttl_seconds
+
+    def _backing_off(self, user_id: int) -> bool:
+        failed_at = self._failed_at.get(user_id)
+        return failed_at is not None and time.monotonic() - failed_at < self.RETRY_AFTER_FAILURE
+
+    def _load_and_cache(self, user_id: int) -> CategoryIndex:
+        try:
+            index = self._load(user_id)
+        except Exception:
+            with self._lock:
+                self._failed_at[user_id] = time.monotonic()
+            raise
+
+        with self._lock:
+            self._failed_at.pop(user_id, None)
+            self._indexes[user_id] = (index, time.monotonic())
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _reload(self, user_id: int) -> None:
+        try:
+            self._load_and_cache(user_id)
+        except Exception as e:
+            logger.warning("Failed to load categories for user %s: %s", user_id, e)
+        finally:
+            with self._lock:
+                self._loading.discard(user_id)
+
+    def _schedule_reload(self, user_id: int) -> None:
+        """Load the user's index in the background, unless a load is already queued. Call with the lock held."""
+        if user_id in self._loading:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="category-index")
+        self._loading.add(user_id)
+        self._executor.submit(self._reload, user_id)
+
+    def _get_or_none(self, user_id: int, wait: bool) -> Optional[CategoryIndex]:
+        """
+        The user's index, or None if it is disabled or unavailable.
+
+        Args:
+            user_id: ID of the user
+            wait: Load a missing or expired index before returning; otherwise
+                it is reloaded in the background and the stale index (or None)
+                is returned right away
+        """
+        if self.max_users <= 0:
+            return None
+        with self._lock:
+            index, fresh = self._cached(user_id)
+            if fresh or self._backing_off(user_id):
+                return index
+            if not wait:
+                self._schedule_reload(user_id)
+                return index
+
+        try:
+            return self._load_and_cache(user_id)
+        except Exception as e:
+            logger.warning("Failed to load categories for user %s: %s", user_id, e)
+            return index
+
+    def resolve(self, user_id: int, category: str) -> str:
+        """
+        Snap a typed category to the user's canonical category, without waiting for the database.
+
+        A new category isn't registered here; call ``register`` once the
+        expense has been saved.
+
+        Args:
+            user_id: ID of the user who sent the expense
+            category: Category as typed
+
+        Returns:
+            The canonical category, or the category as typed if it is new or
+            the index is disabled or not loaded yet
+        """
+        index = self._get_or_none(user_id, wait=False)
+        if index is None:
+            return category
+        with self._lock:
+            return index.match(category) or category
+
+    def register(self, user_id: int, category: str) -> None:
+        """Add a saved expense's category to the user's cached index, if it is loaded."""
+        with self._lock:
+            index, _ = self._cached(user_id)
+            if index is not None:
+                index.add(category)
+
+    def canonical(self, user_id: int, category: str) -> str:
+        """Canonical form of a category, without registering it."""
+        index = self._get_or_none(user_id, wait=True)
+        if index is None:
+            return category
+        with self._lock:
+            return index.match(category) or category
+
+    def variants(self, user_id: int, category: str) -> Set[str]:
+        """
+        Every stored spelling of a category's canonical form, used to filter totals.
+
+        Args:
+            user_id: ID of the user
+            category: Category as typed
+
+        Returns:
+            Known spellings of the category; just the category itself if it
+            is unknown or the index is unavailable
+        """
+        index = self._get_or_none(user_id, wait=True)
+        if index is None:
+            return {category}
+        with self._lock:
+            return index.variants(category)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._indexes.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._failed_at.clear()
+
+    def reset_after_fork(self) -> None:
+        """Drop the parent's loader threads and locks; the cached indexes stay valid."""
+        self._lock = threading.Lock()
+        self._executor = None
+        self._loading = set()
+
+
+category_index = CategoryIndexRegistry(
+    max_users=Config.CATEGORY_INDEX_MAX_USERS,
+    ttl_seconds=Config.CATEGORY_INDEX_TTL,
+)
+
+# Executor threads and a lock held by one of them don't survive fork
+os.register_at_fork(after_in_child=category_index.reset_after_fork)
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Shared circuit breaker with a retry budget.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every call fails fast. Recovery is probed from a background thread every
+    ``probe_interval`` seconds rather than inside requests; the first
+    successful probe closes the circuit again.
+
+    Retries are paid from a budget that earns ``retry_ratio`` tokens per
+    successful call (capped at ``max_retry_tokens``), so retries can never
+    amplify load by more than that ratio while the dependency is struggling.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Any],
+        failure_threshold: int,
+        probe_interval: float,
+        retry_ratio: float,
+        max_retry_tokens: float = 10.0,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.retry_ratio = retry_ratio
+        self.max_retry_tokens = max_retry_tokens
+        self.logger = logging.getLogger(__name__)
+
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._retry_tokens = max_retry_tokens
+        self._opened_at: Optional[float] = None
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._retry_tokens = min(self.max_retry_tokens, self._retry_tokens + self.retry_ratio)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def try_acquire_retry(self) -> bool:
+        """Withdraw one retry from the budget; False when the budget is exhausted."""
+        with self._lock:
+            if self._state != self.CLOSED or self._retry_tokens < 1:
+                return False
+            self._retry_tokens -= 1
+            return True
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self.logger.error(
+            "Circuit '%s' opened after %s consecutive failures", self.name, self._consecutive_failures
+        )
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(
+                target=self._probe_until_recovered, name=f"{self.name}-breaker-probe", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_until_recovered(self) -> None:
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                self._state = self.HALF_OPEN
+            try:
+                self.probe()
+            except Exception as e:
+                self.logger.warning("Circuit '%s' recovery probe failed: %s", self.name, e)
+                with self._lock:
+                    self._state = self.OPEN
+                continue
+
+            with self._lock:
+                self._state = self.CLOSED
+                self._consecutive_failures = 0
+                self._retry_tokens = self.max_retry_tokens
+                self._opened_at = None
+            self.logger.info("Circuit '%s' closed after successful recovery probe", self.name)
+            return
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current breaker state for health checks and monitoring."""
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_tokens": round(self._retry_tokens, 2),
+                "open_for_seconds": (
+                    round(time.monotonic() - self._opened_at, 1) if self._opened_at else 0
+                ),
+                "rejected_calls": self._rejected,
+            }
@@ -0,0 +1,198 @@
+from datetime import date, datetime
+from typing import List, Optional
+import logging
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.config.database import ReadSessionLocal, SessionLocal
+from src.models.expense import Expense, ExpenseRecord, ExpenseTotal
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+class ExpenseLedgerService:
+    """Reads and writes the local expenses table, the system of record for expenses."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def record(self, user_id: int, expense: Expense) -> int:
+        """
+        Store an expense in the ledger.
+
+        The matching monthly category total is incremented in the same
+        transaction, so summaries never need to rescan the ledger.
+
+        Args:
+            user_id: ID of the user who sent the expense
+            expense: The parsed expense
+
+        Returns:
+            int: ID of the ledger row
+        """
+        with SessionLocal() as db:
+            record = ExpenseRecord(
+                user_id=user_id,
+                date=expense.date_value,
+                product=expense.product,
+                category=expense.category,
+                amount_cents=expense.amount_cents,
+                is_split=expense.is_split,
+            )
+            db.add(record)
+            self._increment_total(db, user_id, record.date, record.category, record.amount_cents)
+            db.commit()
+            return record.id
+
+    @staticmethod
+    def total_upsert_statement(dialect: str, user_id: int, day: date, category: str, amount_cents: int):
+        """
+        Single-statement upsert of a monthly category total, for dialects that support it.
+
+        Returns:
+            The INSERT ... ON CONFLICT statement, or None for other dialects
+        """
+        if dialect not in ("postgresql", "sqlite"):
+            return None
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(ExpenseTotal).values(
+            user_id=user_id,
+            month=month_start(day),
+            category=category,
+            total_cents=amount_cents,
+            expense_count=1,
+        )
+        return statement.on_conflict_do_update(
+            index_elements=["user_id", "month", "category"],
+            set_={
+                "total_cents": ExpenseTotal.total_cents + statement.excluded.total_cents,
+                "expense_count": ExpenseTotal.expense_count + 1,
+            },
+        )
+
+    @classmethod
+    def _increment_total(cls, db, user_id: int, day: date, category: str, amount_cents: int) -> None:
+        statement = cls.total_upsert_statement(
+            db.get_bind().dialect.name, user_id, day, category, amount_cents
+        )
+        if statement is not None:
+            db.execute(statement)
+            return
+
+        month = month_start(day)
+        total = (
+            db.query(ExpenseTotal)
+            .filter_by(user_id=user_id, month=month, category=category)
+            .with_for_update()
+            .first()
+        )
+        if total is None:
+            db.add(
+                ExpenseTotal(
+                    user_id=user_id,
+                    month=month,
+                    category=category,
+                    total_cents=amount_cents,
+                    expense_count=1,
+                )
+            )
+        else:
+            total.total_cents += amount_cents
+            total.expense_count += 1
+
+    @staticmethod
+    def total_decrement_statement(user_id: int, day: date, category: str, amount_cents: int):
+        """Take one expense back out of its monthly category total."""
+        return (
+            update(ExpenseTotal)
+            .where(
+                ExpenseTotal.user_id == user_id,
+                ExpenseTotal.month == month_start(day),
+                ExpenseTotal.category == category,
+            )
+            .values(
+                total_cents=ExpenseTotal.total_cents - amount_cents,
+                expense_count=ExpenseTotal.expense_count - 1,
+            )
+        )
+
+    @staticmethod
+    def empty_totals_statement(user_id: int):
+        """Delete a user's totals that no longer count any expense."""
+        return delete(ExpenseTotal).where(ExpenseTotal.user_id == user_id, ExpenseTotal.expense_count <= 0)
+
+    def discard(self, record_ids: List[int]) -> int:
+        """
+        Remove ledger rows whose write to Google Sheets was given up on.
+
+        The user is told to send those expenses again, so they are taken
+        out of the ledger and the monthly totals; otherwise the resent copy
+        would be counted twice. Rows already marked as synced are kept.
+
+        Args:
+            record_ids: IDs of the ledger rows
+
+        Returns:
+            int: Number of rows removed
+        """
+        if not record_ids:
+            return 0
+        with SessionLocal() as db:
+            records = (
+                db.query(ExpenseRecord)
+                .filter(ExpenseRecord.id.in_(record_ids), ExpenseRecord.synced_at.is_(None))
+                .with_for_update()
+                .all()
+            )
+            for record in records:
+                db.execute(
+                    self.total_decrement_statement(record.user_id, record.date, record.category, record.amount_cents)
+                )
+                db.delete(record)
+            for user_id in {record.user_id for record in records}:
+                db.execute(self.empty_totals_statement(user_id))
+            db.commit()
+            return len(records)
+
+    def mark_synced(self, record_ids: List[int]) -> None:
+        """Record that the given ledger rows were written to Google Sheets."""
+        if not record_ids:
+            return
+        with SessionLocal() as db:
+            db.query(ExpenseRecord).filter(ExpenseRecord.id.in_(record_ids)).update(
+                {ExpenseRecord.synced_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+
+    def list_expenses(
+        self,
+        user_id: int,
+        start: date,
+        end: date,
+        category: Optional[str] = None,
+    ) -> List[ExpenseRecord]:
+        """
+        List a user's expenses in a date range, served by the (user_id, date) index.
+
+        Args:
+            user_id: ID of the user
+            start: First day of the range, inclusive
+            end: Last day of the range, inclusive
+            category: Optional category filter
+
+        Returns:
+            List of ledger rows ordered by date
+        """
+        with ReadSessionLocal() as db:
+            query = db.query(ExpenseRecord).filter(
+                ExpenseRecord.user_id == user_id,
+                ExpenseRecord.date >= start,
+                ExpenseRecord.date <= end,
+            )
+            if category is not None:
+                query = query.filter(ExpenseRecord.category == category)
+            return query.order_by(ExpenseRecord.date, ExpenseRecord.id).all()
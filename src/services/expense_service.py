@@ -1,13 +1,21 @@
 from src.services.price_processor import PriceProcessorService
 from src.services.google_sheets.sheets_service import GoogleSheetsService
+from src.services.google_sheets.rate_limiter import SheetsRateLimited
+from src.services.expense_ledger_service import ExpenseLedgerService
+from src.services.category_index import category_index
+from src.services.metrics import time_stage
 from src.models.expense import Expense
 from src.models.user import User
 from src.views.whatsapp_view import WhatsAppView
-from typing import Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from flask import current_app
 
 
 class ExpenseService:
+    MAX_LINES_PER_MESSAGE = 50
+
+    def __init__(self):
+        self.ledger_service = ExpenseLedgerService()
 
     def process_expense(
         self, message: str, user: User
@@ -25,27 +33,252 @@ class ExpenseService:
             - str: Success/error message
             - Expense: The processed expense if successful, None otherwise
         """
-        current_app.logger.debug(f"Processing expense message: {message}")
-        is_valid, _, data = PriceProcessorService.process_message(message)
+        is_valid, error_message, data = self.parse_expense(message)
+        if not is_valid:
+            return False, error_message, None
+
+        data = self.record_expense(data, user)
+        result = self.save_expense(data, user)
+        if not result[0]:
+            # The user is asked to send it again
+            self.discard_expenses([data])
+        return result
+
+    def parse_expense(self, message: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """
+        Parse an expense message without saving it.
+
+        Args:
+            message: The expense message to process
+
+        Returns:
+            Tuple containing:
+            - bool: Whether the message is a valid expense
+            - str: Error message if invalid, empty string if valid
+            - dict: The processed data if valid, None otherwise
+        """
+        current_app.logger.debug("Processing expense message: %s", message)
+        with time_stage("parse"):
+            is_valid, _, data = PriceProcessorService.process_message(message)
 
         if not is_valid:
-            current_app.logger.warning(f"Invalid expense format received: {message}")
+            current_app.logger.warning("Invalid expense format received: %s", message)
             return False, WhatsAppView.format_invalid_format(), None
 
+        return True, "", data
+
+    @staticmethod
+    def split_lines(message: str) -> List[str]:
+        """Split a message into its non-empty lines."""
+        return [line.strip() for line in message.splitlines() if line.strip()]
+
+    def is_multi_expense(self, message: str) -> bool:
+        return len(self.split_lines(message)) > 1
+
+    def parse_expenses(self, message: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Parse a message with one expense per line.
+
+        Args:
+            message: The expense message to process
+
+        Returns:
+            Tuple containing:
+            - list: Processed data of every valid line, in message order
+            - list: Lines that could not be parsed, including lines beyond
+              MAX_LINES_PER_MESSAGE
+        """
+        with time_stage("parse"):
+            lines = self.split_lines(message)
+            items, failed_lines = [], lines[self.MAX_LINES_PER_MESSAGE:]
+            for line in lines[:self.MAX_LINES_PER_MESSAGE]:
+                is_valid, _, data = PriceProcessorService.process_message(line)
+                if is_valid:
+                    items.append(data)
+                else:
+                    failed_lines.append(line)
+        current_app.logger.debug("Parsed %s expenses, %s invalid lines", len(items), len(failed_lines))
+        return items, failed_lines
+
+    def process_expenses(
+        self, message: str, user: User
+    ) -> Tuple[bool, str, List[Expense]]:
+        """
+        Process a multi-line expense message and save every valid line in one Sheets call.
+
+        Args:
+            message: The expense message, one expense per line
+            user: The user who sent the message
+
+        Returns:
+            Tuple containing:
+            - bool: Whether at least one expense was saved
+            - str: Reply listing saved expenses and invalid lines, or an error
+            - list: The saved expenses
+        """
+        items, failed_lines = self.parse_expenses(message)
+        if not items:
+            current_app.logger.warning("No valid expense lines received: %s", message)
+            return False, WhatsAppView.format_invalid_format(), []
+
+        items = [self.record_expense(item, user) for item in items]
+        result = self.save_expenses(items, user, failed_lines)
+        if not result[0]:
+            self.discard_expenses(items)
+        return result
+
+    def save_expenses(
+        self,
+        items: List[Dict[str, Any]],
+        user: User,
+        failed_lines: Sequence[str] = (),
+        raise_rate_limited: bool = False,
+    ) -> Tuple[bool, str, List[Expense]]:
+        """
+        Save several parsed expenses to the ledger and to Google Sheets in a single append.
+
+        When the append fails the ledger rows are kept, so the write can be
+        retried; callers that give up call ``discard_expenses``.
+
+        Args:
+            items: Processed expense data from PriceProcessorService
+            user: The user who sent the message
+            failed_lines: Invalid input lines to report back to the user
+            raise_rate_limited: Raise SheetsRateLimited instead of replying
+                that Sheets is busy, so a queued write can wait for quota
+
+        Returns:
+            Tuple containing:
+            - bool: Whether the operation was successful
+            - str: Success/error message
+            - list: The saved expenses if successful, empty otherwise
+
+        Raises:
+            SheetsRateLimited: If raise_rate_limited is set and no quota is available
+        """
+        items = [item if "ledger_id" in item else self.record_expense(item, user) for item in items]
+        expenses = [Expense.from_processor_data(item) for item in items]
+
+        try:
+            with time_stage("credentials"):
+                sheets_service = GoogleSheetsService.for_user(user)
+            if sheets_service.append_expenses(items):
+                current_app.logger.info("Successfully saved %s expenses to Google Sheets for user %s", len(items), user)
+                self._mark_saved(items, user)
+                return True, WhatsAppView.format_multi_success(expenses, failed_lines), expenses
+            else:
+                current_app.logger.error("Failed to save %s expenses to Google Sheets for user %s", len(items), user)
+                return False, WhatsAppView.format_sheets_save_error(), []
+        except SheetsRateLimited as e:
+            if raise_rate_limited:
+                raise
+            current_app.logger.warning("Google Sheets quota exhausted for user %s: %s", user, e)
+            return False, WhatsAppView.format_sheets_busy_error(), []
+        except Exception as e:
+            current_app.logger.error("Error with Google Sheets service for user %s: %s", user, e)
+            return False, WhatsAppView.format_sheets_connection_error(), []
+
+    def save_expense(
+        self, data: Dict[str, Any], user: User, raise_rate_limited: bool = False
+    ) -> Tuple[bool, str, Expense | None]:
+        """
+        Save already parsed expense data to the ledger and the user's Google Sheet.
+
+        Data that already carries a ``ledger_id`` (see ``record_expense``) is
+        not recorded again, so retried writes don't duplicate ledger rows.
+        When the append fails the ledger row is kept, so the write can be
+        retried; callers that give up call ``discard_expenses``.
+
+        Args:
+            data: Processed expense data from PriceProcessorService
+            user: The user who sent the message
+            raise_rate_limited: Raise SheetsRateLimited instead of replying
+                that Sheets is busy, so a queued write can wait for quota
+
+        Returns:
+            Tuple containing:
+            - bool: Whether the operation was successful
+            - str: Success/error message
+            - Expense: The saved expense if successful, None otherwise
+
+        Raises:
+            SheetsRateLimited: If raise_rate_limited is set and no quota is available
+        """
+        if "ledger_id" not in data:
+            data = self.record_expense(data, user)
         expense = Expense.from_processor_data(data)
-        current_app.logger.debug(f"Expense processed: {expense}")
+        current_app.logger.debug("Expense processed: %s", expense)
 
         try:
-            sheets_service = GoogleSheetsService(
-                token=user.google_token, spreadsheet_id=user.google_sheets_id
-            )
-            current_app.logger.debug(f"Attempting to save expense to sheet: {user.google_sheets_id}")
+            with time_stage("credentials"):
+                sheets_service = GoogleSheetsService.for_user(user)
+            current_app.logger.debug("Attempting to save expense to sheet: %s", user.google_sheets_id)
             if sheets_service.append_expense(data):
-                current_app.logger.info(f"Successfully saved expense to Google Sheets for user {user}")
+                current_app.logger.info("Successfully saved expense to Google Sheets for user %s", user)
+                self._mark_saved([data], user)
                 return True, WhatsAppView.format_success(expense), expense
             else:
-                current_app.logger.error(f"Failed to save expense to Google Sheets for user {user}")
+                current_app.logger.error("Failed to save expense to Google Sheets for user %s", user)
                 return False, WhatsAppView.format_sheets_save_error(), None
+        except SheetsRateLimited as e:
+            if raise_rate_limited:
+                raise
+            current_app.logger.warning("Google Sheets quota exhausted for user %s: %s", user, e)
+            return False, WhatsAppView.format_sheets_busy_error(), None
         except Exception as e:
-            current_app.logger.error(f"Error with Google Sheets service for user {user}: {str(e)}")
+            current_app.logger.error("Error with Google Sheets service for user %s: %s", user, e)
             return False, WhatsAppView.format_sheets_connection_error(), None
+
+    def record_expense(self, data: Dict[str, Any], user: User) -> Dict[str, Any]:
+        """
+        Record parsed expense data in the local ledger.
+
+        The category is first snapped to the user's canonical spelling (see
+        ``CategoryIndex``), so the ledger, totals and sheet all get the same name.
+
+        Args:
+            data: Processed expense data from PriceProcessorService
+            user: The user who sent the message
+
+        Returns:
+            A copy of ``data`` with the canonical category and the ``ledger_id``
+            of the new row, which is None when the ledger could not be written
+        """
+        with time_stage("ledger"):
+            category = category_index.resolve(user.id, data["category"])
+            if category != data["category"]:
+                current_app.logger.debug("Category %r normalized to %r for user %s", data["category"], category, user)
+                data = {**data, "category": category}
+            try:
+                ledger_id = self.ledger_service.record(user.id, Expense.from_processor_data(data))
+            except Exception as e:
+                # The ledger must not block the write to Google Sheets
+                current_app.logger.error("Failed to record expense in ledger for user %s: %s", user, e)
+                ledger_id = None
+        return {**data, "ledger_id": ledger_id}
+
+    def _mark_saved(self, items: Sequence[Dict[str, Any]], user: User) -> None:
+        # New categories only become part of the user's index once an expense using them is saved
+        for item in items:
+            category_index.register(user.id, item["category"])
+        ledger_ids = [item.get("ledger_id") for item in items if item.get("ledger_id") is not None]
+        try:
+            self.ledger_service.mark_synced(ledger_ids)
+        except Exception as e:
+            current_app.logger.warning("Failed to mark ledger rows %s as synced: %s", ledger_ids, e)
+
+    def discard_expenses(self, items: Sequence[Dict[str, Any]]) -> None:
+        """
+        Take recorded expenses out of the ledger and totals after their Sheets write was given up on.
+
+        Args:
+            items: Expense data returned by ``record_expense``
+        """
+        ledger_ids = [item["ledger_id"] for item in items if item.get("ledger_id") is not None]
+        if not ledger_ids:
+            return
+        try:
+            removed = self.ledger_service.discard(ledger_ids)
+            current_app.logger.info("Discarded %s unsynced ledger rows", removed)
+        except Exception as e:
+            current_app.logger.error("Failed to discard ledger rows %s: %s", ledger_ids, e)
@@ -1,3 +1,11 @@
-from .sheets_service import GoogleSheetsService
-
 __all__ = ["GoogleSheetsService"]
+
+
+def __getattr__(name):
+    # Imported lazily so that light submodules (token broker, client cache) can
+    # be used at startup without pulling in googleapiclient.
+    if name == "GoogleSheetsService":
+        from .sheets_service import GoogleSheetsService
+
+        return GoogleSheetsService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,102 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import Config
+from src.services.google_sheets.rate_limiter import BACKGROUND, INTERACTIVE, sheets_priority, sheets_rate_limiter
+from src.services.metrics import SHEETS_APPEND_BATCH_SIZE, SHEETS_APPEND_FLUSH_SECONDS
+
+
+class _Batch:
+    def __init__(self, sheets_service):
+        self.sheets_service = sheets_service
+        self.rows: List[List[Any]] = []
+        self.futures: List[Future] = []
+        self.priority = BACKGROUND
+        self.started_at = time.monotonic()
+        self.full = threading.Event()
+
+
+class AppendBatcher:
+    """
+    Coalesces concurrent appends to the same spreadsheet into one Sheets call.
+
+    The first caller for a spreadsheet becomes the batch leader: it waits up to
+    ``window_seconds`` (or until ``max_rows`` rows are queued) and then flushes
+    every queued row in a single multi-row append from its own thread, so the
+    write runs inside that caller's app context. The append runs at the
+    highest rate-limit priority among the batch's callers, so a background
+    leader doesn't hold webhook rows to the background quota. Every caller
+    blocks until the batch holding its row has been written.
+    """
+
+    def __init__(self, window_seconds: float, max_rows: int):
+        self.window_seconds = window_seconds
+        self.max_rows = max_rows
+        self._batches: Dict[str, _Batch] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0 and self.max_rows > 1
+
+    def submit(self, sheets_service, row: List[Any], priority: Optional[str] = None) -> bool:
+        """
+        Queue a row for the service's spreadsheet and wait for it to be written.
+
+        Args:
+            sheets_service: GoogleSheetsService used if this call leads the batch
+            row: Row values in HEADER order
+            priority: Rate limiter priority of the caller; defaults to the
+                current context's
+
+        Returns:
+            bool: Result of the batched append
+        """
+        future: Future = Future()
+        spreadsheet_id = sheets_service.spreadsheet_id
+        priority = priority or sheets_rate_limiter.priority()
+
+        with self._lock:
+            batch = self._batches.get(spreadsheet_id)
+            is_leader = batch is None or len(batch.rows) >= self.max_rows
+            if is_leader:
+                batch = _Batch(sheets_service)
+                self._batches[spreadsheet_id] = batch
+            batch.rows.append(row)
+            batch.futures.append(future)
+            if priority == INTERACTIVE:
+                batch.priority = INTERACTIVE
+            if len(batch.rows) >= self.max_rows:
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(self.window_seconds)
+            with self._lock:
+                if self._batches.get(spreadsheet_id) is batch:
+                    del self._batches[spreadsheet_id]
+            self._flush(batch)
+
+        return future.result()
+
+    @staticmethod
+    def _flush(batch: _Batch) -> None:
+        try:
+            with sheets_priority(batch.priority):
+                result = batch.sheets_service.append_rows(batch.rows)
+        except Exception as e:
+            for future in batch.futures:
+                future.set_exception(e)
+        else:
+            for future in batch.futures:
+                future.set_result(result)
+        finally:
+            SHEETS_APPEND_BATCH_SIZE.observe(len(batch.rows))
+            SHEETS_APPEND_FLUSH_SECONDS.observe(time.monotonic() - batch.started_at)
+
+
+append_batcher = AppendBatcher(
+    window_seconds=Config.SHEETS_BATCH_WINDOW_MS / 1000,
+    max_rows=Config.SHEETS_BATCH_MAX_ROWS,
+)
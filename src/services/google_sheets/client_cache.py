@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from src.config.settings import Config
+
+
+class SheetsClientCache:
+    """
+    Process-wide LRU cache of authorized Google Sheets clients.
+
+    Entries are keyed by (user id, spreadsheet id, token hash), so a changed
+    token or spreadsheet never reuses a stale client. Entries idle for longer
+    than ``ttl_seconds`` are dropped on access, and the least recently used
+    entry is evicted once ``max_size`` is exceeded.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _token_hash(token: str) -> str:
+        return hashlib.sha256((token or "").encode("utf-8")).hexdigest()
+
+    def _key(self, user_id: int, spreadsheet_id: str, token: str) -> Tuple[Hashable, ...]:
+        return (user_id, spreadsheet_id, self._token_hash(token))
+
+    def get(
+        self,
+        user_id: int,
+        spreadsheet_id: str,
+        token: str,
+        factory: Callable[[], Any],
+    ) -> Any:
+        """
+        Return the cached client for a user, building it on a miss.
+
+        Args:
+            user_id: ID of the user owning the client
+            spreadsheet_id: ID of the spreadsheet the client writes to
+            token: Google refresh token the client was authorized with
+            factory: Callable building a new client on a cache miss
+
+        Returns:
+            The cached or freshly built client
+        """
+        if self.max_size <= 0:
+            return factory()
+
+        key = self._key(user_id, spreadsheet_id, token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                client, last_used = entry
+                if now - last_used <= self.ttl_seconds:
+                    self._entries[key] = (client, now)
+                    self._entries.move_to_end(key)
+                    return client
+                del self._entries[key]
+
+        # Build outside the lock so a slow build doesn't block other users.
+        client = factory()
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                client = existing[0]
+            self._entries[key] = (client, time.monotonic())
+            self._entries.move_to_end(key)
+            self._evict()
+        return client
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        expired = [
+            key for key, (_, last_used) in self._entries.items()
+            if now - last_used > self.ttl_seconds
+        ]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached client belonging to a user."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size}
+
+
+sheets_client_cache = SheetsClientCache(
+    max_size=Config.SHEETS_CLIENT_CACHE_SIZE,
+    ttl_seconds=Config.SHEETS_CLIENT_CACHE_TTL,
+)
@@ -0,0 +1,68 @@
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from src.config.settings import Config
+
+_document: Optional[Dict[str, Any]] = None
+_resources: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_sheets_discovery_document() -> Dict[str, Any]:
+    """
+    Return the parsed Sheets v4 discovery document, loading it once per process.
+
+    The document is read from GOOGLE_SHEETS_DISCOVERY_PATH when set, otherwise
+    from the static copy bundled with google-api-python-client. It is never
+    fetched over the network, and the JSON is parsed only once instead of on
+    every client build.
+    """
+    global _document
+    if _document is None:
+        with _lock:
+            if _document is None:
+                if Config.GOOGLE_SHEETS_DISCOVERY_PATH:
+                    with open(Config.GOOGLE_SHEETS_DISCOVERY_PATH, encoding="utf-8") as f:
+                        content = f.read()
+                else:
+                    from googleapiclient.discovery_cache import get_static_doc
+
+                    content = get_static_doc("sheets", "v4")
+                if not content:
+                    raise RuntimeError("Sheets v4 discovery document not found")
+                _document = json.loads(content)
+    return _document
+
+
+def get_sheets_resource(api_endpoint: str):
+    """
+    Return the ``spreadsheets()`` resource for an API endpoint, built once per process.
+
+    Building a client from the discovery document generates docstrings for
+    every method from the pretty-printed schemas, tens of megabytes per
+    build, so per-user clients share this resource instead of each building
+    their own. It carries no credentials: requests are executed with the
+    caller's authorized http (``request.execute(http=...)``); its own http
+    only adds the shared transport's pooling and timeouts.
+
+    Args:
+        api_endpoint: Base URL of the Sheets API, ending with a slash
+    """
+    resource = _resources.get(api_endpoint)
+    if resource is None:
+        from googleapiclient.discovery import build_from_document
+
+        from src.services.google_sheets.http_transport import google_transport
+
+        document = get_sheets_discovery_document()
+        with _lock:
+            resource = _resources.get(api_endpoint)
+            if resource is None:
+                service = build_from_document(
+                    document,
+                    http=google_transport.httplib2_adapter(),
+                    client_options={"api_endpoint": api_endpoint},
+                )
+                resource = _resources[api_endpoint] = service.spreadsheets()
+    return resource
@@ -0,0 +1,179 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from src.config.settings import Config
+
+if TYPE_CHECKING:
+    import httplib2
+    import requests
+    from google.auth.credentials import Credentials
+
+# Decoded by requests already; httplib2 drops it the same way after decompressing
+_HOP_HEADERS = frozenset({"content-encoding", "transfer-encoding", "connection", "keep-alive"})
+
+
+class GoogleHttpTransport:
+    """
+    One pooled HTTP session per process for every call to Google.
+
+    Sheets requests, token refreshes and the OAuth code exchange all go
+    through a single ``requests`` session whose ``HTTPAdapter`` keeps up to
+    ``pool_size`` keep-alive connections per host, so TLS handshakes with
+    googleapis.com are paid once per connection instead of once per client
+    or per call. Every request gets a (connect, read) timeout, so a hung
+    Google call fails instead of holding a worker until gunicorn kills it.
+
+    The session is shared by all threads (urllib3 pools and the cookie jar
+    are locked). It is built on first use and dropped in forked children,
+    which open their own connections.
+    """
+
+    def __init__(self, pool_size: int, connect_timeout: float, read_timeout: float):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size: Keep-alive connections kept per host
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for each chunk of the response
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self._session: Optional["requests.Session"] = None
+        self._auth_request = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> "requests.Session":
+        session = self._session
+        if session is None:
+            with self._lock:
+                session = self._session
+                if session is None:
+                    session = self._session = self._build_session()
+        return session
+
+    def _build_session(self) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        # Only failed connects are retried here: the request never reached
+        # Google, so even appends are safe. Everything else is left to callers.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.pool_size,
+            max_retries=Retry(total=2, connect=2, read=False, redirect=0, status=0, other=0),
+            pool_block=False,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        """Send a request on the shared session, with the default timeout unless one is given."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> "requests.Response":
+        return self.request("POST", url, **kwargs)
+
+    def auth_request(self):
+        """google-auth transport request for refreshing credentials over the shared session."""
+        auth_request = self._auth_request
+        if auth_request is None:
+            from google.auth.transport.requests import Request
+
+            timeout = self.timeout
+
+            class _Request(Request):
+                # google-auth waits up to 120 s by default
+                def __call__(self, url, method="GET", body=None, headers=None, timeout=timeout, **kwargs):
+                    return super().__call__(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+            auth_request = self._auth_request = _Request(session=self.session)
+        return auth_request
+
+    def httplib2_adapter(self, credentials: Optional["Credentials"] = None) -> "Httplib2Adapter":
+        """An ``http`` object for googleapiclient that sends its requests through this transport."""
+        return Httplib2Adapter(self, credentials)
+
+    def reset(self) -> None:
+        """Forget the session; the next call builds a new one with fresh connections."""
+        self._lock = threading.Lock()
+        self._session = None
+        self._auth_request = None
+
+
+class Httplib2Adapter:
+    """
+    Stands in for ``httplib2.Http`` (and ``google_auth_httplib2.AuthorizedHttp``) in googleapiclient.
+
+    googleapiclient only ever calls ``http.request(uri, method, body,
+    headers)`` and reads back an ``httplib2.Response`` and the body, so
+    that call is mapped onto the shared session. With credentials, the
+    Authorization header is added before each request and a 401 refreshes
+    the token once and retries, like ``AuthorizedHttp``. One adapter can be
+    used from several threads at once.
+    """
+
+    def __init__(self, transport: GoogleHttpTransport, credentials: Optional["Credentials"] = None):
+        self.transport = transport
+        self.credentials = credentials
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> Tuple["httplib2.Response", bytes]:
+        """
+        Send a request the way ``httplib2.Http.request`` would.
+
+        Raises:
+            TimeoutError: If Google doesn't answer within the transport's timeouts
+            ConnectionError: If no connection could be made
+        """
+        import requests
+
+        headers = dict(headers or {})
+        for attempt in range(2):
+            request_headers = dict(headers)
+            if self.credentials is not None:
+                self.credentials.before_request(self.transport.auth_request(), method, uri, request_headers)
+            try:
+                response = self.transport.request(method, uri, data=body, headers=request_headers, allow_redirects=False)
+            except requests.Timeout as e:
+                # googleapiclient retries and reports socket timeouts and
+                # connection errors, not requests' exceptions
+                raise TimeoutError(f"Google request timed out: {e}") from e
+            except requests.ConnectionError as e:
+                raise ConnectionError(f"Google request failed: {e}") from e
+            if response.status_code != 401 or self.credentials is None or attempt:
+                break
+            self.credentials.refresh(self.transport.auth_request())
+        return self._to_httplib2(response), response.content
+
+    @staticmethod
+    def _to_httplib2(response: "requests.Response") -> "httplib2.Response":
+        import httplib2
+
+        info = {key.lower(): value for key, value in response.headers.items() if key.lower() not in _HOP_HEADERS}
+        info["status"] = str(response.status_code)
+        result = httplib2.Response(info)
+        result.reason = response.reason
+        return result
+
+
+google_transport = GoogleHttpTransport(
+    pool_size=Config.GOOGLE_HTTP_POOL_SIZE,
+    connect_timeout=Config.GOOGLE_HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.GOOGLE_HTTP_TIMEOUT,
+)
+
+# Sockets inherited from the parent must not be shared with it
+os.register_at_fork(after_in_child=google_transport.reset)
@@ -0,0 +1,283 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.config.settings import Config
+from src.services.metrics import SHEETS_QUOTA_REJECTIONS, SHEETS_QUOTA_WAIT_SECONDS
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+READ = "read"
+WRITE = "write"
+
+_priority: ContextVar[str] = ContextVar("sheets_priority", default=INTERACTIVE)
+
+
+class SheetsRateLimited(Exception):
+    """Raised when a Sheets call would have to wait for quota longer than its priority allows."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Google Sheets quota exhausted, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+@contextmanager
+def sheets_priority(priority: str) -> Iterator[None]:
+    """Run the Sheets calls made inside the block at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def background_priority():
+    """Run the Sheets calls made inside the block as background work."""
+    return sheets_priority(BACKGROUND)
+
+
+def retry_after_seconds(headers, default: float) -> float:
+    """
+    Read a ``Retry-After`` header given in seconds or as an HTTP date.
+
+    Args:
+        headers: Response headers (httplib2 responses use lowercase keys)
+        default: Delay used when the header is missing or malformed
+    """
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class SheetsRateLimiter:
+    """
+    Token buckets for the Google Sheets API quotas, shared by all workers on the host.
+
+    Google meters read and write requests separately, per project and per
+    user, per minute. Every call takes a token from the project bucket and
+    from its user's bucket of the same kind. The buckets live in a small
+    JSON file updated under ``flock``, so every gunicorn worker draws from
+    one budget. With several hosts, divide the quotas between them.
+
+    An empty bucket doesn't fail the call: the next token is reserved and
+    the caller sleeps until it is due, which turns bursts into a steady
+    stream. Only a wait longer than the priority's budget is refused with
+    ``SheetsRateLimited``. Background work (outbox writes, sheet syncs)
+    can't take the last ``reserve_ratio`` of a bucket, which is kept for
+    interactive webhook writes. A 429 from Google empties the affected
+    bucket and pauses it for ``Retry-After`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        per_minute: Dict[Tuple[str, bool], int],
+        burst_seconds: float,
+        reserve_ratio: float,
+        max_wait: Dict[str, float],
+        max_retries: int,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            path: File holding the shared bucket state
+            per_minute: Requests per minute by (READ/WRITE, per user); 0 turns
+                that bucket off
+            burst_seconds: Bucket capacity, in seconds of refill
+            reserve_ratio: Share of each bucket background calls can't use
+            max_wait: Longest quota wait by priority, in seconds
+            max_retries: Retries of a call answered with 429
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.per_minute = per_minute
+        self.burst_seconds = burst_seconds
+        self.reserve_ratio = reserve_ratio
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        # flock is held per open file, not per thread
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return any(rate > 0 for rate in self.per_minute.values())
+
+    @staticmethod
+    def priority() -> str:
+        return _priority.get()
+
+    def _buckets(self, kind: str, user_id: Optional[int]) -> List[Tuple[str, float, float]]:
+        """(key, tokens per second, capacity) of every bucket a call draws from."""
+        buckets = []
+        for per_user in (False, True):
+            rate = self.per_minute.get((kind, per_user), 0) / 60
+            if rate <= 0 or (per_user and user_id is None):
+                continue
+            key = f"{kind}:{user_id}" if per_user else kind
+            buckets.append((key, rate, max(1.0, rate * self.burst_seconds)))
+        return buckets
+
+    def _open(self) -> int:
+        # Opened per process, so forked workers don't share a file offset
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    @contextmanager
+    def _state(self) -> Iterator[Dict[str, List[float]]]:
+        """Lock the shared state and yield it as {key: [tokens, updated_at, paused_until]}, saving it afterwards."""
+        with self._lock:
+            fd = self._open()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                raw = os.read(fd, 1 << 20)
+                try:
+                    state = json.loads(raw) if raw else {}
+                except ValueError:
+                    state = {}
+                yield state
+                data = json.dumps(state, separators=(",", ":")).encode("utf-8")
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, data)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _refill(state, key: str, rate: float, capacity: float, now: float) -> List[float]:
+        tokens, updated_at, paused_until = state.get(key, (capacity, now, 0.0))
+        tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+        return [tokens, now, paused_until]
+
+    def reserve(self, kind: str, user_id: Optional[int], priority: Optional[str] = None) -> float:
+        """
+        Take one token from every bucket the call draws from.
+
+        Args:
+            kind: READ or WRITE
+            user_id: Owner of the spreadsheet, for the per-user bucket
+            priority: INTERACTIVE or BACKGROUND; defaults to the current context's
+
+        Returns:
+            Seconds the caller must wait before making the call
+
+        Raises:
+            SheetsRateLimited: If the wait would exceed the priority's budget;
+                no token is taken then
+        """
+        priority = priority or self.priority()
+        buckets = self._buckets(kind, user_id)
+        if not buckets:
+            return 0.0
+
+        now = time.time()
+        try:
+            with self._state() as state:
+                wait, refilled = 0.0, []
+                for key, rate, capacity in buckets:
+                    bucket = self._refill(state, key, rate, capacity, now)
+                    floor = capacity * self.reserve_ratio if priority == BACKGROUND else 0.0
+                    # Time until the bucket holds a whole token above the floor
+                    wait = max(wait, bucket[2] - now, (floor + 1 - bucket[0]) / rate)
+                    refilled.append((key, bucket))
+
+                if wait > self.max_wait.get(priority, 0.0):
+                    SHEETS_QUOTA_REJECTIONS.labels(priority=priority).inc()
+                    raise SheetsRateLimited(wait)
+
+                for key, bucket in refilled:
+                    bucket[0] -= 1
+                    state[key] = bucket
+                self._prune(state, now)
+        except OSError as e:
+            # Without the shared state, calls go through unthrottled rather than fail
+            self.logger.warning("Sheets rate limiter unavailable: %s", e)
+            return 0.0
+        return wait
+
+    def acquire(self, kind: str, user_id: Optional[int], priority: Optional[str] = None) -> None:
+        """Reserve quota for one call and sleep until it is due (see ``reserve``)."""
+        priority = priority or self.priority()
+        wait = self.reserve(kind, user_id, priority)
+        SHEETS_QUOTA_WAIT_SECONDS.labels(priority=priority).observe(wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttled(self, kind: str, user_id: Optional[int], retry_after: float, per_user: bool) -> None:
+        """
+        Pause a bucket after Google answered 429.
+
+        Args:
+            kind: READ or WRITE
+            user_id: Owner of the spreadsheet
+            retry_after: Seconds to pause, from the response's Retry-After
+            per_user: Whether the exhausted quota is the per-user one
+        """
+        buckets = self._buckets(kind, user_id)
+        key_suffix = f":{user_id}" if per_user else ""
+        now = time.time()
+        try:
+            with self._state() as state:
+                for key, rate, capacity in buckets:
+                    if key != f"{kind}{key_suffix}":
+                        continue
+                    bucket = self._refill(state, key, rate, capacity, now)
+                    bucket[0] = min(bucket[0], 0.0)
+                    bucket[2] = max(bucket[2], now + retry_after)
+                    state[key] = bucket
+        except OSError as e:
+            self.logger.warning("Sheets rate limiter unavailable: %s", e)
+        self.logger.warning(
+            "Google Sheets %s quota exceeded%s, pausing for %.1fs",
+            kind,
+            f" for user_id {user_id}" if per_user else "",
+            retry_after,
+        )
+
+    def _prune(self, state, now: float) -> None:
+        # A bucket refilled to capacity and not paused is the same as no entry
+        for key in list(state):
+            tokens, updated_at, paused_until = state[key]
+            kind, _, user = key.partition(":")
+            rate = self.per_minute.get((kind, bool(user)), 0) / 60
+            if paused_until <= now and (rate <= 0 or tokens + (now - updated_at) * rate >= rate * self.burst_seconds):
+                del state[key]
+
+
+sheets_rate_limiter = SheetsRateLimiter(
+    path=Config.SHEETS_RATE_LIMIT_FILE,
+    per_minute={
+        (READ, False): Config.SHEETS_PROJECT_READS_PER_MINUTE,
+        (WRITE, False): Config.SHEETS_PROJECT_WRITES_PER_MINUTE,
+        (READ, True): Config.SHEETS_USER_READS_PER_MINUTE,
+        (WRITE, True): Config.SHEETS_USER_WRITES_PER_MINUTE,
+    },
+    burst_seconds=Config.SHEETS_RATE_LIMIT_BURST_SECONDS,
+    reserve_ratio=Config.SHEETS_RATE_LIMIT_RESERVE,
+    max_wait={
+        INTERACTIVE: Config.SHEETS_RATE_LIMIT_MAX_WAIT,
+        BACKGROUND: Config.SHEETS_RATE_LIMIT_BACKGROUND_MAX_WAIT,
+    },
+    max_retries=Config.SHEETS_RATE_LIMIT_MAX_RETRIES,
+)
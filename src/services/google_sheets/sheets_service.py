@@ -1,44 +1,94 @@
-from typing import List, Dict, Any, Optional
+import itertools
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from flask import current_app
 
+from src.services.google_sheets.append_batcher import append_batcher
+from src.services.google_sheets.client_cache import sheets_client_cache
+from src.services.google_sheets.discovery import get_sheets_resource
+from src.services.google_sheets.http_transport import google_transport
+from src.services.google_sheets.rate_limiter import BACKGROUND, READ, WRITE, retry_after_seconds, sheets_rate_limiter
+from src.services.google_sheets.token_broker import SCOPES, token_broker
+from src.services.metrics import time_stage, track_google_call
+from src.services.spreadsheet_state_service import spreadsheet_state_service
+
+
 class GoogleSheetsService:
     HEADER = [["Data", "Descrição", "Categoria", "Valor"]]
     RANGE = "A:E"
     HEADER_RANGE = "A1:E"
+    PAGE_SIZE = 500
 
-    def __init__(self, token: str, spreadsheet_id: str):
+    def __init__(self, token: str, spreadsheet_id: str, user_id: Optional[int] = None):
         """
         Initialize the Google Sheets service.
 
         Args:
             token: Token for authentication
             spreadsheet_id: ID of the Google Spreadsheet to use
+            user_id: ID of the token owner; when given, access tokens are
+                obtained through the shared token broker
         """
         self.spreadsheet_id = spreadsheet_id
+        self.user_id = user_id
+        self.initialized = False
 
         try:
-            credentials = Credentials.from_authorized_user_info(
-                info={
-                    "refresh_token": token,
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "client_id": current_app.config['GOOGLE_CLIENT_ID'],
-                    "client_secret": current_app.config['GOOGLE_CLIENT_SECRET']
-                },
-                scopes=["https://www.googleapis.com/auth/spreadsheets"],
-            )
-            self.service = build("sheets", "v4", credentials=credentials)
-            self.sheet = self.service.spreadsheets()
+            if user_id is not None:
+                credentials = token_broker.get_credentials(user_id, token)
+            else:
+                credentials = Credentials.from_authorized_user_info(
+                    info={
+                        "refresh_token": token,
+                        "token_uri": current_app.config["GOOGLE_TOKEN_URI"],
+                        "client_id": current_app.config['GOOGLE_CLIENT_ID'],
+                        "client_secret": current_app.config['GOOGLE_CLIENT_SECRET']
+                    },
+                    scopes=SCOPES,
+                )
+            self.credentials = credentials
+            # Cached clients are used by several request threads at once; the
+            # adapter is thread-safe and draws on the process-wide connection pool
+            self.http = google_transport.httplib2_adapter(credentials)
+            # Shared by all users; the credentials are applied per call through self.http
+            self.sheet = get_sheets_resource(current_app.config["GOOGLE_SHEETS_API_URL"].rstrip("/") + "/")
         except Exception as e:
-            current_app.logger.error(f"Failed to initialize Google Sheets service: {str(e)}")
+            current_app.logger.error("Failed to initialize Google Sheets service: %s", e)
             raise
 
+    @classmethod
+    def for_user(cls, user) -> "GoogleSheetsService":
+        """
+        Return the cached Google Sheets service for a user.
+
+        A client is only built when the user has no cached client for the
+        current spreadsheet and token, so hot users reuse one authorized
+        service object across messages.
+
+        Args:
+            user: The user whose spreadsheet and token should be used
+        """
+        service = sheets_client_cache.get(
+            user.id,
+            user.google_sheets_id,
+            user.google_token,
+            lambda: cls(
+                token=user.google_token,
+                spreadsheet_id=user.google_sheets_id,
+                user_id=user.id,
+            ),
+        )
+        token_broker.touch(user.id)
+        return service
+
     def append_expense(self, data: Dict[str, Any]) -> bool:
         """
         Append an expense to the spreadsheet.
 
+        When batching is enabled, concurrent expenses for the same spreadsheet
+        are coalesced into one multi-row append.
+
         Args:
             data: Dictionary containing expense data
                 {
@@ -52,104 +102,271 @@ class GoogleSheetsService:
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            if not self.header_exists():
-                self.write_header()
-                self.set_date_format()
+        row = self._expense_row(data)
+        if append_batcher.enabled:
+            return append_batcher.submit(self, row, sheets_rate_limiter.priority())
+        return self.append_rows([row])
+
+    def append_expenses(self, items: List[Dict[str, Any]]) -> bool:
+        """
+        Append several expenses to the spreadsheet in a single Sheets call.
+
+        Args:
+            items: Dictionaries containing expense data, as in append_expense
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.append_rows([self._expense_row(data) for data in items])
+
+    @staticmethod
+    def _expense_row(data: Dict[str, Any]) -> List[Any]:
+        return [data["date"], data["product"], data["category"], data["price"]]
+
+    def append_rows(self, rows: List[List[Any]]) -> bool:
+        """
+        Append several rows to the spreadsheet in a single Sheets call.
 
-            values = [[data["date"], data["product"], data["category"], data["price"]]]
+        Args:
+            rows: Row values in HEADER order
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            self.ensure_initialized()
 
-            body = {"values": values, "majorDimension": "ROWS"}
+            body = {"values": rows, "majorDimension": "ROWS"}
 
-            self.sheet.values().append(
-                spreadsheetId=self.spreadsheet_id,
-                range=self.RANGE,
-                valueInputOption="USER_ENTERED",
-                insertDataOption="INSERT_ROWS",
-                body=body,
-            ).execute()
+            with time_stage("append"):
+                self._execute(
+                    self.sheet.values().append(
+                        spreadsheetId=self.spreadsheet_id,
+                        range=self.RANGE,
+                        valueInputOption="USER_ENTERED",
+                        insertDataOption="INSERT_ROWS",
+                        body=body,
+                    ),
+                    "values.append",
+                )
 
-            current_app.logger.info(f"Successfully appended expense: {data}")
+            current_app.logger.info("Successfully appended %s rows to spreadsheet %s", len(rows), self.spreadsheet_id)
             return True
 
         except HttpError as error:
-            current_app.logger.error(f"Error appending expense: {error}")
+            current_app.logger.error("Error appending rows: %s", error)
             return False
 
+    def _execute(self, request, method: str, priority: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute a Sheets API request over the shared transport, recording its latency and result under ``method``.
+
+        The call first waits for quota from the shared rate limiter. A 429
+        pauses that quota for the response's Retry-After and the call is
+        retried, up to SHEETS_RATE_LIMIT_MAX_RETRIES times.
+
+        Raises:
+            SheetsRateLimited: If quota isn't available within the priority's wait budget
+        """
+        kind = READ if method == "values.get" else WRITE
+        for attempt in itertools.count():
+            sheets_rate_limiter.acquire(kind, self.user_id, priority)
+            try:
+                with track_google_call(method):
+                    return request.execute(http=self.http)
+            except HttpError as error:
+                if error.resp.status != 429 or attempt >= sheets_rate_limiter.max_retries:
+                    raise
+                sheets_rate_limiter.throttled(
+                    kind,
+                    self.user_id,
+                    retry_after_seconds(error.resp, default=2 ** attempt),
+                    per_user="per user" in str(error).lower(),
+                )
+
     def header_exists(self) -> bool:
-        existing_values = (
-            self.sheet.values()
-            .get(spreadsheetId=self.spreadsheet_id, range=self.HEADER_RANGE)
-            .execute()
-            .get("values", [])
-        )
+        with time_stage("header_exists"):
+            existing_values = self._execute(
+                self.sheet.values().get(spreadsheetId=self.spreadsheet_id, range=self.HEADER_RANGE),
+                "values.get",
+            ).get("values", [])
         return bool(existing_values)
 
-    def write_header(self) -> None:
-        self.sheet.values().append(
-            spreadsheetId=self.spreadsheet_id,
-            range=self.HEADER_RANGE,
-            valueInputOption="USER_ENTERED",
-            insertDataOption="INSERT_ROWS",
-            body={"values": self.HEADER},
-        ).execute()
+    def ensure_initialized(self) -> None:
+        """
+        Make sure the spreadsheet has its header and date format set up.
+
+        The result is remembered on this (cached) client and in the
+        ``spreadsheet_states`` table, so in steady state no Sheets call is made.
+        Spreadsheets set up before the state was tracked are detected through
+        ``header_exists`` once and then recorded.
+        """
+        if self.initialized:
+            return
+
+        try:
+            initialized = spreadsheet_state_service.is_initialized(self.spreadsheet_id)
+        except Exception as e:
+            current_app.logger.warning("Could not read spreadsheet state, checking header instead: %s", e)
+            initialized = False
+
+        if not initialized:
+            if not self.header_exists():
+                self.initialize()
+            spreadsheet_state_service.mark_initialized(self.spreadsheet_id)
+
+        self.initialized = True
+
+    def initialize(self) -> None:
+        """Write the header row and the date column format in a single batchUpdate."""
+        body = {"requests": [self._header_request(), self._date_format_request()]}
+        self._execute(self.sheet.batchUpdate(spreadsheetId=self.spreadsheet_id, body=body), "batchUpdate")
+        current_app.logger.info("Initialized spreadsheet %s", self.spreadsheet_id)
 
     def get_all_expenses(self) -> List[Dict[str, Any]]:
         """
         Get all expenses from the spreadsheet.
 
+        Prefer ``iter_expenses`` or ``iter_new_expenses`` for large sheets;
+        this materializes the whole sheet in memory.
+
         Returns:
             List of dictionaries containing expense data
         """
         try:
-            result = (
-                self.sheet.values()
-                .get(spreadsheetId=self.spreadsheet_id, range="A2:E")
-                .execute()
-            )
-
-            values = result.get("values", [])
-            expenses = []
-
-            for row in values:
-                if len(row) >= 5:
-                    expense = {
-                        "Date": row[0],
-                        "Product": row[2],
-                        "Category": row[3],
-                        "Price": float(row[1]),
-                    }
-                    expenses.append(expense)
-
-            return expenses
-
+            return [expense for _, expense in self.iter_expenses()]
         except HttpError as error:
-            current_app.logger.error(f"Error getting expenses: {error}")
+            current_app.logger.error("Error getting expenses: %s", error)
             return []
 
-    def set_date_format(self):
-        requests = [
-            {
-                "repeatCell": {
-                    "range": {
-                        "sheetId": 0,  # Change if not the first/default sheet
-                        "startColumnIndex": 0,
-                        "endColumnIndex": 1
-                    },
-                    "cell": {
-                        "userEnteredFormat": {
-                            "numberFormat": {
-                                "type": "DATE",
-                                "pattern": "yyyy-mm-dd"
-                            }
+    def iter_expenses(
+        self, start_row: int = 2, page_size: int = PAGE_SIZE, priority: Optional[str] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Stream expenses from the spreadsheet in fixed-size row windows.
+
+        Only one window of rows is held in memory at a time. Values are read
+        unformatted, so prices arrive as numbers whatever the sheet's locale;
+        dates keep their displayed text. Rows that don't have all HEADER
+        columns or whose price isn't a number are skipped.
+
+        Args:
+            start_row: First sheet row to read (1-based; row 1 is the header)
+            page_size: Number of rows fetched per Sheets call
+            priority: Rate limiter priority of the reads; defaults to the
+                current context's
+
+        Yields:
+            Tuples of (sheet row number, expense dictionary)
+        """
+        row_number = start_row
+        while True:
+            end_row = row_number + page_size - 1
+            values = self._execute(
+                self.sheet.values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"A{row_number}:D{end_row}",
+                    valueRenderOption="UNFORMATTED_VALUE",
+                    dateTimeRenderOption="FORMATTED_STRING",
+                ),
+                "values.get",
+                priority,
+            ).get("values", [])
+
+            for offset, row in enumerate(values):
+                expense = self._row_to_expense(row)
+                if expense is not None:
+                    yield row_number + offset, expense
+
+            # The API omits trailing empty rows, so a short page is the last one
+            if len(values) < page_size:
+                return
+            row_number = end_row + 1
+
+    def iter_new_expenses(self, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream only the expenses added since the previous sync of this spreadsheet.
+
+        Progress is persisted in ``spreadsheet_states.last_synced_row`` after
+        every page and when the consumer stops iterating, so later syncs only
+        fetch rows that were not yielded before. Reads run at background
+        priority, so syncs never starve webhook writes of quota.
+
+        Args:
+            page_size: Number of rows fetched per Sheets call
+
+        Yields:
+            Expense dictionaries in sheet order
+        """
+        last_synced_row = spreadsheet_state_service.get_last_synced_row(self.spreadsheet_id)
+        saved_row = last_synced_row
+        try:
+            for row_number, expense in self.iter_expenses(last_synced_row + 1, page_size, BACKGROUND):
+                # Counted as soon as it is handed out, so a consumer that stops
+                # after this expense doesn't get it again on the next sync
+                last_synced_row = row_number
+                yield expense
+                if last_synced_row - saved_row >= page_size:
+                    spreadsheet_state_service.set_last_synced_row(self.spreadsheet_id, last_synced_row)
+                    saved_row = last_synced_row
+        finally:
+            if last_synced_row != saved_row:
+                spreadsheet_state_service.set_last_synced_row(self.spreadsheet_id, last_synced_row)
+
+    @staticmethod
+    def _row_to_expense(row: List[Any]) -> Optional[Dict[str, Any]]:
+        """Map a sheet row in HEADER order (Data, Descrição, Categoria, Valor) to an expense."""
+        if len(row) < len(GoogleSheetsService.HEADER[0]):
+            return None
+        price = row[3]
+        # Checkbox cells come back as booleans
+        if isinstance(price, bool):
+            return None
+        try:
+            price_value = float(price)
+        except (TypeError, ValueError):
+            return None
+        return {
+            "Date": row[0],
+            "Product": row[1],
+            "Category": row[2],
+            "Price": price_value,
+        }
+
+    @classmethod
+    def _header_request(cls) -> Dict[str, Any]:
+        return {
+            "updateCells": {
+                "start": {"sheetId": 0, "rowIndex": 0, "columnIndex": 0},
+                "rows": [
+                    {
+                        "values": [
+                            {"userEnteredValue": {"stringValue": title}}
+                            for title in cls.HEADER[0]
+                        ]
+                    }
+                ],
+                "fields": "userEnteredValue",
+            }
+        }
+
+    @staticmethod
+    def _date_format_request() -> Dict[str, Any]:
+        return {
+            "repeatCell": {
+                "range": {
+                    "sheetId": 0,  # Change if not the first/default sheet
+                    "startColumnIndex": 0,
+                    "endColumnIndex": 1
+                },
+                "cell": {
+                    "userEnteredFormat": {
+                        "numberFormat": {
+                            "type": "DATE",
+                            "pattern": "yyyy-mm-dd"
                         }
-                    },
-                    "fields": "userEnteredFormat.numberFormat"
-                }
+                    }
+                },
+                "fields": "userEnteredFormat.numberFormat"
             }
-        ]
-        body = {"requests": requests}
-        self.service.spreadsheets().batchUpdate(
-            spreadsheetId=self.spreadsheet_id,
-            body=body
-        ).execute()
+        }
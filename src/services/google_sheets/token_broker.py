@@ -0,0 +1,354 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.config.database import SessionLocal
+from src.config.settings import Config
+from src.models.access_token import GoogleAccessToken
+from src.models.user import User
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# google.auth._helpers.REFRESH_THRESHOLD, copied so google-auth stays out of
+# startup: Credentials treat a token this close to expiry as already expired
+GOOGLE_AUTH_REFRESH_THRESHOLD = timedelta(minutes=3, seconds=45)
+
+
+class TokenBroker:
+    """
+    Shares short-lived Google access tokens across requests and workers.
+
+    Access tokens are kept in memory and in the ``google_access_tokens`` table,
+    so a token obtained by one gunicorn worker is reused by the others. A
+    background thread refreshes tokens that are about to expire, keeping the
+    token endpoint off the webhook critical path. Only tokens used within
+    ``refresh_idle`` are refreshed ahead of time; idle users get a new token
+    on their next message.
+    """
+
+    # How often a process records that a user's token is still in use
+    TOUCH_INTERVAL = timedelta(minutes=5)
+
+    def __init__(self, refresh_margin: int, refresh_interval: int, refresh_idle: int):
+        self.logger = logging.getLogger(__name__)
+        # A smaller margin would hand out tokens that Credentials.refresh rejects
+        self.refresh_margin = max(timedelta(seconds=refresh_margin), GOOGLE_AUTH_REFRESH_THRESHOLD)
+        self.refresh_interval = refresh_interval
+        self.refresh_idle = timedelta(seconds=refresh_idle)
+        self._tokens: Dict[int, Tuple[str, datetime, str]] = {}
+        self._touched: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _hash(refresh_token: str) -> str:
+        return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+    def _is_fresh(self, expires_at: datetime) -> bool:
+        return expires_at - self.refresh_margin > datetime.utcnow()
+
+    def get_credentials(self, user_id: int, refresh_token: str) -> "Credentials":
+        """
+        Build credentials whose access token is handed out by the broker.
+
+        The credentials carry no refresh token, so whenever google-auth needs
+        a new access token it asks the broker instead of calling the token
+        endpoint itself.
+
+        Args:
+            user_id: ID of the user owning the refresh token
+            refresh_token: The user's Google refresh token
+
+        Returns:
+            Credentials primed with a still-valid access token
+        """
+        from google.oauth2.credentials import Credentials
+
+        token, expires_at = self.get_access_token(user_id, refresh_token)
+        credentials = None
+
+        def _refresh_handler(request, scopes=None):
+            # google-auth only refreshes when the current token expired or got
+            # a 401, so that token must not be handed out again even if the
+            # cache still considers it fresh
+            return self.get_access_token(user_id, refresh_token, request=request, stale_token=credentials.token)
+
+        credentials = Credentials(
+            token=token,
+            expiry=expires_at,
+            token_uri=Config.GOOGLE_TOKEN_URI,
+            client_id=Config.GOOGLE_CLIENT_ID,
+            client_secret=Config.GOOGLE_CLIENT_SECRET,
+            scopes=SCOPES,
+            refresh_handler=_refresh_handler,
+        )
+        return credentials
+
+    def get_access_token(
+        self, user_id: int, refresh_token: str, request=None, stale_token: Optional[str] = None
+    ) -> Tuple[str, datetime]:
+        """
+        Return a still-valid access token for a user.
+
+        Looks in memory first, then in the shared table, and only exchanges
+        the refresh token when neither holds a token outside the refresh margin.
+
+        Args:
+            user_id: ID of the user owning the refresh token
+            refresh_token: The user's Google refresh token
+            request: Optional google-auth transport request used for refreshing
+            stale_token: Access token known to be unusable (e.g. rejected
+                with a 401); it is never returned, even if it looks fresh
+
+        Returns:
+            Tuple of (access token, expiry as naive UTC datetime)
+        """
+        token_hash = self._hash(refresh_token)
+
+        with self._lock:
+            cached = self._tokens.get(user_id)
+        if cached and cached[2] == token_hash and cached[0] != stale_token and self._is_fresh(cached[1]):
+            return cached[0], cached[1]
+
+        stored = self._load(user_id, token_hash)
+        if stored and stored[0] != stale_token and self._is_fresh(stored[1]):
+            with self._lock:
+                self._tokens[user_id] = (stored[0], stored[1], token_hash)
+            return stored
+
+        return self.refresh(user_id, refresh_token, request=request, used=True)
+
+    def refresh(self, user_id: int, refresh_token: str, request=None, used: bool = False) -> Tuple[str, datetime]:
+        """
+        Exchange the refresh token for a new access token and store it.
+
+        Args:
+            user_id: ID of the user owning the refresh token
+            refresh_token: The user's Google refresh token
+            request: Optional google-auth transport request used for refreshing
+            used: Whether the token is being refreshed for a request, rather
+                than ahead of time, which also counts as a use
+
+        Returns:
+            Tuple of (access token, expiry as naive UTC datetime)
+        """
+        from google.oauth2.credentials import Credentials
+
+        from src.services.metrics import track_google_call
+
+        if request is None:
+            from src.services.google_sheets.http_transport import google_transport
+
+            request = google_transport.auth_request()
+
+        credentials = Credentials(
+            token=None,
+            refresh_token=refresh_token,
+            token_uri=Config.GOOGLE_TOKEN_URI,
+            client_id=Config.GOOGLE_CLIENT_ID,
+            client_secret=Config.GOOGLE_CLIENT_SECRET,
+            scopes=SCOPES,
+        )
+        with track_google_call("oauth.token"):
+            credentials.refresh(request)
+        self.logger.debug("Refreshed Google access token for user_id: %s", user_id)
+
+        token_hash = self._hash(refresh_token)
+        self._store(user_id, credentials.token, credentials.expiry, token_hash, used)
+        with self._lock:
+            self._tokens[user_id] = (credentials.token, credentials.expiry, token_hash)
+        return credentials.token, credentials.expiry
+
+    def touch(self, user_id: int) -> None:
+        """
+        Record that a user's token is in use, so the background refresher keeps it fresh.
+
+        The table is written at most once per TOUCH_INTERVAL per user and process.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            touched_at = self._touched.get(user_id)
+            if touched_at is not None and now - touched_at < self.TOUCH_INTERVAL:
+                return
+            self._touched[user_id] = now
+        try:
+            with SessionLocal() as db:
+                db.query(GoogleAccessToken).filter(GoogleAccessToken.user_id == user_id).update(
+                    {GoogleAccessToken.last_used_at: now}, synchronize_session=False
+                )
+                db.commit()
+        except Exception as e:
+            self.logger.warning("Failed to record access token use for user_id %s: %s", user_id, e)
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget the access token of a user, e.g. after their refresh token changed."""
+        with self._lock:
+            self._tokens.pop(user_id, None)
+        try:
+            with SessionLocal() as db:
+                db.query(GoogleAccessToken).filter(GoogleAccessToken.user_id == user_id).delete()
+                db.commit()
+        except Exception as e:
+            self.logger.warning("Failed to delete stored access token for user_id %s: %s", user_id, e)
+
+    def _load(self, user_id: int, token_hash: str) -> Optional[Tuple[str, datetime]]:
+        try:
+            with SessionLocal() as db:
+                row = db.get(GoogleAccessToken, user_id)
+                if row and row.refresh_token_hash == token_hash:
+                    return row.access_token, row.expires_at
+        except Exception as e:
+            self.logger.warning("Failed to load stored access token for user_id %s: %s", user_id, e)
+        return None
+
+    @staticmethod
+    def store_values(access_token: str, expires_at: datetime, token_hash: str, used: bool) -> Dict[str, Any]:
+        """Columns written when a token is stored; ``last_used_at`` is left alone unless ``used``."""
+        now = datetime.utcnow()
+        values = {
+            "access_token": access_token,
+            "refresh_token_hash": token_hash,
+            "expires_at": expires_at,
+            "updated_at": now,
+        }
+        if used:
+            values["last_used_at"] = now
+        return values
+
+    @staticmethod
+    def upsert_statement(dialect: str, user_id: int, values: Dict[str, Any]):
+        """
+        Single-statement insert-or-update of a stored token, for dialects that support it.
+
+        Workers refreshing the same user's token at once then both write it
+        instead of one failing on the primary key.
+
+        Returns:
+            The INSERT ... ON CONFLICT statement, or None for other dialects
+        """
+        if dialect not in ("postgresql", "sqlite"):
+            return None
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(GoogleAccessToken).values(user_id=user_id, **values)
+        return statement.on_conflict_do_update(index_elements=["user_id"], set_=values)
+
+    def _store(self, user_id: int, access_token: str, expires_at: datetime, token_hash: str, used: bool) -> None:
+        values = self.store_values(access_token, expires_at, token_hash, used)
+        try:
+            with SessionLocal() as db:
+                statement = self.upsert_statement(db.get_bind().dialect.name, user_id, values)
+                if statement is not None:
+                    db.execute(statement)
+                else:
+                    db.merge(GoogleAccessToken(user_id=user_id, **values))
+                db.commit()
+        except Exception as e:
+            # The token is still usable from memory; other workers will refresh on their own.
+            self.logger.warning("Failed to store access token for user_id %s: %s", user_id, e)
+
+    def refresh_expiring(self) -> int:
+        """
+        Refresh the stored tokens that expire within the refresh margin and were used recently.
+
+        Every worker runs this; each token is claimed with a conditional
+        update of ``updated_at`` first, so only one of them calls the token
+        endpoint for it. A claim holds for one refresh interval, which also
+        spaces out retries after a failed refresh.
+        A token whose refresh token was revoked (``invalid_grant``) is
+        dropped and no longer refreshed.
+
+        Returns:
+            int: Number of tokens refreshed
+        """
+        now = datetime.utcnow()
+        interval = timedelta(seconds=self.refresh_interval)
+        deadline = now + self.refresh_margin + interval
+        with SessionLocal() as db:
+            rows = (
+                db.query(GoogleAccessToken.user_id, GoogleAccessToken.updated_at, User.google_token)
+                .join(User, User.id == GoogleAccessToken.user_id)
+                .filter(GoogleAccessToken.expires_at <= deadline)
+                .filter(GoogleAccessToken.updated_at <= now - interval)
+                .filter(GoogleAccessToken.last_used_at >= now - self.refresh_idle)
+                .filter(User.is_active.is_(True))
+                .filter(User.google_token.isnot(None))
+                .all()
+            )
+
+        refreshed = 0
+        for user_id, updated_at, refresh_token in rows:
+            try:
+                if not self._claim(user_id, updated_at, now):
+                    continue
+                self.refresh(user_id, refresh_token)
+                refreshed += 1
+            except Exception as e:
+                if self._is_invalid_grant(e):
+                    self.logger.warning("Refresh token of user_id %s was revoked, no longer refreshing it: %s", user_id, e)
+                    self.invalidate(user_id)
+                else:
+                    self.logger.warning("Background token refresh failed for user_id %s: %s", user_id, e)
+        return refreshed
+
+    @staticmethod
+    def _claim(user_id: int, updated_at: datetime, now: datetime) -> bool:
+        """Take a stored token for refreshing; False if another worker already took it."""
+        with SessionLocal() as db:
+            taken = (
+                db.query(GoogleAccessToken)
+                .filter(GoogleAccessToken.user_id == user_id, GoogleAccessToken.updated_at == updated_at)
+                .update({GoogleAccessToken.updated_at: now}, synchronize_session=False)
+            )
+            db.commit()
+            return taken == 1
+
+    @staticmethod
+    def _is_invalid_grant(error: Exception) -> bool:
+        from google.auth.exceptions import RefreshError
+
+        return isinstance(error, RefreshError) and "invalid_grant" in str(error)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                refreshed = self.refresh_expiring()
+                if refreshed:
+                    self.logger.info("Refreshed %s Google access tokens ahead of expiry", refreshed)
+            except Exception as e:
+                self.logger.error("Error in background token refresh: %s", e)
+
+    def start(self) -> None:
+        """Start the background refresher thread if it is not already running."""
+        if self.refresh_interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="token-broker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background refresher thread.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit; None waits until
+                it does (e.g. before forking, so it can't hold a lock)
+        """
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+token_broker = TokenBroker(
+    refresh_margin=Config.GOOGLE_TOKEN_REFRESH_MARGIN,
+    refresh_interval=Config.GOOGLE_TOKEN_REFRESH_INTERVAL,
+    refresh_idle=Config.GOOGLE_TOKEN_REFRESH_IDLE,
+)
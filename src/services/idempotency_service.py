@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from src.config.database import SessionLocal
+from src.config.settings import Config
+from src.models.processed_message import ProcessedMessage
+
+_MISSING = object()
+
+
+class IdempotencyService:
+    """
+    Deduplicates Twilio webhook deliveries by ``MessageSid``.
+
+    The first delivery of a message claims it (a ``processing`` row valid for
+    ``lease_seconds``); when it finishes, the TwiML reply is stored for
+    ``ttl_seconds`` so a retry gets the original reply without the expense
+    being parsed or written again. A retry arriving while the first delivery
+    is still running gets an empty reply. A claim whose worker died is taken
+    over once its lease expires.
+
+    Finished replies are also kept in a bounded in-process LRU, so most
+    retries are answered without a database query. If the database is
+    unavailable the service fails open and only the LRU deduplicates.
+    """
+
+    PURGE_INTERVAL = 300
+
+    def __init__(self, max_size: int, ttl_seconds: float, lease_seconds: float):
+        self.max_size = max_size
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.logger = logging.getLogger(__name__)
+        self._recent: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl.total_seconds() > 0
+
+    def _remember(self, message_sid: str, response: Optional[str], expires_in: timedelta) -> None:
+        with self._lock:
+            self._recent[message_sid] = (response, time.monotonic() + expires_in.total_seconds())
+            self._recent.move_to_end(message_sid)
+            while len(self._recent) > self.max_size:
+                self._recent.popitem(last=False)
+
+    def _recall(self, message_sid: str):
+        """Cached reply for a delivery (None while in progress), or _MISSING."""
+        with self._lock:
+            entry = self._recent.get(message_sid)
+            if entry is None:
+                return _MISSING
+            if entry[1] <= time.monotonic():
+                del self._recent[message_sid]
+                return _MISSING
+            self._recent.move_to_end(message_sid)
+            return entry[0]
+
+    def claim(self, message_sid: str) -> Tuple[bool, Optional[str]]:
+        """
+        Claim a webhook delivery for processing.
+
+        Args:
+            message_sid: Twilio MessageSid of the delivery
+
+        Returns:
+            Tuple containing:
+            - bool: True if the caller should process the message
+            - str: The stored TwiML reply for a finished duplicate, None if
+              the message is new or still being processed elsewhere
+        """
+        recalled = self._recall(message_sid)
+        if recalled is not _MISSING:
+            return False, recalled
+
+        try:
+            is_new, response = self._claim_row(message_sid)
+        except Exception as e:
+            self.logger.error("Failed to check MessageSid %s, processing without deduplication: %s", message_sid, e)
+            is_new, response = True, None
+
+        if is_new:
+            self._remember(message_sid, None, self.lease)
+        elif response is not None:
+            self._remember(message_sid, response, self.ttl)
+        return is_new, response
+
+    def _claim_row(self, message_sid: str) -> Tuple[bool, Optional[str]]:
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            row = db.get(ProcessedMessage, message_sid)
+            if row is None:
+                db.add(
+                    ProcessedMessage(
+                        message_sid=message_sid,
+                        status=ProcessedMessage.STATUS_PROCESSING,
+                        expires_at=now + self.lease,
+                    )
+                )
+                try:
+                    db.commit()
+                    return True, None
+                except IntegrityError:
+                    # Another worker claimed it between our read and insert
+                    db.rollback()
+                    row = db.get(ProcessedMessage, message_sid)
+                    if row is None:
+                        return False, None
+
+            if row.expires_at <= now:
+                # Expired reply or abandoned claim: take it over unless someone else just did
+                taken = (
+                    db.query(ProcessedMessage)
+                    .filter(
+                        ProcessedMessage.message_sid == message_sid,
+                        ProcessedMessage.expires_at == row.expires_at,
+                    )
+                    .update(
+                        {
+                            ProcessedMessage.status: ProcessedMessage.STATUS_PROCESSING,
+                            ProcessedMessage.response: None,
+                            ProcessedMessage.expires_at: now + self.lease,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                return taken == 1, None
+
+            if row.status == ProcessedMessage.STATUS_DONE:
+                return False, row.response
+            return False, None
+
+    def complete(self, message_sid: str, response: str) -> None:
+        """
+        Store the TwiML reply of a processed delivery.
+
+        Args:
+            message_sid: Twilio MessageSid of the delivery
+            response: TwiML body returned to Twilio
+        """
+        self._remember(message_sid, response, self.ttl)
+        try:
+            with SessionLocal() as db:
+                db.query(ProcessedMessage).filter(ProcessedMessage.message_sid == message_sid).update(
+                    {
+                        ProcessedMessage.status: ProcessedMessage.STATUS_DONE,
+                        ProcessedMessage.response: response,
+                        ProcessedMessage.expires_at: datetime.utcnow() + self.ttl,
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+            self._purge_expired()
+        except Exception as e:
+            self.logger.error("Failed to store reply for MessageSid %s: %s", message_sid, e)
+
+    def release(self, message_sid: str) -> None:
+        """Drop the claim of a delivery that failed, so a retry can process it."""
+        with self._lock:
+            self._recent.pop(message_sid, None)
+        try:
+            with SessionLocal() as db:
+                db.query(ProcessedMessage).filter(
+                    ProcessedMessage.message_sid == message_sid,
+                    ProcessedMessage.status == ProcessedMessage.STATUS_PROCESSING,
+                ).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            self.logger.error("Failed to release MessageSid %s: %s", message_sid, e)
+
+    def _purge_expired(self) -> None:
+        """Delete expired rows, at most once every PURGE_INTERVAL seconds per process."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.PURGE_INTERVAL
+        with SessionLocal() as db:
+            deleted = (
+                db.query(ProcessedMessage)
+                .filter(ProcessedMessage.expires_at < datetime.utcnow())
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        if deleted:
+            self.logger.debug("Purged %s expired processed messages", deleted)
+
+
+idempotency_service = IdempotencyService(
+    max_size=Config.IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=Config.IDEMPOTENCY_TTL,
+    lease_seconds=Config.IDEMPOTENCY_LEASE,
+)
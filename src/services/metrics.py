@@ -0,0 +1,130 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+
+SHEETS_APPEND_BATCH_SIZE = Histogram(
+    "sheets_append_batch_size",
+    "Number of rows written by a single coalesced Sheets append",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+SHEETS_APPEND_FLUSH_SECONDS = Histogram(
+    "sheets_append_flush_seconds",
+    "Time from the first queued row to the end of its batched Sheets append",
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+# Stages of a webhook request, in pipeline order
+WEBHOOK_STAGES = (
+    "user_lookup",
+    "parse",
+    "ledger",
+    "credentials",
+    "header_exists",
+    "append",
+    "summary",
+    "twiml",
+)
+WEBHOOK_STAGE_SECONDS = Histogram(
+    "whatsapp_webhook_stage_seconds",
+    "Time spent in each stage of the WhatsApp webhook pipeline",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+WEBHOOK_REQUEST_SECONDS = Histogram(
+    "whatsapp_webhook_request_seconds",
+    "End-to-end time of a WhatsApp webhook request",
+    buckets=LATENCY_BUCKETS,
+)
+GOOGLE_API_REQUESTS = Counter(
+    "google_api_requests_total",
+    "Calls to the Google Sheets and OAuth APIs by method and result (ok, HTTP status or error)",
+    ["method", "status"],
+)
+GOOGLE_API_REQUEST_SECONDS = Histogram(
+    "google_api_request_seconds",
+    "Latency of calls to the Google Sheets and OAuth APIs",
+    ["method"],
+    buckets=LATENCY_BUCKETS,
+)
+SHEETS_QUOTA_WAIT_SECONDS = Histogram(
+    "sheets_quota_wait_seconds",
+    "Time Sheets calls waited for quota from the shared rate limiter, by priority",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+SHEETS_QUOTA_REJECTIONS = Counter(
+    "sheets_quota_rejections_total",
+    "Sheets calls refused because the quota wait would exceed their priority's budget",
+    ["priority"],
+)
+DB_RETRIES = Counter(
+    "db_retries_total",
+    "Database operations retried by UserService, by operation and reason",
+    ["operation", "reason"],
+)
+
+_stage_histograms = {stage: WEBHOOK_STAGE_SECONDS.labels(stage=stage) for stage in WEBHOOK_STAGES}
+
+
+def time_stage(stage: str):
+    """
+    Context manager timing one webhook stage.
+
+    Args:
+        stage: One of WEBHOOK_STAGES
+    """
+    return _stage_histograms[stage].time()
+
+
+@contextmanager
+def track_google_call(method: str) -> Iterator[None]:
+    """
+    Time and count one Google API call.
+
+    Exceptions carrying an HTTP status (googleapiclient's HttpError, the
+    async client's GoogleApiError) are counted under that status, any other
+    exception as ``error``.
+
+    Args:
+        method: API method, e.g. ``values.append`` or ``oauth.token``
+    """
+    status = "ok"
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        status = str(_http_status(e) or "error")
+        raise
+    finally:
+        GOOGLE_API_REQUEST_SECONDS.labels(method=method).observe(time.perf_counter() - started_at)
+        GOOGLE_API_REQUESTS.labels(method=method, status=status).inc()
+
+
+def _http_status(error: Exception):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "resp", None), "status", None)
+    return status
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py), the values
+    written by all workers are merged, so any worker can answer a scrape.
+
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
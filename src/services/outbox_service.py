@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import json
+import logging
+
+from sqlalchemy import and_, or_
+
+from src.config.database import SessionLocal
+from src.config.settings import Config
+from src.models.outbox import OutboxMessage
+
+
+@dataclass(frozen=True)
+class OutboxJob:
+    id: int
+    user_id: int
+    reply_to: str
+    data: Dict[str, Any]
+    attempts: int
+
+
+class OutboxService:
+    """Durable queue of parsed expenses waiting to be written to Google Sheets."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.max_attempts = Config.OUTBOX_MAX_ATTEMPTS
+        self.visibility_timeout = timedelta(seconds=Config.OUTBOX_VISIBILITY_TIMEOUT)
+
+    def enqueue(self, user_id: int, reply_to: str, data: Dict[str, Any]) -> int:
+        """
+        Persist a parsed expense for background processing.
+
+        Args:
+            user_id: ID of the user who sent the expense
+            reply_to: Twilio address the confirmation should be sent to
+            data: Processed expense data from PriceProcessorService
+
+        Returns:
+            int: ID of the outbox message
+        """
+        with SessionLocal() as db:
+            message = OutboxMessage(
+                user_id=user_id,
+                reply_to=reply_to,
+                payload=json.dumps(data),
+                status=OutboxMessage.STATUS_PENDING,
+                available_at=datetime.utcnow(),
+            )
+            db.add(message)
+            db.commit()
+            return message.id
+
+    def claim(self, limit: int = 1) -> List[OutboxJob]:
+        """
+        Claim up to ``limit`` due messages for processing.
+
+        Messages stuck in processing for longer than the visibility timeout
+        (e.g. because their worker died) are claimed again.
+
+        Each candidate is taken with a conditional UPDATE that only matches
+        the status and updated_at it was read with, so when two workers read
+        the same rows only one of them gets each message. ``FOR UPDATE SKIP
+        LOCKED`` keeps Postgres workers off each other's rows, but SQLite
+        ignores it and relies on the conditional update alone.
+        """
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            candidates = (
+                db.query(OutboxMessage.id, OutboxMessage.status, OutboxMessage.updated_at)
+                .filter(
+                    or_(
+                        and_(
+                            OutboxMessage.status == OutboxMessage.STATUS_PENDING,
+                            OutboxMessage.available_at <= now,
+                        ),
+                        and_(
+                            OutboxMessage.status == OutboxMessage.STATUS_PROCESSING,
+                            OutboxMessage.updated_at <= now - self.visibility_timeout,
+                        ),
+                    )
+                )
+                .order_by(OutboxMessage.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+
+            claimed_ids = []
+            for message_id, status, updated_at in candidates:
+                if updated_at is None:
+                    unchanged = OutboxMessage.updated_at.is_(None)
+                else:
+                    unchanged = OutboxMessage.updated_at == updated_at
+                taken = (
+                    db.query(OutboxMessage)
+                    .filter(OutboxMessage.id == message_id, OutboxMessage.status == status, unchanged)
+                    .update(
+                        {
+                            OutboxMessage.status: OutboxMessage.STATUS_PROCESSING,
+                            OutboxMessage.attempts: OutboxMessage.attempts + 1,
+                            OutboxMessage.updated_at: now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                if taken == 1:
+                    claimed_ids.append(message_id)
+            db.commit()
+
+            if not claimed_ids:
+                return []
+            messages = (
+                db.query(OutboxMessage)
+                .filter(OutboxMessage.id.in_(claimed_ids))
+                .order_by(OutboxMessage.id)
+                .all()
+            )
+            return [
+                OutboxJob(
+                    id=message.id,
+                    user_id=message.user_id,
+                    reply_to=message.reply_to,
+                    data=json.loads(message.payload),
+                    attempts=message.attempts,
+                )
+                for message in messages
+            ]
+
+    def complete(self, job_id: int) -> None:
+        with SessionLocal() as db:
+            message = db.get(OutboxMessage, job_id)
+            if message:
+                message.status = OutboxMessage.STATUS_DONE
+                message.last_error = None
+                db.commit()
+
+    def fail(self, job_id: int, error: str) -> bool:
+        """
+        Record a failed attempt and schedule a retry with exponential backoff.
+
+        Returns:
+            bool: True if the message will be retried, False if it was given up on
+        """
+        with SessionLocal() as db:
+            message = db.get(OutboxMessage, job_id)
+            if not message:
+                return False
+            message.last_error = error
+            if message.attempts >= self.max_attempts:
+                message.status = OutboxMessage.STATUS_FAILED
+                self.logger.error("Giving up on outbox message %s after %s attempts: %s", job_id, message.attempts, error)
+            else:
+                message.status = OutboxMessage.STATUS_PENDING
+                message.available_at = datetime.utcnow() + timedelta(seconds=2 ** message.attempts)
+            db.commit()
+            return message.status == OutboxMessage.STATUS_PENDING
+
+    def defer(self, job_id: int, delay: float, reason: str) -> None:
+        """
+        Put a claimed message back in the queue for ``delay`` seconds without counting the attempt.
+
+        Used when the write couldn't even be tried, e.g. because the Sheets
+        quota is exhausted, so waiting for quota never exhausts the retries.
+        """
+        with SessionLocal() as db:
+            message = db.get(OutboxMessage, job_id)
+            if not message:
+                return
+            message.status = OutboxMessage.STATUS_PENDING
+            message.attempts = max(message.attempts - 1, 0)
+            message.available_at = datetime.utcnow() + timedelta(seconds=delay)
+            message.last_error = reason
+            db.commit()
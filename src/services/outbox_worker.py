@@ -0,0 +1,127 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+
+from src.services.expense_service import ExpenseService
+from src.services.google_sheets.rate_limiter import SheetsRateLimited, background_priority
+from src.services.outbox_service import OutboxJob, OutboxService
+from src.services.twilio_service import TwilioMessenger
+from src.services.user_service import UserService
+
+
+class OutboxWorker:
+    """
+    Pool of background threads draining the outbox.
+
+    Each job is written to the user's Google Sheet and the final confirmation
+    or error is sent back through the Twilio REST API, so the webhook itself
+    only has to parse and enqueue.
+    """
+
+    def __init__(self, app: Flask, threads: int, poll_interval: float):
+        self.app = app
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self.outbox_service = OutboxService()
+        self.expense_service = ExpenseService()
+        self.user_service = UserService()
+        self.messenger = TwilioMessenger()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if any(worker.is_alive() for worker in self._workers):
+            return
+        self._stop_event.clear()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"outbox-worker-{i}", daemon=True)
+            for i in range(self.threads)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self.logger.info("Started %s outbox worker threads", self.threads)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the worker threads once they finish their current job.
+
+        Args:
+            timeout: Seconds to wait for each thread to exit; None waits until it does
+        """
+        self._stop_event.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            if worker is not threading.current_thread():
+                worker.join(timeout)
+
+    def notify(self) -> None:
+        """Wake an idle worker so a freshly enqueued job doesn't wait for the next poll."""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                jobs = self.outbox_service.claim()
+            except Exception as e:
+                self.logger.error("Failed to claim outbox messages: %s", e)
+                jobs = []
+
+            if not jobs:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            for job in jobs:
+                # Leave part of the Sheets quota to webhook writes
+                with self.app.app_context(), background_priority():
+                    self.process(job)
+
+    def process(self, job: OutboxJob) -> None:
+        """Write queued expenses to Google Sheets and notify the user."""
+        try:
+            # Database errors raise and the job is retried below; only a
+            # missing, inactive or unconfigured user ends it here
+            is_valid, error_message, user = self.user_service.get_active_user(job.user_id)
+            if not is_valid:
+                self.messenger.send_message(job.reply_to, error_message)
+                self.outbox_service.complete(job.id)
+                self.expense_service.discard_expenses(self._expenses(job))
+                return
+
+            if "expenses" in job.data:
+                is_success, message, _ = self.expense_service.save_expenses(
+                    job.data["expenses"], user, job.data.get("failed_lines", []), raise_rate_limited=True
+                )
+            else:
+                is_success, message, _ = self.expense_service.save_expense(job.data, user, raise_rate_limited=True)
+            if is_success:
+                self.outbox_service.complete(job.id)
+                self.messenger.send_message(job.reply_to, message)
+                return
+
+            if not self.outbox_service.fail(job.id, message):
+                self.messenger.send_message(job.reply_to, message)
+                self.expense_service.discard_expenses(self._expenses(job))
+        except SheetsRateLimited as e:
+            # Waiting for quota is not a failed attempt
+            self.logger.info("Sheets quota exhausted, retrying outbox message %s in %.1fs", job.id, e.retry_after)
+            try:
+                self.outbox_service.defer(job.id, e.retry_after, str(e))
+            except Exception as defer_error:
+                self.logger.error("Failed to reschedule outbox message %s: %s", job.id, defer_error)
+        except Exception as e:
+            self.logger.error("Error processing outbox message %s: %s", job.id, e)
+            try:
+                if not self.outbox_service.fail(job.id, str(e)):
+                    self.expense_service.discard_expenses(self._expenses(job))
+            except Exception as fail_error:
+                # Still marked as processing, so it is claimed again after the visibility timeout
+                self.logger.error("Failed to reschedule outbox message %s: %s", job.id, fail_error)
+
+    @staticmethod
+    def _expenses(job: OutboxJob) -> List[Dict[str, Any]]:
+        return job.data["expenses"] if "expenses" in job.data else [job.data]
@@ -1,12 +1,131 @@
-import re
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+
+class ParsedExpense:
+    """Result of parsing an expense message; the amount is kept in integer cents."""
+
+    __slots__ = ("amount_cents", "product", "category", "is_split")
+
+    def __init__(self, amount_cents: int, product: str, category: str, is_split: bool):
+        self.amount_cents = amount_cents
+        self.product = product
+        self.category = category
+        self.is_split = is_split
+
+    @property
+    def price(self) -> str:
+        return f"{self.amount_cents // 100}.{self.amount_cents % 100:02d}"
+
+    def __repr__(self):
+        return (
+            f"ParsedExpense(amount_cents={self.amount_cents}, product={self.product!r}, "
+            f"category={self.category!r}, is_split={self.is_split})"
+        )
 
 
 class PriceProcessorService:
-    # regex: price (int/float with comma), product (word‐chunk), category (word‐chunk), optional (dividir)
-    PATTERN = re.compile(
-        r"^\s*(\d+(?:,\d+)?)\s+(.+?)\s+(\w+)(?:\s+\(dividir\))?\s*$", re.IGNORECASE
-    )
+    """
+    Parses messages like ``1.234,56 café lifestyle (dividir)``.
+
+    Grammar: price, product (one or more words), category (a single word of
+    letters, digits or ``_``) and an optional trailing ``(dividir)``. The price
+    accepts ``.`` as thousands separator and ``,`` with one or two decimals.
+    Tokens are cut with one split from the left (price) and at most two from
+    the right (category and ``(dividir)``), so there is no backtracking and the
+    cost is linear in the (bounded) message length.
+    """
+
+    MAX_MESSAGE_LENGTH = 200
+    SPLIT_MARKER = "(dividir)"
+
+    _today_formatted = ""
+    _today_expires_at = 0.0
+
+    @classmethod
+    def _current_date(cls) -> str:
+        """Today's date in dd/mm/yyyy, formatted once and reused until local midnight."""
+        if time.time() >= cls._today_expires_at:
+            today = date.today()
+            midnight = datetime.combine(today + timedelta(days=1), datetime.min.time())
+            cls._today_formatted = today.strftime("%d/%m/%Y")
+            cls._today_expires_at = midnight.timestamp()
+        return cls._today_formatted
+
+    @staticmethod
+    def _parse_price(token: str) -> Optional[int]:
+        """
+        Convert a price token to cents.
+
+        Args:
+            token: Price as typed, e.g. ``19``, ``19,2``, ``1.234,56``
+
+        Returns:
+            Amount in cents, or None if the token is not a valid price
+        """
+        if token.isdecimal():
+            return int(token) * 100
+        whole, comma, fraction = token.partition(",")
+        if comma:
+            if not (0 < len(fraction) <= 2 and fraction.isdecimal()):
+                return None
+            if len(fraction) == 1:
+                fraction += "0"
+        else:
+            fraction = "00"
+
+        if not whole.isdecimal():
+            # Thousands separators: 1-3 leading digits, then groups of exactly 3
+            groups = whole.split(".")
+            if len(groups) < 2 or not 0 < len(groups[0]) <= 3:
+                return None
+            for index, group in enumerate(groups):
+                if not group.isdecimal() or (index and len(group) != 3):
+                    return None
+            whole = "".join(groups)
+        return int(whole + fraction)
+
+    @classmethod
+    def parse(cls, message: str) -> Optional[ParsedExpense]:
+        """
+        Parse an expense message.
+
+        Args:
+            message: The incoming message string
+
+        Returns:
+            ParsedExpense if the message is a valid expense, None otherwise
+        """
+        if len(message) > cls.MAX_MESSAGE_LENGTH:
+            return None
+
+        head = message.split(None, 1)
+        if len(head) != 2:
+            return None
+        amount_cents = cls._parse_price(head[0])
+        if amount_cents is None:
+            return None
+
+        tail = head[1].rsplit(None, 1)
+        if len(tail) != 2:
+            return None
+        product, category = tail
+
+        is_split = len(category) == len(cls.SPLIT_MARKER) and category.lower() == cls.SPLIT_MARKER
+        if is_split:
+            tail = product.rsplit(None, 1)
+            if len(tail) != 2:
+                return None
+            product, category = tail
+            amount_cents = (amount_cents + 1) // 2
+
+        if not category.isalnum():
+            for ch in category:
+                if not (ch.isalnum() or ch == "_"):
+                    return None
+
+        return ParsedExpense(amount_cents, product, category, is_split)
 
     @classmethod
     def process_message(cls, message: str) -> tuple[bool, str, dict]:
@@ -20,12 +139,12 @@ class PriceProcessorService:
             tuple: (is_valid, reply_message, data)
             - is_valid: bool indicating if the message was valid
             - reply_message: The response message to send back
-            - data: Dictionary containing the processed data (price, product, category, date)
+            - data: Dictionary containing the processed data (price, amount_cents,
+              product, category, date, is_split)
         """
-        message = message.strip()
-        m = cls.PATTERN.match(message)
+        parsed = cls.parse(message)
 
-        if not m:
+        if parsed is None:
             return (
                 False,
                 (
@@ -37,29 +156,24 @@ class PriceProcessorService:
                 {},
             )
 
-        price, product, category = m.groups()
-        # Convert comma to dot for price
-        price = price.replace(",", ".")
-        # Check if input ends with (dividir)
-        if message.lower().endswith("(dividir)"):
-            price = str(float(price) / 2)
-
-        # Get current date in dd/mm/yyyy format
-        current_date = datetime.now().strftime("%d/%m/%Y")
+        current_date = cls._current_date()
+        price = parsed.price
 
         data = {
             "price": price,
-            "product": product,
-            "category": category,
+            "amount_cents": parsed.amount_cents,
+            "product": parsed.product,
+            "category": parsed.category,
             "date": current_date,
+            "is_split": parsed.is_split,
         }
 
         reply = (
             f"Gravado ✔️\n"
             f"Data: {current_date}\n"
             f"Preço: {price}\n"
-            f"Produto: {product}\n"
-            f"Categoria: {category}"
+            f"Produto: {parsed.product}\n"
+            f"Categoria: {parsed.category}"
         )
 
         return True, reply, data
@@ -0,0 +1,13 @@
+from .columnar import ExpenseColumns, load_expense_columns
+from .digest import DigestReport, UserDigest, add_months, compute_monthly_digests
+from .sender import ConcurrentSender
+
+__all__ = [
+    "ExpenseColumns",
+    "load_expense_columns",
+    "DigestReport",
+    "UserDigest",
+    "add_months",
+    "compute_monthly_digests",
+    "ConcurrentSender",
+]
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List
+
+import numpy as np
+from sqlalchemy import select
+
+from src.config.database import ReadSessionLocal
+from src.models.expense import ExpenseRecord
+
+
+@dataclass
+class ExpenseColumns:
+    """
+    Expenses as parallel NumPy columns.
+
+    ``user_idx`` and ``category_code`` index into ``user_ids`` and
+    ``categories``; ``day`` is the number of days since 1970-01-01.
+    """
+
+    user_ids: np.ndarray
+    categories: np.ndarray
+    user_idx: np.ndarray
+    category_code: np.ndarray
+    amount_cents: np.ndarray
+    day: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.amount_cents)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        user_ids: np.ndarray,
+        categories: np.ndarray,
+        amount_cents: np.ndarray,
+        days: np.ndarray,
+    ) -> "ExpenseColumns":
+        """
+        Build columns from raw per-expense arrays, dictionary-encoding users and categories.
+
+        Args:
+            user_ids: User ID of each expense
+            categories: Category of each expense (object array of str)
+            amount_cents: Amount of each expense in cents
+            days: Date of each expense as ``datetime64[D]`` or days since epoch
+        """
+        unique_users, user_idx = np.unique(np.asarray(user_ids, dtype=np.int64), return_inverse=True)
+        unique_categories, category_code = np.unique(
+            np.asarray(categories, dtype=object), return_inverse=True
+        )
+        return cls(
+            user_ids=unique_users,
+            categories=unique_categories,
+            user_idx=user_idx.astype(np.int32),
+            category_code=category_code.astype(np.int32),
+            amount_cents=np.asarray(amount_cents, dtype=np.int64),
+            day=np.asarray(days, dtype="datetime64[D]").astype(np.int32),
+        )
+
+
+def load_expense_columns(start: date, end: date, chunk_size: int = 50_000) -> ExpenseColumns:
+    """
+    Load every ledger expense dated in [start, end) into columns.
+
+    Rows are streamed from the database in chunks and appended to flat
+    buffers, so no per-row Python objects outlive a chunk.
+
+    Args:
+        start: First day to include
+        end: First day after the range
+        chunk_size: Rows fetched per database round trip
+    """
+    user_ids: List[np.ndarray] = []
+    categories: List[np.ndarray] = []
+    amounts: List[np.ndarray] = []
+    days: List[np.ndarray] = []
+
+    statement = (
+        select(
+            ExpenseRecord.user_id,
+            ExpenseRecord.category,
+            ExpenseRecord.amount_cents,
+            ExpenseRecord.date,
+        )
+        .where(ExpenseRecord.date >= start, ExpenseRecord.date < end)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    with ReadSessionLocal() as db:
+        for chunk in db.execute(statement).partitions():
+            chunk_user_ids, chunk_categories, chunk_amounts, chunk_days = zip(*chunk)
+            user_ids.append(np.array(chunk_user_ids, dtype=np.int64))
+            categories.append(np.array(chunk_categories, dtype=object))
+            amounts.append(np.array(chunk_amounts, dtype=np.int64))
+            days.append(np.array(chunk_days, dtype="datetime64[D]"))
+
+    if not amounts:
+        return ExpenseColumns.from_arrays(
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=object),
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype="datetime64[D]"),
+        )
+
+    return ExpenseColumns.from_arrays(
+        np.concatenate(user_ids),
+        np.concatenate(categories),
+        np.concatenate(amounts),
+        np.concatenate(days),
+    )
@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.services.reporting.columnar import ExpenseColumns
+
+# Largest (users x categories) key space grouped with a dense bincount
+DENSE_GROUP_LIMIT = 16_000_000
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _day_number(value: date) -> int:
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+@dataclass
+class UserDigest:
+    user_id: int
+    month: date
+    total_cents: int
+    expense_count: int
+    previous_total_cents: int
+    top_categories: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def change_percent(self) -> Optional[float]:
+        if self.previous_total_cents <= 0:
+            return None
+        return (self.total_cents - self.previous_total_cents) * 100.0 / self.previous_total_cents
+
+
+@dataclass
+class DigestReport:
+    """Grouped aggregates for one month, one array slot per user in ``columns.user_ids``."""
+
+    month: date
+    columns: ExpenseColumns
+    total_cents: np.ndarray
+    expense_count: np.ndarray
+    previous_total_cents: np.ndarray
+    # Top categories per user, sorted by user then by total descending
+    top_user_idx: np.ndarray
+    top_category_code: np.ndarray
+    top_total_cents: np.ndarray
+
+    def __iter__(self) -> Iterator[UserDigest]:
+        """Yield a digest for every user with spending in the month or the month before."""
+        top_bounds = np.searchsorted(self.top_user_idx, np.arange(len(self.columns.user_ids) + 1))
+        active = np.flatnonzero((self.total_cents > 0) | (self.previous_total_cents > 0))
+        for idx in active:
+            start, end = top_bounds[idx], top_bounds[idx + 1]
+            yield UserDigest(
+                user_id=int(self.columns.user_ids[idx]),
+                month=self.month,
+                total_cents=int(self.total_cents[idx]),
+                expense_count=int(self.expense_count[idx]),
+                previous_total_cents=int(self.previous_total_cents[idx]),
+                top_categories=[
+                    (str(self.columns.categories[code]), int(total))
+                    for code, total in zip(self.top_category_code[start:end], self.top_total_cents[start:end])
+                ],
+            )
+
+
+def compute_monthly_digests(columns: ExpenseColumns, month: date, top_n: int = 3) -> DigestReport:
+    """
+    Compute per-user monthly totals, top categories and month-over-month change.
+
+    Every aggregate is computed with vectorized NumPy grouping (``bincount``
+    over dictionary-encoded user and category keys); there is no per-expense
+    Python loop.
+
+    Args:
+        columns: Expenses covering at least ``month`` and the month before it
+        month: First day of the month being reported
+        top_n: Number of categories to keep per user
+
+    Returns:
+        DigestReport with one slot per user in ``columns.user_ids``
+    """
+    n_users = len(columns.user_ids)
+    n_categories = max(len(columns.categories), 1)
+
+    current_start = _day_number(month)
+    current_end = _day_number(add_months(month, 1))
+    previous_start = _day_number(add_months(month, -1))
+
+    current = (columns.day >= current_start) & (columns.day < current_end)
+    previous = (columns.day >= previous_start) & (columns.day < current_start)
+
+    user_idx = columns.user_idx[current]
+    amounts = columns.amount_cents[current]
+
+    total_cents = np.bincount(user_idx, weights=amounts, minlength=n_users).astype(np.int64)
+    expense_count = np.bincount(user_idx, minlength=n_users).astype(np.int64)
+    previous_total_cents = np.bincount(
+        columns.user_idx[previous], weights=columns.amount_cents[previous], minlength=n_users
+    ).astype(np.int64)
+
+    # Group by (user, category) through a combined integer key. A dense
+    # bincount is fastest while the key space is small; otherwise sort-based
+    # grouping keeps memory proportional to the number of expenses.
+    keys = user_idx.astype(np.int64) * n_categories + columns.category_code[current]
+    if n_users * n_categories <= DENSE_GROUP_LIMIT:
+        dense_totals = np.bincount(keys, weights=amounts, minlength=n_users * n_categories)
+        group_keys = np.flatnonzero(dense_totals)
+        group_totals = dense_totals[group_keys].astype(np.int64)
+    else:
+        group_keys, inverse = np.unique(keys, return_inverse=True)
+        group_totals = np.bincount(inverse, weights=amounts).astype(np.int64)
+    group_users = group_keys // n_categories
+    group_categories = group_keys % n_categories
+
+    # Sort groups by user, then by total descending, and keep the first top_n of each user
+    order = np.lexsort((-group_totals, group_users))
+    sorted_users = group_users[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_users, sorted_users, side="left")
+    top = order[rank < top_n]
+
+    return DigestReport(
+        month=month,
+        columns=columns,
+        total_cents=total_cents,
+        expense_count=expense_count,
+        previous_total_cents=previous_total_cents,
+        top_user_idx=group_users[top],
+        top_category_code=group_categories[top],
+        top_total_cents=group_totals[top],
+    )
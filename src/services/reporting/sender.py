@@ -0,0 +1,36 @@
+import logging
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterable, Tuple
+
+from src.services.twilio_service import TwilioMessenger
+
+
+class ConcurrentSender:
+    """Sends many WhatsApp messages through Twilio with a bounded number in flight."""
+
+    def __init__(self, messenger: TwilioMessenger, max_concurrency: int):
+        self.messenger = messenger
+        self.max_concurrency = max_concurrency
+        self.logger = logging.getLogger(__name__)
+
+    def send_all(self, messages: Iterable[Tuple[str, str]]) -> Tuple[int, int]:
+        """
+        Send (recipient, body) pairs.
+
+        The iterable is consumed lazily, so at most ``max_concurrency`` rendered
+        messages are waiting in the executor at any time.
+
+        Returns:
+            Tuple of (sent, failed) counts
+        """
+        results = Counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending: Deque[Future] = deque()
+            for to, body in messages:
+                pending.append(executor.submit(self.messenger.send_message, to, body))
+                if len(pending) >= self.max_concurrency:
+                    results[pending.popleft().result()] += 1
+            for future in pending:
+                results[future.result()] += 1
+        return results[True], results[False]
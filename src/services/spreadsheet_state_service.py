@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Any, Dict
+import logging
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from src.config.database import SessionLocal
+from src.models.spreadsheet_state import SpreadsheetState
+
+
+class SpreadsheetStateService:
+    """Persists per-spreadsheet setup and sync progress."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def is_initialized(self, spreadsheet_id: str) -> bool:
+        with SessionLocal() as db:
+            state = db.get(SpreadsheetState, spreadsheet_id)
+            return bool(state and state.initialized_at)
+
+    def mark_initialized(self, spreadsheet_id: str) -> None:
+        try:
+            self._save(spreadsheet_id, {"initialized_at": datetime.utcnow()})
+        except Exception as e:
+            # Not fatal: the next process will detect the header and record it again.
+            self.logger.warning("Failed to record initialization of spreadsheet %s: %s", spreadsheet_id, e)
+
+    def get_last_synced_row(self, spreadsheet_id: str) -> int:
+        """Return the last sheet row already read by an incremental sync (1 = header only)."""
+        with SessionLocal() as db:
+            state = db.get(SpreadsheetState, spreadsheet_id)
+            return state.last_synced_row if state and state.last_synced_row else 1
+
+    def set_last_synced_row(self, spreadsheet_id: str, row: int) -> None:
+        self._save(spreadsheet_id, {"last_synced_row": row})
+
+    @staticmethod
+    def upsert_statement(dialect: str, spreadsheet_id: str, values: Dict[str, Any]):
+        """
+        Single-statement insert-or-update of a spreadsheet's state, for dialects that support it.
+
+        Concurrent first requests for a new spreadsheet both write their
+        values instead of one of them failing on the primary key.
+
+        Returns:
+            The INSERT ... ON CONFLICT statement, or None for other dialects
+        """
+        if dialect not in ("postgresql", "sqlite"):
+            return None
+        insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+        values = {**values, "updated_at": datetime.utcnow()}
+        statement = insert(SpreadsheetState).values(spreadsheet_id=spreadsheet_id, **values)
+        return statement.on_conflict_do_update(index_elements=["spreadsheet_id"], set_=values)
+
+    def _save(self, spreadsheet_id: str, values: Dict[str, Any]) -> None:
+        with SessionLocal() as db:
+            statement = self.upsert_statement(db.get_bind().dialect.name, spreadsheet_id, values)
+            if statement is not None:
+                db.execute(statement)
+                db.commit()
+                return
+
+            state = db.get(SpreadsheetState, spreadsheet_id)
+            if state is None:
+                db.add(SpreadsheetState(spreadsheet_id=spreadsheet_id, **values))
+            else:
+                for key, value in values.items():
+                    setattr(state, key, value)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Inserted by a concurrent request in the meantime
+                db.rollback()
+                db.query(SpreadsheetState).filter(SpreadsheetState.spreadsheet_id == spreadsheet_id).update(
+                    values, synchronize_session=False
+                )
+                db.commit()
+
+
+spreadsheet_state_service = SpreadsheetStateService()
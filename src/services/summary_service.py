@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+
+from src.config.database import SessionLocal
+from src.models.expense import ExpenseTotal
+from src.services.category_index import category_index
+from src.services.expense_ledger_service import month_start
+
+
+@dataclass(frozen=True)
+class SummaryRequest:
+    period: str
+    category: Optional[str] = None
+
+
+class SummaryService:
+    """
+    Answers ``resumo`` commands from the per-month, per-category running totals.
+
+    Supported commands:
+        resumo             current month, all categories
+        resumo mês         current month, all categories
+        resumo ano         current year, all categories
+        resumo <categoria> current month (or year, with ``ano``) for one category
+    """
+
+    COMMAND = "resumo"
+    PERIOD_MONTH = "month"
+    PERIOD_YEAR = "year"
+    PERIOD_KEYWORDS = {"mês": PERIOD_MONTH, "mes": PERIOD_MONTH, "ano": PERIOD_YEAR}
+
+    @classmethod
+    def parse_command(cls, message: str) -> Optional[SummaryRequest]:
+        """
+        Parse a summary command.
+
+        Args:
+            message: The incoming message string
+
+        Returns:
+            SummaryRequest if the message is a summary command, None otherwise
+        """
+        words = message.strip().lower().split()
+        if not words or words[0] != cls.COMMAND:
+            return None
+
+        period = cls.PERIOD_MONTH
+        category = None
+        for word in words[1:]:
+            if word in cls.PERIOD_KEYWORDS:
+                period = cls.PERIOD_KEYWORDS[word]
+            elif category is None:
+                category = word
+            else:
+                return None
+        return SummaryRequest(period=period, category=category)
+
+    def get_totals(
+        self, user_id: int, summary_request: SummaryRequest, today: Optional[date] = None
+    ) -> Tuple[str, List[Tuple[str, int, int]]]:
+        """
+        Read the totals for a summary request.
+
+        The number of rows read depends only on the number of categories and
+        months in the period, never on how many expenses the user has.
+
+        Args:
+            user_id: ID of the user asking for the summary
+            summary_request: Parsed summary command
+            today: Reference date, defaults to the current date
+
+        Returns:
+            Tuple of (period label, [(category, total_cents, expense_count)])
+            sorted by total, largest first
+        """
+        today = today or date.today()
+        if summary_request.period == self.PERIOD_YEAR:
+            start, end = date(today.year, 1, 1), date(today.year, 12, 1)
+            label = str(today.year)
+        else:
+            start = end = month_start(today)
+            label = today.strftime("%m/%Y")
+
+        with SessionLocal() as db:
+            query = db.query(
+                ExpenseTotal.category,
+                func.sum(ExpenseTotal.total_cents),
+                func.sum(ExpenseTotal.expense_count),
+            ).filter(
+                ExpenseTotal.user_id == user_id,
+                ExpenseTotal.month >= start,
+                ExpenseTotal.month <= end,
+            )
+            if summary_request.category:
+                # Exact stored spellings: SQLite's lower() only folds ASCII
+                spellings = category_index.variants(user_id, summary_request.category)
+                query = query.filter(ExpenseTotal.category.in_(spellings | {summary_request.category}))
+            rows = query.group_by(ExpenseTotal.category).all()
+
+        # Older rows may hold other spellings of the same category
+        merged = {}
+        for category, total, count in rows:
+            category = category_index.canonical(user_id, category)
+            previous_total, previous_count = merged.get(category, (0, 0))
+            merged[category] = (previous_total + int(total), previous_count + int(count))
+
+        totals = [(category, total, count) for category, (total, count) in merged.items()]
+        totals.sort(key=lambda row: row[1], reverse=True)
+        return label, totals
@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from typing import Mapping, Optional
+
+from src.config.settings import Config
+from src.services.user_cache import normalize_phone_number
+
+
+class TrafficCapture:
+    """
+    Appends anonymized ``/whatsapp`` payloads to a JSON Lines file for offline replay.
+
+    Each line holds the arrival time, keyed hashes of the sender and of the
+    MessageSid, and the message body:
+
+        {"t":1760774400.123,"u":"5f0c...","s":"9a1e...","b":"19,20 café lifestyle"}
+
+    Hashing with a secret key keeps per-user skew and Twilio retries visible
+    in the capture without storing phone numbers. Every line is written with
+    a single ``O_APPEND`` write, so gunicorn workers can share one file.
+    Capture stops once the file reaches ``max_bytes``.
+    """
+
+    HASH_LENGTH = 16
+
+    def __init__(self, path: Optional[str], salt: Optional[str], max_bytes: int):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._key = (salt or "").encode("utf-8")
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._full = False
+        if path and not salt:
+            self.logger.warning("TRAFFIC_CAPTURE_PATH is set without TRAFFIC_CAPTURE_SALT, traffic capture is disabled")
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path and self._key) and not self._full
+
+    def anonymize(self, value: str) -> str:
+        return hmac.new(self._key, value.encode("utf-8"), hashlib.sha256).hexdigest()[: self.HASH_LENGTH]
+
+    def _open(self) -> int:
+        # Opened lazily and per process, so forked workers don't share a descriptor
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def record(self, form: Mapping[str, str]) -> None:
+        """
+        Append one webhook payload to the capture file.
+
+        Never raises: a failed capture is logged and the webhook proceeds.
+
+        Args:
+            form: The form fields posted by Twilio
+        """
+        if not self.enabled:
+            return
+
+        sender = normalize_phone_number(form.get("From", ""))
+        message_sid = form.get("MessageSid", "").strip()
+        line = json.dumps(
+            {
+                "t": round(time.time(), 3),
+                "u": self.anonymize(sender),
+                "s": self.anonymize(message_sid) if message_sid else "",
+                "b": form.get("Body", ""),
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8") + b"\n"
+
+        try:
+            with self._lock:
+                fd = self._open()
+                if os.fstat(fd).st_size + len(line) > self.max_bytes:
+                    self._full = True
+                    self.logger.warning("Traffic capture file %s reached %s bytes, capture stopped", self.path, self.max_bytes)
+                    return
+                os.write(fd, line)
+        except OSError as e:
+            self.logger.error("Failed to capture webhook payload: %s", e)
+
+
+traffic_capture = TrafficCapture(
+    path=Config.TRAFFIC_CAPTURE_PATH,
+    salt=Config.TRAFFIC_CAPTURE_SALT,
+    max_bytes=Config.TRAFFIC_CAPTURE_MAX_BYTES,
+)
@@ -0,0 +1,41 @@
+import logging
+import threading
+
+from src.config.settings import Config
+
+
+class TwilioMessenger:
+    """Sends WhatsApp messages through the Twilio REST API."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from twilio.rest import Client
+
+                    self._client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
+        return self._client
+
+    def send_message(self, to: str, body: str) -> bool:
+        """
+        Send a WhatsApp message.
+
+        Args:
+            to: Recipient address, e.g. ``whatsapp:+5511999999999``
+            body: Message text
+
+        Returns:
+            bool: True if Twilio accepted the message, False otherwise
+        """
+        try:
+            self.client.messages.create(from_=Config.TWILIO_WHATSAPP_NUMBER, to=to, body=body)
+            return True
+        except Exception as e:
+            self.logger.error("Failed to send WhatsApp message to %s: %s", to, e)
+            return False
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from src.config.settings import Config
+
+
+def normalize_phone_number(phone_number: str) -> str:
+    """Strip the ``whatsapp:`` prefix and formatting characters from a phone number."""
+    value = (phone_number or "").strip()
+    if value.lower().startswith("whatsapp:"):
+        value = value[len("whatsapp:"):]
+    return "".join(ch for ch in value if ch.isdigit() or ch == "+")
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only copy of the user fields needed to process a message."""
+
+    id: int
+    name: str
+    phone_number: str
+    google_sheets_id: Optional[str]
+    google_token: Optional[str]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            name=user.name,
+            phone_number=user.phone_number,
+            google_sheets_id=user.google_sheets_id,
+            google_token=user.google_token,
+            is_active=bool(user.is_active),
+        )
+
+    def __repr__(self):
+        return f"<User(phone_number='{self.phone_number}')>"
+
+
+ValidationResult = Tuple[bool, str, Optional[UserSnapshot]]
+
+
+class UserCache:
+    """
+    Read-through cache of user validation results keyed by normalized phone number.
+
+    Valid users are kept for ``ttl_seconds`` and rejected numbers (unknown,
+    inactive or unconfigured) for ``negative_ttl_seconds``. Invalidations bump
+    a shared version file; every worker reads it on each lookup (a local file
+    read, far cheaper than a DB round trip) and drops its whole cache when
+    another worker changed it.
+    """
+
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: float, version_file: str):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.version_file = version_file
+        self._entries: Dict[str, Tuple[ValidationResult, float]] = {}
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _read_version(self) -> Optional[str]:
+        try:
+            with open(self.version_file, encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _sync_version(self) -> None:
+        version = self._read_version()
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, phone_number: str) -> Optional[ValidationResult]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._sync_version()
+            entry = self._entries.get(phone_number)
+            if entry is None:
+                return None
+            result, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[phone_number]
+                return None
+            return result
+
+    def set(self, phone_number: str, result: ValidationResult) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if result[0] else self.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[phone_number] = (result, time.monotonic() + ttl)
+
+    def invalidate(self, phone_number: Optional[str] = None) -> None:
+        """
+        Drop a cached number locally and signal every other worker to drop its cache.
+
+        Args:
+            phone_number: Number to drop locally; all entries are dropped when None
+        """
+        with self._lock:
+            if phone_number is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(normalize_phone_number(phone_number), None)
+            self._bump_version()
+            self._version = self._read_version()
+
+    def invalidated_within(self, seconds: float) -> bool:
+        """Whether any worker invalidated the cache in the last ``seconds``."""
+        try:
+            return time.time() - os.stat(self.version_file).st_mtime < seconds
+        except FileNotFoundError:
+            return False
+
+    def _bump_version(self) -> None:
+        # Write-then-rename so readers never see a partially written version.
+        directory = os.path.dirname(self.version_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, self.version_file)
+
+
+user_cache = UserCache(
+    ttl_seconds=Config.USER_CACHE_TTL,
+    negative_ttl_seconds=Config.USER_CACHE_NEGATIVE_TTL,
+    version_file=Config.USER_CACHE_VERSION_FILE,
+)
@@ -1,5 +1,11 @@
-from src.config.database import SessionLocal
+from src.config.database import ReadSessionLocal, SessionLocal, db_circuit_breaker, engine, read_engine
+from src.config.settings import Config
 from src.models.user import User
+from src.services.google_sheets.client_cache import sheets_client_cache
+from src.services.google_sheets.token_broker import token_broker
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.metrics import DB_RETRIES
+from src.services.user_cache import UserSnapshot, normalize_phone_number, user_cache
 from typing import Tuple, Optional
 import logging
 from werkzeug.security import generate_password_hash
@@ -17,6 +23,15 @@ import time
 import random
 
 MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.05
+CONNECTION_ERRORS = (
+    OperationalError,
+    DisconnectionError,
+    InvalidatePoolError,
+    TimeoutError,
+    InterfaceError,
+    CircuitOpenError,
+)
 
 class UserService:
     def __init__(self):
@@ -25,60 +40,105 @@ class UserService:
     def _get_db(self):
         return SessionLocal()
 
+    def _get_read_db(self):
+        """Session for read-only lookups; bound to the read replica when one is configured."""
+        return ReadSessionLocal()
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Exponential backoff with jitter, capped well below Twilio's webhook timeout
+        base_delay = min(RETRY_BASE_DELAY * (2 ** attempt), Config.DB_RETRY_MAX_DELAY)
+        return base_delay * random.uniform(0.5, 1.0)
+
     def _execute_with_retry(self, operation, operation_name: str, validate_result=None):
         """
         Execute database operation with retry logic for connection issues.
-        Uses exponential backoff with jitter to handle cold database starts.
-        
+
+        Calls go through the shared database circuit breaker: while it is open
+        they fail fast with CircuitOpenError, and recovery is probed in the
+        background instead of inside requests. Retries use short capped
+        backoff and are paid from the breaker's retry budget.
+
         Args:
             operation: The database operation to execute
             operation_name: Name for logging purposes
             validate_result: Optional function to validate if result is valid (should return True if valid)
         """
+        if not db_circuit_breaker.allow_request():
+            raise CircuitOpenError(f"Database circuit is open, rejecting {operation_name}")
+
         last_result = None
         for attempt in range(MAX_RETRIES):
             try:
                 result = operation()
-                last_result = result           
+                db_circuit_breaker.record_success()
+                last_result = result
                 if validate_result and not validate_result(result):
-                    if attempt < MAX_RETRIES - 1:
-                        self.logger.warning(f"Invalid result from {operation_name} (attempt {attempt+1}), retrying...")
-                        base_delay = 2 ** attempt
-                        jitter = random.uniform(0.5, 1.5)
-                        delay = base_delay * jitter
-                        self.logger.info(f"Retrying {operation_name} in {delay:.1f} seconds...")
+                    if attempt < MAX_RETRIES - 1 and db_circuit_breaker.try_acquire_retry():
+                        DB_RETRIES.labels(operation=operation_name, reason="invalid_result").inc()
+                        delay = self._retry_delay(attempt)
+                        self.logger.warning("Invalid result from %s (attempt %s), retrying in %.2f seconds...", operation_name, attempt + 1, delay)
                         time.sleep(delay)
                         continue
-                    else:
-                        self.logger.error(f"Max retries reached for {operation_name} with invalid results")
-                        return result
-                
+                    self.logger.error("Giving up on %s with invalid results", operation_name)
+                    return result
+
                 return result
             except (OperationalError, DisconnectionError, InvalidatePoolError, TimeoutError, InterfaceError) as e:
-                self.logger.warning(f"Database connection error in {operation_name} (attempt {attempt+1}): {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    # Exponential backoff with jitter: 1s, 2-4s, 4-8s, 8-16s
-                    base_delay = 2 ** attempt
-                    jitter = random.uniform(0.5, 1.5)
-                    delay = base_delay * jitter
-                    self.logger.info(f"Retrying {operation_name} in {delay:.1f} seconds...")
+                db_circuit_breaker.record_failure()
+                self.logger.warning("Database connection error in %s (attempt %s): %s", operation_name, attempt + 1, e)
+                if attempt < MAX_RETRIES - 1 and db_circuit_breaker.try_acquire_retry():
+                    DB_RETRIES.labels(operation=operation_name, reason="connection").inc()
+                    delay = self._retry_delay(attempt)
+                    self.logger.info("Retrying %s in %.2f seconds...", operation_name, delay)
                     time.sleep(delay)
                     continue
-                self.logger.error(f"Max retries reached for {operation_name}")
+                self.logger.error("Retries exhausted for %s", operation_name)
                 raise
             except (DatabaseError, InternalError, ProgrammingError) as e:
-                self.logger.error(f"Database error in {operation_name}: {str(e)}")
+                self.logger.error("Database error in %s: %s", operation_name, e)
                 raise
             except Exception as e:
-                self.logger.error(f"Unexpected error in {operation_name}: {str(e)}")
+                self.logger.error("Unexpected error in %s: %s", operation_name, e)
                 raise
-        
+
         return last_result
 
-    def validate_user(self, phone_number: str, expect_user_exists: bool = False) -> Tuple[bool, str, Optional[User]]:
+    def _check_user(self, user: Optional[User], identifier) -> Tuple[bool, str, Optional[User]]:
+        """Check that a user exists, is active and has Google Sheets configured."""
+        if not user:
+            self.logger.warning(
+                "Unauthorized access attempt from phone number: %s", identifier
+            )
+            return False, "Acesso não autorizado.", None
+
+        if not user.is_active:
+            self.logger.warning(
+                "Inactive user attempt from phone number: %s", identifier
+            )
+            return False, "Sua conta está inativa.", None
+
+        if not user.google_sheets_id or not user.google_token:
+            self.logger.warning(
+                "Incomplete Google Sheets configuration for user: %s", identifier
+            )
+            return (
+                False,
+                "Configuração do Google Sheets incompleta. Por favor, configure suas credenciais.",
+                None,
+            )
+
+        return True, "", user
+
+    def validate_user(self, phone_number: str, expect_user_exists: bool = False) -> Tuple[bool, str, Optional[UserSnapshot]]:
         """
         Validate if a user exists, is active, and has valid Google Sheets credentials.
 
+        Results are served from the in-process user cache when possible; only
+        misses hit the database. Lookups go to the read replica, except right
+        after a user was changed (see ``READ_REPLICA_MAX_LAG``), when the
+        replica may still return the old row; rejections read on the replica
+        are confirmed on the primary before they are cached.
+
         Args:
             phone_number: User's phone number
             expect_user_exists: If True, will retry if user is None (useful for known existing users)
@@ -87,55 +147,69 @@ class UserService:
             Tuple containing:
             - bool: Whether the user is valid
             - str: Error message if invalid, empty string if valid
-            - User: User object if valid, None if invalid
+            - UserSnapshot: Detached user snapshot if valid, None if invalid
         """
+        phone_number = normalize_phone_number(phone_number)
+
+        cached = user_cache.get(phone_number)
+        if cached is not None and (cached[0] or not expect_user_exists):
+            return cached
+
+        use_replica = read_engine is not engine and not user_cache.invalidated_within(Config.READ_REPLICA_MAX_LAG)
+
         def _validate_operation():
-            with self._get_db() as db:
+            with self._get_read_db() if use_replica else self._get_db() as db:
                 user = db.query(User).filter(User.phone_number == phone_number).first()
-                if not user:
-                    self.logger.warning(
-                        f"Unauthorized access attempt from phone number: {phone_number}"
-                    )
-                    return False, "Acesso não autorizado.", None
-
-                if not user.is_active:
-                    self.logger.warning(
-                        f"Inactive user attempt from phone number: {phone_number}"
-                    )
-                    return False, "Sua conta está inativa.", None
-
-                if not user.google_sheets_id or not user.google_token:
-                    self.logger.warning(
-                        f"Incomplete Google Sheets configuration for user: {phone_number}"
-                    )
-                    return (
-                        False,
-                        "Configuração do Google Sheets incompleta. Por favor, configure suas credenciais.",
-                        None,
-                    )
-
-                return True, "", user
+            if use_replica and not (user and user.is_active and user.google_sheets_id and user.google_token):
+                # The replica may lag behind a signup or OAuth callback; confirm rejections on the primary
+                with self._get_db() as db:
+                    user = db.query(User).filter(User.phone_number == phone_number).first()
+            is_valid, message, user = self._check_user(user, phone_number)
+            return is_valid, message, UserSnapshot.from_user(user) if user else None
 
         def _validate_result(result):
             """Validate that we got a proper result from the database"""
             if expect_user_exists and result[2] is None:
                 # If we expect a user to exist but got None, this might be a cold DB issue
-                self.logger.warning(f"Expected user {phone_number} to exist but got None - possible cold database")
+                self.logger.warning("Expected user %s to exist but got None - possible cold database", phone_number)
                 return False
             return True
 
         result_validator = _validate_result if expect_user_exists else None
 
         try:
-            return self._execute_with_retry(_validate_operation, "validate_user", result_validator)
-        except (OperationalError, DisconnectionError, InvalidatePoolError, TimeoutError, InterfaceError):
+            result = self._execute_with_retry(_validate_operation, "validate_user", result_validator)
+            user_cache.set(phone_number, result)
+            return result
+        except CONNECTION_ERRORS:
             return False, "Erro de conexão com o banco de dados. Tente novamente.", None
         except (DatabaseError, InternalError, ProgrammingError):
             return False, "Erro ao validar usuário.", None
         except Exception:
             return False, "Erro ao validar usuário.", None
 
+    def get_active_user(self, user_id: int) -> Tuple[bool, str, Optional[User]]:
+        """
+        Load a user by ID and apply the same checks as validate_user.
+
+        Used by background workers, which only know the user ID of a queued
+        expense. Unlike validate_user, database errors are not turned into a
+        failed result: the worker must retry the job rather than drop it.
+
+        Raises:
+            CircuitOpenError: If the database circuit breaker is open
+            SQLAlchemyError: If the query still fails after the retries
+        """
+        def _get_operation():
+            with self._get_db() as db:
+                user = db.query(User).filter(User.id == user_id).first()
+                return self._check_user(user, f"user_id {user_id}")
+
+        return self._execute_with_retry(_get_operation, "get_active_user")
+
     def signup(self, name: str, phone_number: str, password: str, google_sheets_id: str) -> Tuple[bool, str, Optional[User]]:
+        phone_number = normalize_phone_number(phone_number)
+
         def _signup_operation():
             with self._get_db() as db:
                 existing_user = db.query(User).filter(User.phone_number == phone_number).first()
@@ -153,8 +227,11 @@ class UserService:
                 return True, "Usuário criado com sucesso.", user
 
         try:
-            return self._execute_with_retry(_signup_operation, "signup")
-        except (OperationalError, DisconnectionError, InvalidatePoolError, TimeoutError, InterfaceError):
+            result = self._execute_with_retry(_signup_operation, "signup")
+            if result[0]:
+                user_cache.invalidate(phone_number)
+            return result
+        except CONNECTION_ERRORS:
             return False, "Erro de conexão com o banco de dados. Tente novamente.", None
         except (DatabaseError, InternalError, ProgrammingError):
             return False, "Erro ao criar usuário.", None
@@ -173,8 +250,13 @@ class UserService:
                 return True, "Token do Google Sheets atualizado com sucesso.", user
 
         try:
-            return self._execute_with_retry(_update_token_operation, "update_google_token")
-        except (OperationalError, DisconnectionError, InvalidatePoolError, TimeoutError, InterfaceError):
+            result = self._execute_with_retry(_update_token_operation, "update_google_token")
+            if result[0]:
+                sheets_client_cache.invalidate_user(user_id)
+                token_broker.invalidate(user_id)
+                user_cache.invalidate(result[2].phone_number)
+            return result
+        except CONNECTION_ERRORS:
             return False, "Erro de conexão com o banco de dados. Tente novamente.", None
         except (DatabaseError, InternalError, ProgrammingError):
             return False, "Erro ao atualizar token do Google Sheets.", None
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import List, Optional, Sequence, Tuple
 from src.models.expense import Expense
 
 
@@ -16,6 +16,10 @@ class WhatsAppView:
     def format_sheets_save_error() -> str:
         return "Erro ao salvar no Google Sheets. Por favor, tente novamente."
 
+    @staticmethod
+    def format_sheets_busy_error() -> str:
+        return "O Google Sheets está recebendo muitas mensagens agora. Por favor, tente novamente em instantes."
+
     @staticmethod
     def format_sheets_connection_error() -> str:
         return "Erro ao conectar com o Google Sheets. Por favor, verifique suas credenciais."
@@ -30,6 +34,58 @@ class WhatsAppView:
             f"Preço: {expense.price}"
         )
 
+    @staticmethod
+    def format_multi_success(expenses: List[Expense], failed_lines: Sequence[str] = ()) -> str:
+        lines = [f"Gravados {len(expenses)} gastos ✔️"]
+        for expense in expenses:
+            lines.append(f"- {expense.product} ({expense.category}): {expense.price}")
+        if failed_lines:
+            lines.append("Não entendi estas linhas:")
+            lines.extend(f"- `{line}`" for line in failed_lines)
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_money(cents: int) -> str:
+        reais, cents = divmod(cents, 100)
+        return f"R$ {reais:,}".replace(",", ".") + f",{cents:02d}"
+
+    @staticmethod
+    def format_summary(
+        label: str, totals: List[Tuple[str, int, int]], category: Optional[str] = None
+    ) -> str:
+        if not totals:
+            if category:
+                return f"Nenhum gasto em {category} registrado em {label}."
+            return f"Nenhum gasto registrado em {label}."
+
+        lines = [f"Resumo {label}:"]
+        for name, total_cents, count in totals:
+            lines.append(f"{name}: {WhatsAppView.format_money(total_cents)} ({count})")
+        if len(totals) > 1:
+            grand_total = sum(total_cents for _, total_cents, _ in totals)
+            lines.append(f"Total: {WhatsAppView.format_money(grand_total)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_monthly_digest(digest) -> str:
+        lines = [
+            f"Seu resumo de {digest.month:%m/%Y}:",
+            f"Total: {WhatsAppView.format_money(digest.total_cents)} em {digest.expense_count} gastos",
+        ]
+        change = digest.change_percent
+        if change is not None:
+            direction = "a mais" if change >= 0 else "a menos"
+            lines.append(f"{abs(change):.0f}% {direction} que no mês anterior")
+        if digest.top_categories:
+            lines.append("Principais categorias:")
+            for category, total_cents in digest.top_categories:
+                lines.append(f"- {category}: {WhatsAppView.format_money(total_cents)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_summary_error() -> str:
+        return "Erro ao gerar o resumo. Por favor, tente novamente."
+
     @staticmethod
     def format_twiml_response(message: str) -> Tuple[str, str]:
         """Format the response as TwiML."""
@@ -38,3 +94,10 @@ class WhatsAppView:
     <Message>{message}</Message>
 </Response>"""
         return twiml, "application/xml"
+
+    @staticmethod
+    def format_empty_twiml_response() -> Tuple[str, str]:
+        """Acknowledge the webhook without replying; the reply is sent later via the REST API."""
+        twiml = """<?xml version="1.0" encoding="UTF-8"?>
+<Response></Response>"""
+        return twiml, "application/xml"
@@ -0,0 +1,76 @@
+import logging
+import time
+
+from flask import Flask
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def preload(app: Flask) -> None:
+    """
+    Build the lazily created controllers and the shared Sheets API resource.
+
+    Importing the Google, SQLAlchemy and Twilio stacks opens no connections
+    and starts no threads, so this can run in the gunicorn master before it
+    forks: workers then share those pages copy-on-write instead of each
+    importing its own copy.
+    """
+    from src.routes.google_routes import google_controller
+    from src.routes.user_routes import user_controller
+    from src.routes.whatsapp_routes import whatsapp_controller
+    from src.services.google_sheets.discovery import get_sheets_resource
+
+    for controller in (whatsapp_controller, google_controller, user_controller):
+        controller.get()
+    get_sheets_resource(app.config["GOOGLE_SHEETS_API_URL"].rstrip("/") + "/")
+
+
+def warm_up(app: Flask) -> None:
+    """
+    Pay the one-off startup costs before the first request arrives.
+
+    Runs ``preload`` (nearly free when the master already did), opens a
+    pooled database connection and, when WARMUP_USERS is set, builds cached
+    Sheets clients for the most recently updated users.
+    """
+    started_at = time.perf_counter()
+
+    from src.config.database import engine
+
+    preload(app)
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("Database warm-up failed: %s", e)
+
+    if app.config["WARMUP_USERS"] > 0:
+        _warm_sheets_clients(app, app.config["WARMUP_USERS"])
+
+    logger.info("Warm-up finished in %.3fs", time.perf_counter() - started_at)
+
+
+def _warm_sheets_clients(app: Flask, limit: int) -> None:
+    from src.config.database import SessionLocal
+    from src.models.user import User
+    from src.services.google_sheets.sheets_service import GoogleSheetsService
+
+    with SessionLocal() as db:
+        users = (
+            db.query(User)
+            .filter(User.is_active.is_(True))
+            .filter(User.google_token.isnot(None))
+            .filter(User.google_sheets_id.isnot(None))
+            .order_by(User.updated_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    with app.app_context():
+        for user in users:
+            try:
+                GoogleSheetsService.for_user(user)
+            except Exception as e:
+                logger.warning("Failed to warm Sheets client for user %s: %s", user, e)